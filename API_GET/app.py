@@ -1,11 +1,33 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import Literal
+from fastapi import BackgroundTasks, Depends, FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from starlette.datastructures import MutableHeaders
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from typing import Literal, Optional
+import numpy as np
 import pandas as pd
+import asyncio
+import logging
+import time
 import boto3
-import joblib
 import os
 import io
+import json
+
+from getaround_formats import BUNDLE_SUFFIX, profile_filename
+
+from artifacts import ArtifactCache, local_model
+from batching import MicroBatcher
+from cache import PredictionCache
+from drift import DriftMonitor, bundle_profile, read_profile
+from inference import InferencePool, LoadedModel, load_predictor
+from logs import configure_logging
+from metrics import LATENCY_BUCKETS, SIZE_BUCKETS, MetricsRegistry, StageTimer
+from registry import ModelRegistry, version_name
+from sensitivity import SensitivityPlan
+
+configure_logging(os.getenv("LOG_LEVEL", "INFO"))
+logger = logging.getLogger("getaround.api")
 
 # === Initialisation FastAPI ===
 app = FastAPI(
@@ -52,6 +74,70 @@ Exemple :
 version="1.0"
 )
 
+# === Métriques (GET /metrics, format Prometheus) ===
+metrics = MetricsRegistry()
+REQUESTS = metrics.counter("getaround_requests_total", "Requêtes HTTP traitées", ["route", "status"])
+ERRORS = metrics.counter("getaround_request_errors_total", "Requêtes HTTP en erreur (5xx)", ["route"])
+REQUEST_DURATION = metrics.histogram(
+    "getaround_request_duration_seconds", "Durée totale des requêtes HTTP", ["route"], LATENCY_BUCKETS
+)
+STAGE_DURATION = metrics.histogram(
+    "getaround_stage_duration_seconds",
+    "Durée par étape : validation, queue, dataframe, preprocess, inference, serialization",
+    ["stage"],
+    LATENCY_BUCKETS,
+)
+BATCH_ROWS = metrics.histogram(
+    "getaround_batch_rows", "Lignes par appel au modèle groupé (batch_endpoint, micro_batch, sensitivity)", ["source"], SIZE_BUCKETS
+)
+MODEL_LOAD_SECONDS = metrics.gauge("getaround_model_load_seconds", "Durée du chargement du modèle", ["version"])
+# Server-Timing renvoyé sur toutes les réponses, ou seulement si la requête porte "X-Server-Timing: 1"
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0").lower() in ("1", "true", "yes")
+
+class TimingMiddleware:
+    """Compte les requêtes, mesure leur durée et publie les étapes enregistrées par les routes."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+        timer = StageTimer()
+        scope.setdefault("state", {}).update(timer=timer, started=started)
+        want_header = SERVER_TIMING or (b"x-server-timing", b"1") in scope["headers"]
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if want_header:
+                    total = f"total;dur={(time.perf_counter() - started) * 1000:.3f}"
+                    stages = timer.server_timing()
+                    MutableHeaders(scope=message).append("Server-Timing", f"{stages}, {total}" if stages else total)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            route = scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            REQUESTS.inc(route=path, status=status)
+            if status >= 500:
+                ERRORS.inc(route=path)
+            REQUEST_DURATION.observe(time.perf_counter() - started, route=path)
+            for stage, seconds in timer.stages.items():
+                STAGE_DURATION.observe(seconds, stage=stage)
+
+app.add_middleware(TimingMiddleware)
+
+def _json_response(payload, timer, response):
+    with timer.stage("serialization"):
+        body = json.dumps(payload)
+    return Response(body, media_type="application/json", headers=dict(response.headers))
+
 # === Schéma attendu pour l'entrée ===
 class InputData(BaseModel):
     model_key: str
@@ -68,47 +154,580 @@ class InputData(BaseModel):
     has_speed_regulator: bool
     winter_tires: bool
 
+# Ordre des colonnes attendu par le pipeline (identique à pricing_clean.csv)
+FEATURES = list(InputData.model_fields)
+NUMERIC_FEATURES = ["mileage", "engine_power"]
+STRING_FEATURES = ["model_key", "fuel", "paint_color", "car_type"]
+BOOL_FEATURES = [f for f in FEATURES if f not in NUMERIC_FEATURES + STRING_FEATURES]
+
+# === Configuration batch ===
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "50000"))
+PREDICT_CHUNK_SIZE = int(os.getenv("PREDICT_CHUNK_SIZE", "5000"))
+_records_adapter = TypeAdapter(list[InputData])
+
+# === Configuration analyse de sensibilité ===
+MAX_SENSITIVITY_POINTS = int(os.getenv("MAX_SENSITIVITY_POINTS", "20000"))
+
+# === Configuration micro-batching (optionnel) ===
+MICRO_BATCHING = os.getenv("MICRO_BATCHING", "0").lower() in ("1", "true", "yes")
+MICRO_BATCH_MAX_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", "64"))
+MICRO_BATCH_MAX_LATENCY_MS = float(os.getenv("MICRO_BATCH_MAX_LATENCY_MS", "5"))
+
+# === Cache des prédictions ===
+# PREDICTION_CACHE_SIZE=0 désactive le cache, PREDICTION_CACHE_TTL=0 supprime l'expiration
+prediction_cache = PredictionCache(
+    FEATURES,
+    max_size=int(os.getenv("PREDICTION_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("PREDICTION_CACHE_TTL", "3600")),
+)
+
+# === Suivi de dérive des entrées ===
+# Comparé au profil de référence publié avec le modèle ; DRIFT_MONITORING=0 le désactive
+DRIFT_MONITORING = os.getenv("DRIFT_MONITORING", "1").lower() in ("1", "true", "yes")
+drift_monitor = DriftMonitor(min_rows=int(os.getenv("DRIFT_MIN_ROWS", "100")))
+
 # === Configuration S3 ===
 S3_BUCKET = os.getenv("S3_BUCKET")
 MODEL_KEY = os.getenv("MODEL_KEY", "mlflow/models/xgboost_model.joblib")
+# Répertoire local partagé par les workers : l'artefact n'y est téléchargé qu'une fois
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", "/tmp/getaround-models")
+# Artefact local (mode hors-ligne) : si défini, S3 n'est pas utilisé
+MODEL_PATH = os.getenv("MODEL_PATH")
 s3 = boto3.client("s3")
+artifact_cache = ArtifactCache(s3, MODEL_CACHE_DIR)
 
-# === Chargement du modèle depuis S3 au démarrage ===
-model = None
+# === Mode d'inférence ===
+# "pipeline" : pipeline sklearn complet ; "compiled" : encodage NumPy + Booster.inplace_predict ;
+# "trees" : arbres aplatis évalués en NumPy ; "onnx" : ONNX Runtime (dépendances optionnelles) ;
+# "auto" : le plus rapide en unitaire parmi ceux qui passent le contrôle de parité
+INFERENCE_MODE = os.getenv("INFERENCE_MODE", "pipeline")
+PARITY_TOLERANCE = float(os.getenv("PARITY_TOLERANCE", "1e-3"))
+PREDICTOR_SETTINGS = {"features": FEATURES, "mode": INFERENCE_MODE, "tolerance": PARITY_TOLERANCE}
+
+# === Pool d'inférence : "thread" ou "process" ===
+inference_pool = InferencePool(
+    kind=os.getenv("INFERENCE_EXECUTOR", "thread"),
+    workers=int(os.getenv("INFERENCE_WORKERS", "0")) or None,
+    predictor_settings=PREDICTOR_SETTINGS,
+)
+
+# === Modèles résidents (S3 via le cache disque, ou MODEL_PATH) ===
+registry = ModelRegistry(max_models=int(os.getenv("MAX_RESIDENT_MODELS", "3")))
+# Rechargement automatique : intervalle (s) de scrutation du préfixe S3, 0 = désactivé
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "0"))
+MODEL_WATCH_PREFIX = os.getenv("MODEL_WATCH_PREFIX", "mlflow/models/")
+# ".joblib" (pipeline pickle) ou ".bundle.zip" (bundle compact)
+MODEL_WATCH_SUFFIX = os.getenv("MODEL_WATCH_SUFFIX", ".joblib")
+# Jeton requis par les routes /admin ; si absent, ces routes sont désactivées
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Lignes de préchauffage envoyées à un modèle avant qu'il ne reçoive du trafic
+WARMUP_ROWS = [
+    {"model_key": "Audi", "mileage": 100000, "engine_power": 120, "fuel": "diesel", "paint_color": "black",
+     "car_type": "estate", "private_parking_available": True, "has_gps": True, "has_air_conditioning": False,
+     "automatic_car": False, "has_getaround_connect": True, "has_speed_regulator": False, "winter_tires": True},
+    {"model_key": "Renault", "mileage": 20000, "engine_power": 90, "fuel": "petrol", "paint_color": "white",
+     "car_type": "hatchback", "private_parking_available": False, "has_gps": False, "has_air_conditioning": True,
+     "automatic_car": True, "has_getaround_connect": False, "has_speed_regulator": True, "winter_tires": False},
+]
+
+def load_profile(path, model_key=None, model_path=None):
+    """Profil de référence de l'artefact : dans le bundle, sinon publié à côté ; None s'il est absent."""
+    if not DRIFT_MONITORING:
+        return None
+    try:
+        if path.endswith(BUNDLE_SUFFIX):
+            profile = bundle_profile(path)
+            if profile is not None:
+                return profile
+        if model_path:
+            return read_profile(profile_filename(model_path)) if os.path.isfile(profile_filename(model_path)) else None
+        return read_profile(artifact_cache.fetch(S3_BUCKET, profile_filename(model_key))[0])
+    except Exception as e:
+        logger.warning("Profil de référence indisponible, dérive non suivie", extra={"fields": {"error": str(e)}})
+        return None
+
+def load_artifact(model_key=None, model_path=None):
+    """Charge et préchauffe un artefact (bloquant), sans l'activer."""
+    started = time.perf_counter()
+    if model_path:
+        logger.info("Chargement du modèle local", extra={"fields": {"path": model_path}})
+        path, revision = local_model(model_path)
+        source = model_path
+    else:
+        logger.info("Chargement du modèle", extra={"fields": {"bucket": S3_BUCKET, "key": model_key}})
+        path, revision = artifact_cache.fetch(S3_BUCKET, model_key)
+        source = model_key
+    pipeline, predictor = load_predictor(path, **PREDICTOR_SETTINGS)
+    loaded = LoadedModel(
+        pipeline, predictor, version_name(source), path,
+        revision=revision, source=source, profile=load_profile(path, model_key, model_path),
+    )
+    prices = loaded.predictor.predict_records(WARMUP_ROWS)
+    loaded.predictor.predict_frame(pd.DataFrame.from_records(WARMUP_ROWS, columns=FEATURES))
+    if not np.all(np.isfinite(prices)):
+        raise ValueError(f"Prédictions de préchauffage invalides : {prices}")
+    load_seconds = time.perf_counter() - started
+    MODEL_LOAD_SECONDS.set(load_seconds, version=loaded.version)
+    logger.info(
+        "Modèle chargé",
+        extra={"fields": {
+            "version": loaded.version, "revision": revision, "predictor": loaded.predictor.name,
+            "load_seconds": round(load_seconds, 3), "drift_profile": loaded.profile is not None,
+        }},
+    )
+    return loaded
+
+def activate_model(loaded):
+    registry.add(loaded, activate=True)
+    if registry.shadow is not None and registry.shadow.version == loaded.version:
+        registry.set_shadow(None)
+    # Un nouveau modèle actif invalide toutes les prédictions en cache et repart de zéro pour la dérive
+    prediction_cache.bind(loaded.revision)
+    drift_monitor.bind(loaded.profile, loaded.revision)
 
-@app.on_event("startup")
 def load_model():
-    global model
+    """Charge le modèle initial (bloquant). Appelé au démarrage, ou dans le master gunicorn avec preload_app."""
+    if registry.active is not None:
+        return
     try:
-        print(f"Téléchargement du modèle depuis s3://{S3_BUCKET}/{MODEL_KEY}")
-        response = s3.get_object(Bucket=S3_BUCKET, Key=MODEL_KEY)
-        model_bytes = io.BytesIO(response["Body"].read())
-        model = joblib.load(model_bytes)
-        print("✅ Modèle chargé avec succès")
+        activate_model(load_artifact(model_key=MODEL_KEY, model_path=MODEL_PATH))
     except Exception as e:
-        print(f"❌ Erreur chargement modèle : {e}")
+        logger.exception("Erreur chargement modèle")
         raise RuntimeError(f"Impossible de charger le modèle : {e}")
 
+async def load_and_warm(model_key=None, model_path=None):
+    loaded = await run_in_threadpool(load_artifact, model_key, model_path)
+    await inference_pool.warm_up(loaded, WARMUP_ROWS)
+    return loaded
+
+def _latest_artifact():
+    latest = None
+    for page in s3.get_paginator("list_objects_v2").paginate(Bucket=S3_BUCKET, Prefix=MODEL_WATCH_PREFIX):
+        for obj in page.get("Contents", []):
+            if obj["Key"].endswith(MODEL_WATCH_SUFFIX) and (latest is None or obj["LastModified"] > latest["LastModified"]):
+                latest = obj
+    return latest
+
+async def watch_models():
+    """Charge et active le plus récent artefact du préfixe S3 dès qu'il change."""
+    while True:
+        await asyncio.sleep(MODEL_WATCH_INTERVAL)
+        try:
+            latest = await run_in_threadpool(_latest_artifact)
+            if latest is None:
+                continue
+            revision = f"{latest['Key']}@{latest['ETag'].strip(chr(34))}"
+            if registry.active is not None and registry.active.revision == revision:
+                continue
+            activate_model(await load_and_warm(model_key=latest["Key"]))
+            logger.info("Nouveau modèle activé", extra={"fields": {"revision": revision}})
+        except Exception:
+            logger.exception("Échec du rechargement automatique du modèle")
+
+# === Micro-batching des requêtes /predict concurrentes ===
+batcher = None
+
+watcher = None
+
+async def _predict_rows(rows, timings=None):
+    BATCH_ROWS.observe(len(rows), source="micro_batch")
+    return await inference_pool.run(registry.active, "predict_records", rows, timings)
+
+@app.on_event("startup")
+async def startup():
+    global batcher, watcher
+    await run_in_threadpool(load_model)
+    if MODEL_WATCH_INTERVAL > 0 and not MODEL_PATH:
+        watcher = asyncio.create_task(watch_models())
+    if MICRO_BATCHING:
+        batcher = MicroBatcher(
+            _predict_rows,
+            max_batch_size=MICRO_BATCH_MAX_SIZE,
+            max_latency_ms=MICRO_BATCH_MAX_LATENCY_MS,
+        )
+        await batcher.start()
+        logger.info(
+            "Micro-batching actif",
+            extra={"fields": {"max_batch_size": MICRO_BATCH_MAX_SIZE, "max_latency_ms": MICRO_BATCH_MAX_LATENCY_MS}},
+        )
+
+@app.on_event("shutdown")
+async def shutdown():
+    if watcher is not None:
+        watcher.cancel()
+    if batcher is not None:
+        await batcher.stop()
+    inference_pool.shutdown()
+
 # === Routes ===
 @app.get("/")
 def home():
     return {"message": "Bienvenue sur l'API Getaround 🚗 - Utilisez /predict pour faire une prédiction"}
 
+async def predict_frame(df, loaded, timings=None):
+    """Prédit un DataFrame complet ; les chunks de PREDICT_CHUNK_SIZE lignes sont répartis sur le pool."""
+    chunks = [df.iloc[start:start + PREDICT_CHUNK_SIZE] for start in range(0, len(df), PREDICT_CHUNK_SIZE)]
+    results = await asyncio.gather(*(inference_pool.run(loaded, "predict_frame", chunk, timings) for chunk in chunks))
+    return np.concatenate(results)
+
+def _resolve_model(model_version):
+    try:
+        return registry.get(model_version)
+    except LookupError as e:
+        raise HTTPException(status_code=404 if model_version else 503, detail=str(e))
+
+async def _compare_shadow(loaded, method, payload, primary):
+    # Exécuté après l'envoi de la réponse : n'ajoute aucune latence au client
+    shadow = registry.shadow
+    if shadow is None or shadow is loaded:
+        return
+    try:
+        registry.shadow_stats.record(primary, await inference_pool.run(shadow, method, payload))
+    except Exception:
+        logger.exception("Erreur prédiction shadow", extra={"fields": {"version": shadow.version}})
+
+ModelVersion = Query(None, description="Version de modèle résidente à utiliser (par défaut : modèle actif)")
+
 @app.post("/predict")
-def predict(data: InputData):
+async def predict(
+    data: InputData,
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    model_version: Optional[str] = ModelVersion,
+):
+    # Lecture du corps et validation pydantic ont lieu avant l'entrée dans la route
+    timer = request.state.timer
+    timer.add("validation", time.perf_counter() - request.state.started)
+    loaded = _resolve_model(model_version)
+    response.headers["X-Model-Version"] = loaded.version
+    try:
+        row = data.model_dump()
+        logger.debug("Données reçues", extra={"fields": {"input": row}})
+
+        # Le cache et le micro-batching ne concernent que le modèle actif
+        if model_version is not None:
+            price = float((await inference_pool.run(loaded, "predict_records", [row], timer.stages))[0])
+            background_tasks.add_task(_compare_shadow, loaded, "predict_records", [row], [price])
+            return _json_response({"predicted_price_per_day": [round(price, 2)]}, timer, response)
+
+        if prediction_cache.enabled:
+            cache_key = prediction_cache.key(row)
+            cached_version = prediction_cache.model_version
+            price = prediction_cache.get(cache_key)
+            if price is not None:
+                response.headers["X-Cache"] = "HIT"
+                drift_monitor.observe(row, price)
+                return _json_response({"predicted_price_per_day": [round(price, 2)]}, timer, response)
+            response.headers["X-Cache"] = "MISS"
+
+        # Faire la prédiction (regroupée avec les requêtes concurrentes si le micro-batching est actif)
+        if batcher is not None:
+            price = await batcher.submit(row, timer.stages)
+        else:
+            price = float((await inference_pool.run(loaded, "predict_records", [row], timer.stages))[0])
+
+        if prediction_cache.enabled:
+            prediction_cache.put(cache_key, price, cached_version)
+        drift_monitor.observe(row, price)
+
+        background_tasks.add_task(_compare_shadow, loaded, "predict_records", [row], [price])
+        return _json_response({"predicted_price_per_day": [round(price, 2)]}, timer, response)
+
+    except Exception as e:
+        logger.exception("Erreur prédiction")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# === Prédiction par lot ===
+def _check_batch_size(n):
+    if n == 0:
+        raise HTTPException(status_code=422, detail="Le lot est vide")
+    if n > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Lot trop grand : {n} lignes (maximum {MAX_BATCH_SIZE})",
+        )
+
+def _frame_from_records(records):
+    _check_batch_size(len(records))
+    try:
+        rows = _records_adapter.validate_python(records)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    return pd.DataFrame.from_records([row.model_dump() for row in rows], columns=FEATURES)
+
+def _coerce_frame(df):
+    """Valide et type un DataFrame colonnaire (JSON colonnaire, CSV ou Arrow)."""
+    missing = [c for c in FEATURES if c not in df.columns]
+    if missing:
+        raise HTTPException(status_code=422, detail=f"Colonnes manquantes : {missing}")
+    df = df[FEATURES]
+    _check_batch_size(len(df))
+    if df.isna().any().any():
+        raise HTTPException(status_code=422, detail="Valeurs manquantes dans le lot")
+
+    out = {}
+    for col in NUMERIC_FEATURES:
+        values = pd.to_numeric(df[col], errors="coerce")
+        if values.isna().any() or (values % 1 != 0).any():
+            raise HTTPException(status_code=422, detail=f"'{col}' doit contenir des entiers")
+        out[col] = values.astype("int64")
+    for col in STRING_FEATURES:
+        out[col] = df[col].astype(str)
+    for col in BOOL_FEATURES:
+        values = df[col]
+        if values.dtype != bool:
+            values = values.astype(str).str.lower().map({"true": True, "false": False, "1": True, "0": False})
+            if values.isna().any():
+                raise HTTPException(status_code=422, detail=f"'{col}' doit contenir des booléens")
+        out[col] = values.astype(bool)
+    return pd.DataFrame(out, columns=FEATURES)
+
+async def _read_batch(request):
+    content_type = request.headers.get("content-type", "application/json").split(";")[0].strip()
+    body = await request.body()
+
+    if content_type == "text/csv":
+        try:
+            return _coerce_frame(pd.read_csv(io.BytesIO(body)))
+        except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+            raise HTTPException(status_code=400, detail=f"CSV invalide : {e}")
+
+    if content_type == "application/vnd.apache.arrow.stream":
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise HTTPException(status_code=415, detail="Le format Arrow nécessite pyarrow")
+        try:
+            table = pa.ipc.open_stream(body).read_all()
+        except pa.ArrowInvalid as e:
+            raise HTTPException(status_code=400, detail=f"Flux Arrow invalide : {e}")
+        return _coerce_frame(table.to_pandas())
+
+    if content_type != "application/json":
+        raise HTTPException(status_code=415, detail=f"Content-Type non supporté : {content_type}")
+    try:
+        payload = json.loads(body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"JSON invalide : {e}")
+
+    # Liste d'objets InputData ou format colonnaire {"colonne": [valeurs...]}
+    if isinstance(payload, list):
+        return _frame_from_records(payload)
+    if isinstance(payload, dict) and all(isinstance(v, list) for v in payload.values()):
+        lengths = {len(v) for v in payload.values()}
+        if len(lengths) > 1:
+            raise HTTPException(status_code=422, detail="Les colonnes n'ont pas toutes la même longueur")
+        return _coerce_frame(pd.DataFrame(payload))
+    raise HTTPException(status_code=422, detail="Attendu : une liste d'objets ou un objet de colonnes")
+
+@app.post(
+    "/predict/batch",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": {"$ref": "#/components/schemas/InputData"}}
+                },
+                "text/csv": {"schema": {"type": "string"}},
+                "application/vnd.apache.arrow.stream": {"schema": {"type": "string", "format": "binary"}},
+            },
+        }
+    },
+)
+async def predict_batch(
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    model_version: Optional[str] = ModelVersion,
+):
+    timer = request.state.timer
+    loaded = _resolve_model(model_version)
+    response.headers["X-Model-Version"] = loaded.version
+    with timer.stage("validation"):
+        df = await _read_batch(request)
+    BATCH_ROWS.observe(len(df), source="batch_endpoint")
     try:
-        # Convertir les données en DataFrame avec colonnes correctes
-        df = pd.DataFrame([data.dict()])
-        print("📥 Données reçues :", df.to_dict())
+        prices = await predict_frame(df, loaded, timer.stages)
+    except Exception as e:
+        logger.exception("Erreur prédiction batch")
+        raise HTTPException(status_code=500, detail=str(e))
+    logger.info("Lot prédit", extra={"fields": {"rows": len(df), "version": loaded.version}})
+    if model_version is None:
+        drift_monitor.observe_frame(df, prices)
+    background_tasks.add_task(_compare_shadow, loaded, "predict_frame", df, prices)
+    payload = {"predicted_price_per_day": np.round(prices, 2).tolist(), "count": len(df)}
+    return _json_response(payload, timer, response)
 
-        # Faire la prédiction
-        prediction = model.predict(df)
-        price = float(prediction[0])
+# === Analyse de sensibilité ===
+class NumericRange(BaseModel):
+    start: int = Field(ge=0)
+    stop: int = Field(ge=0)
+    steps: int = Field(21, ge=2, le=MAX_SENSITIVITY_POINTS)
 
-        return {"predicted_price_per_day": [round(float(prediction), 2)]}
+class SensitivityRequest(BaseModel):
+    base: InputData
+    numeric: dict[Literal["mileage", "engine_power"], NumericRange] = {}
+    categorical: list[str] = Field(default=[], description="Features dont toutes les catégories (ou true/false) sont essayées")
+    mode: Literal["one_at_a_time", "grid"] = "one_at_a_time"
 
+@app.post("/predict/sensitivity")
+async def predict_sensitivity(
+    body: SensitivityRequest,
+    request: Request,
+    response: Response,
+    model_version: Optional[str] = ModelVersion,
+):
+    """Prix de la configuration `base` quand une ou plusieurs features varient, en un seul appel au modèle."""
+    timer = request.state.timer
+    loaded = _resolve_model(model_version)
+    response.headers["X-Model-Version"] = loaded.version
+    with timer.stage("validation"):
+        unknown = [f for f in body.categorical if f not in STRING_FEATURES + BOOL_FEATURES]
+        if unknown:
+            raise HTTPException(status_code=422, detail=f"Features catégorielles inconnues : {unknown}")
+        try:
+            plan = SensitivityPlan.from_request(
+                body.base.model_dump(), FEATURES,
+                {feature: (r.start, r.stop, r.steps) for feature, r in body.numeric.items()},
+                body.categorical, loaded.vocabularies, body.mode,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        if plan.size > MAX_SENSITIVITY_POINTS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Trop de variantes : {plan.size} (maximum {MAX_SENSITIVITY_POINTS})",
+            )
+    with timer.stage("dataframe"):
+        df = plan.frame()
+    BATCH_ROWS.observe(len(df), source="sensitivity")
+    try:
+        prices = await inference_pool.run(loaded, "predict_frame", df, timer.stages)
     except Exception as e:
-        print(f"❌ Erreur prédiction : {e}")
+        logger.exception("Erreur analyse de sensibilité")
         raise HTTPException(status_code=500, detail=str(e))
-    
-    
+    return _json_response(plan.summarize(prices), timer, response)
+
+def _collect_runtime_metrics():
+    cache = prediction_cache.stats()
+    lines = [
+        "# TYPE getaround_cache_hits_total counter",
+        f"getaround_cache_hits_total {cache['hits']}",
+        "# TYPE getaround_cache_misses_total counter",
+        f"getaround_cache_misses_total {cache['misses']}",
+        "# TYPE getaround_cache_evictions_total counter",
+        f"getaround_cache_evictions_total {cache['evictions']}",
+        "# TYPE getaround_cache_entries gauge",
+        f"getaround_cache_entries {cache['size']}",
+        "# HELP getaround_model_info Modèles résidents (role = active, shadow ou resident)",
+        "# TYPE getaround_model_info gauge",
+    ]
+    described = registry.describe()
+    for model in described["models"]:
+        role = "active" if model["version"] == described["active"] else (
+            "shadow" if model["version"] == described["shadow"] else "resident")
+        lines.append(
+            f'getaround_model_info{{version="{model["version"]}",revision="{model["revision"]}",'
+            f'predictor="{model["predictor"]}",role="{role}"}} 1'
+        )
+    scores = drift_monitor.scores()
+    if scores:
+        lines += ["# HELP getaround_drift_psi Indice de stabilité (PSI) du trafic par rapport au profil d'entraînement",
+                  "# TYPE getaround_drift_psi gauge"]
+        lines += [f'getaround_drift_psi{{feature="{feature}"}} {value}' for feature, (value, _) in scores.items()]
+        lines += ["# HELP getaround_drift_ks Statistique KS du trafic par rapport au profil d'entraînement",
+                  "# TYPE getaround_drift_ks gauge"]
+        lines += [f'getaround_drift_ks{{feature="{feature}"}} {value}' for feature, (_, value) in scores.items()
+                  if value is not None]
+    lines += ["# TYPE getaround_drift_rows counter", f"getaround_drift_rows {drift_monitor.rows}"]
+    return lines
+
+metrics.add_collector(_collect_runtime_metrics)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/cache/stats")
+def cache_stats():
+    return prediction_cache.stats()
+
+@app.get("/batching/stats")
+def batching_stats():
+    if batcher is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "max_batch_size": MICRO_BATCH_MAX_SIZE,
+        "max_latency_ms": MICRO_BATCH_MAX_LATENCY_MS,
+        **batcher.stats.snapshot(),
+    }
+
+@app.get("/drift")
+def drift_report():
+    return drift_monitor.report()
+
+# === Gestion des modèles ===
+@app.get("/models")
+def list_models():
+    return registry.describe()
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Routes d'administration désactivées (ADMIN_TOKEN absent)")
+    if x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=401, detail="Jeton d'administration invalide")
+
+class LoadModelRequest(BaseModel):
+    model_key: Optional[str] = None
+    model_path: Optional[str] = None
+    activate: bool = True
+
+@app.post("/admin/models", dependencies=[Depends(require_admin)])
+async def admin_load_model(body: LoadModelRequest):
+    if bool(body.model_key) == bool(body.model_path):
+        raise HTTPException(status_code=422, detail="Renseigner model_key ou model_path")
+    try:
+        loaded = await load_and_warm(model_key=body.model_key, model_path=body.model_path)
+    except Exception as e:
+        logger.exception("Erreur chargement modèle")
+        raise HTTPException(status_code=400, detail=f"Impossible de charger le modèle : {e}")
+    if body.activate:
+        activate_model(loaded)
+    else:
+        registry.add(loaded)
+    return registry.describe()
+
+@app.post("/admin/models/{version}/activate", dependencies=[Depends(require_admin)])
+def admin_activate_model(version: str):
+    activate_model(_resolve_model(version))
+    return registry.describe()
+
+@app.post("/admin/models/{version}/shadow", dependencies=[Depends(require_admin)])
+def admin_shadow_model(version: str):
+    _resolve_model(version)
+    registry.set_shadow(version)
+    return registry.describe()
+
+@app.delete("/admin/shadow", dependencies=[Depends(require_admin)])
+def admin_clear_shadow():
+    registry.set_shadow(None)
+    return registry.describe()
+
+@app.post("/admin/drift/reset", dependencies=[Depends(require_admin)])
+async def admin_reset_drift():
+    # async : exécutée dans la boucle, comme les mises à jour du moniteur
+    drift_monitor.reset()
+    return drift_monitor.report()
+
+@app.delete("/admin/models/{version}", dependencies=[Depends(require_admin)])
+def admin_remove_model(version: str):
+    _resolve_model(version)
+    try:
+        registry.remove(version)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return registry.describe()
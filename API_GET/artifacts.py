@@ -0,0 +1,114 @@
+import fcntl
+import hashlib
+import json
+import logging
+import os
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+logger = logging.getLogger("getaround.artifacts")
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_md5(path, chunk_size=1 << 20):
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def local_model(path):
+    """Artefact purement local (MODEL_PATH), sans S3 : renvoie (chemin, version)."""
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"MODEL_PATH introuvable : {path}")
+    return path, f"{os.path.basename(path)}@{file_sha256(path)[:16]}"
+
+
+class ArtifactCache:
+    """Cache disque des artefacts S3, partagé par tous les workers.
+
+    Chaque objet est stocké sous `cache_dir` avec un fichier `.meta.json` (clé, ETag,
+    sha256). Au démarrage, l'ETag distant est comparé au cache : s'il correspond et
+    que le sha256 du fichier local est intact, aucun téléchargement n'a lieu. Le
+    téléchargement est vérifié contre le sha256 publié en métadonnée S3 (`sha256`,
+    posé par MLFLOW_GET/model.py) ou, à défaut, contre l'ETag MD5 des uploads simples.
+    Si S3 est injoignable, la dernière copie valide du cache est utilisée.
+
+    `s3` est n'importe quel client exposant `head_object` et `download_file`
+    (boto3, moto, ou un faux client adossé à un répertoire).
+    """
+
+    def __init__(self, s3, cache_dir):
+        self.s3 = s3
+        self.cache_dir = cache_dir
+
+    def _paths(self, key):
+        path = os.path.join(self.cache_dir, key.replace("/", "__"))
+        return path, path + ".meta.json"
+
+    def _read_meta(self, meta_path):
+        try:
+            with open(meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _is_valid(self, path, meta):
+        return meta is not None and os.path.isfile(path) and file_sha256(path) == meta["sha256"]
+
+    def fetch(self, bucket, key):
+        """Renvoie (chemin local, version) de l'artefact `s3://bucket/key`."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path, meta_path = self._paths(key)
+
+        with open(path + ".lock", "w") as lock:
+            # Un seul worker télécharge, les autres attendent puis réutilisent le fichier
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            meta = self._read_meta(meta_path)
+
+            try:
+                head = self.s3.head_object(Bucket=bucket, Key=key)
+            except (BotoCoreError, ClientError) as e:
+                if self._is_valid(path, meta):
+                    logger.warning(
+                        "S3 injoignable, utilisation de l'artefact en cache",
+                        extra={"fields": {"key": key, "etag": meta["etag"], "error": str(e)}},
+                    )
+                    return path, f"{key}@{meta['etag']}"
+                raise
+
+            etag = head["ETag"].strip('"')
+            remote_sha256 = head.get("Metadata", {}).get("sha256")
+            if meta is not None and meta["etag"] == etag and self._is_valid(path, meta):
+                logger.info("Artefact en cache à jour", extra={"fields": {"key": key, "etag": etag}})
+                return path, f"{key}@{etag}"
+
+            logger.info("Téléchargement de l'artefact", extra={"fields": {"bucket": bucket, "key": key, "etag": etag}})
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            try:
+                # download_file écrit en streaming sur disque, sans charger l'objet en mémoire
+                self.s3.download_file(bucket, key, tmp_path)
+                sha256 = file_sha256(tmp_path)
+                if remote_sha256 is not None:
+                    if sha256 != remote_sha256:
+                        raise ValueError(f"sha256 invalide pour {key} : {sha256} != {remote_sha256}")
+                elif "-" not in etag and file_md5(tmp_path) != etag:
+                    # ETag d'un upload simple = MD5 du contenu (les uploads multipart contiennent un '-')
+                    raise ValueError(f"MD5 invalide pour {key} (ETag {etag})")
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+            with open(meta_path + ".tmp", "w") as f:
+                json.dump({"key": key, "etag": etag, "sha256": sha256}, f)
+            os.replace(meta_path + ".tmp", meta_path)
+            return path, f"{key}@{etag}"
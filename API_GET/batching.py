@@ -0,0 +1,140 @@
+import asyncio
+import time
+
+
+class BatchStats:
+    """Compteurs du micro-batching : distribution des tailles de lot et temps d'attente en file."""
+
+    def __init__(self, max_batch_size):
+        # Buckets puissances de 2 jusqu'à la taille maximale d'un lot
+        self.size_buckets = []
+        bucket = 1
+        while bucket < max_batch_size:
+            self.size_buckets.append(bucket)
+            bucket *= 2
+        self.size_buckets.append(max_batch_size)
+        self.wait_buckets_ms = [0.5, 1, 2, 5, 10, 25, 50, 100, 250]
+
+        self.size_counts = [0] * len(self.size_buckets)
+        self.wait_counts = [0] * (len(self.wait_buckets_ms) + 1)
+        self.batches = 0
+        self.items = 0
+        self.wait_sum_ms = 0.0
+        self.wait_max_ms = 0.0
+
+    def record_batch(self, size, waits_ms):
+        self.batches += 1
+        self.items += size
+        for i, bound in enumerate(self.size_buckets):
+            if size <= bound:
+                self.size_counts[i] += 1
+                break
+        for wait in waits_ms:
+            self.wait_sum_ms += wait
+            self.wait_max_ms = max(self.wait_max_ms, wait)
+            for i, bound in enumerate(self.wait_buckets_ms):
+                if wait <= bound:
+                    self.wait_counts[i] += 1
+                    break
+            else:
+                self.wait_counts[-1] += 1
+
+    def snapshot(self):
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "batch_size_histogram": {
+                f"<={bound}": count for bound, count in zip(self.size_buckets, self.size_counts)
+            },
+            "queue_wait_ms": {
+                "mean": round(self.wait_sum_ms / self.items, 3) if self.items else 0.0,
+                "max": round(self.wait_max_ms, 3),
+                "histogram": {
+                    **{f"<={bound}": count for bound, count in zip(self.wait_buckets_ms, self.wait_counts)},
+                    f">{self.wait_buckets_ms[-1]}": self.wait_counts[-1],
+                },
+            },
+        }
+
+
+class MicroBatcher:
+    """Regroupe les requêtes /predict concurrentes en un seul appel au modèle.
+
+    Une requête attend au plus `max_latency_ms` que d'autres la rejoignent ; le lot
+    part dès qu'il atteint `max_batch_size` lignes. `predict_fn(rows, timings)` est une
+    coroutine qui reçoit une liste de dicts (une par requête) et renvoie les prix dans
+    le même ordre.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=64, max_latency_ms=5.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000
+        self.stats = BatchStats(max_batch_size)
+        self._queue = None
+        self._task = None
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Les requêtes encore en file ne seront jamais servies
+        while self._queue is not None and not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Micro-batching arrêté"))
+
+    async def submit(self, row, timings=None):
+        """Prix prédit pour `row` ; `timings` reçoit le temps en file ("queue") et les étapes du lot."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future, time.perf_counter()))
+        price, waited, batch_timings = await future
+        if timings is not None:
+            timings["queue"] = timings.get("queue", 0.0) + waited
+            for stage, seconds in batch_timings.items():
+                timings[stage] = timings.get(stage, 0.0) + seconds
+        return price
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            started = time.perf_counter()
+            waits = [started - queued for _, _, queued in batch]
+            self.stats.record_batch(len(batch), [wait * 1000 for wait in waits])
+            batch_timings = {}
+            try:
+                prices = await self.predict_fn([row for row, _, _ in batch], batch_timings)
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future, _), price, wait in zip(batch, prices, waits):
+                # La requête a pu être annulée (client déconnecté) pendant l'attente
+                if not future.done():
+                    future.set_result((float(price), wait, batch_timings))
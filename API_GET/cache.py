@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """Cache LRU borné des prix prédits, avec expiration (TTL) et invalidation par version de modèle.
+
+    La clé est le tuple canonique des features (ordre fixe, types normalisés), deux
+    payloads identiques au champ près donnent donc la même entrée. `max_size=0`
+    désactive le cache ; `ttl=0` supprime l'expiration.
+    """
+
+    def __init__(self, features, max_size=10000, ttl=3600.0):
+        self.features = features
+        self.max_size = max_size
+        self.ttl = ttl
+        self.model_version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def key(self, row):
+        return tuple(
+            value if isinstance(value, (bool, str)) else int(value)
+            for value in (row[feature] for feature in self.features)
+        )
+
+    def bind(self, model_version):
+        """Associe le cache à une version de modèle ; un changement de version le vide."""
+        with self._lock:
+            if model_version != self.model_version:
+                self._entries.clear()
+                self.model_version = model_version
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                price, expires_at = entry
+                if not self.ttl or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return price
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, price, model_version):
+        with self._lock:
+            # Prédiction calculée avec un modèle remplacé entre-temps : on ne la garde pas
+            if model_version != self.model_version:
+                return
+            self._entries[key] = (price, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "model_version": self.model_version,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
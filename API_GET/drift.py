@@ -0,0 +1,250 @@
+import json
+import math
+import time
+import zipfile
+from bisect import bisect_right
+
+import numpy as np
+import pandas as pd
+from getaround_formats import BUNDLE_PROFILE, check_profile
+
+# Profil de référence écrit à l'entraînement par MLFLOW_GET/reference.py
+PREDICTION = "predicted_price"
+# Seuils usuels du PSI : < 0.1 stable, < 0.25 modéré, au-delà significatif
+PSI_THRESHOLDS = (0.1, 0.25)
+# Proportion plancher : une case vide d'un côté ne rend pas le PSI infini
+_EPSILON = 1e-4
+
+
+def read_profile(path):
+    with open(path) as f:
+        return check_profile(json.load(f))
+
+
+def bundle_profile(path):
+    """profile.json d'un bundle compact, ou None s'il n'en contient pas."""
+    with zipfile.ZipFile(path) as archive:
+        if BUNDLE_PROFILE not in archive.namelist():
+            return None
+        return check_profile(json.loads(archive.read(BUNDLE_PROFILE)))
+
+
+def psi(expected, actual):
+    expected = np.maximum(np.asarray(expected, dtype=np.float64), _EPSILON)
+    actual = np.maximum(np.asarray(actual, dtype=np.float64), _EPSILON)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def ks(expected, actual):
+    """Statistique de Kolmogorov-Smirnov sur les fonctions de répartition par case."""
+    return float(np.max(np.abs(np.cumsum(expected) - np.cumsum(actual))))
+
+
+def psi_status(value):
+    return "stable" if value < PSI_THRESHOLDS[0] else "moderate" if value < PSI_THRESHOLDS[1] else "significant"
+
+
+class NumericSketch:
+    """Histogramme sur les cases du profil (quantiles d'entraînement) : mémoire fixe, O(log cases) par valeur."""
+
+    def __init__(self, reference):
+        self.edges = [float(e) for e in reference["edges"]]
+        self._edges = np.asarray(self.edges)
+        self.reference = reference
+        self.counts = [0] * (len(self.edges) + 1)
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.counts[bisect_right(self.edges, value)] += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def add_many(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return
+        index = np.searchsorted(self._edges, values, side="right")
+        for i, n in enumerate(np.bincount(index, minlength=len(self.counts)).tolist()):
+            self.counts[i] += n
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def quantile(self, q, counts, total):
+        # Interpolation linéaire dans la case : précision de l'ordre de la largeur d'une case
+        bounds = [min(self.min, self.reference["min"]), *self.edges, max(self.max, self.reference["max"])]
+        target = q * total
+        cumulative = 0
+        for i, n in enumerate(counts):
+            if n and cumulative + n >= target:
+                return bounds[i] + (bounds[i + 1] - bounds[i]) * (target - cumulative) / n
+            cumulative += n
+        return bounds[-1]
+
+    def report(self):
+        counts = list(self.counts)
+        total = sum(counts)
+        if not total:
+            return {"rows": 0}
+        actual = np.asarray(counts) / total
+        score = psi(self.reference["proportions"], actual)
+        return {
+            "rows": total,
+            "psi": round(score, 4),
+            "ks": round(ks(self.reference["proportions"], actual), 4),
+            "status": psi_status(score),
+            "quantiles": {f"p{q}": round(self.quantile(q / 100, counts, total), 2) for q in (10, 50, 90)},
+            "reference_quantiles": self.reference["quantiles"],
+            "min": self.min,
+            "max": self.max,
+        }
+
+
+class CategorySketch:
+    """Compteur par modalité du profil ; les modalités inconnues partagent un compteur unique."""
+
+    def __init__(self, reference):
+        self.reference = reference["proportions"]
+        self.counts = dict.fromkeys(self.reference, 0)
+        self.other = 0
+
+    def add(self, value):
+        try:
+            self.counts[value] += 1
+        except KeyError:
+            self.other += 1
+
+    def add_many(self, values):
+        # factorize + bincount : pas de conversion ligne à ligne des chaînes en objets Python
+        codes, uniques = pd.factorize(values)
+        for value, n in zip(uniques.tolist(), np.bincount(codes[codes >= 0]).tolist()):
+            if value in self.counts:
+                self.counts[value] += n
+            else:
+                self.other += n
+
+    def report(self, top=5):
+        counts, other = dict(self.counts), self.other
+        total = sum(counts.values()) + other
+        if not total:
+            return {"rows": 0}
+        values = list(counts)
+        expected = [self.reference[v] for v in values] + [0.0]
+        actual = [counts[v] / total for v in values] + [other / total]
+        score = psi(expected, actual)
+        shifts = sorted(zip(values, expected, actual), key=lambda item: -abs(item[2] - item[1]))[:top]
+        return {
+            "rows": total,
+            "psi": round(score, 4),
+            "status": psi_status(score),
+            "unseen_share": round(other / total, 4),
+            "largest_shifts": [
+                {"value": value, "reference": round(e, 4), "live": round(a, 4)} for value, e, a in shifts
+            ],
+        }
+
+
+class DriftMonitor:
+    """Dérive des entrées et du prix prédit par rapport au profil d'entraînement du modèle actif.
+
+    Les esquisses ont une taille fixe (cases du profil, modalités connues) : le coût par
+    prédiction ne dépend ni du volume de trafic ni de sa durée. Les mises à jour sont
+    faites depuis la boucle asyncio uniquement, sans verrou ; `report` lit une copie des
+    compteurs. Les scores ne sont calculés qu'au-delà de `min_rows` lignes.
+    """
+
+    def __init__(self, min_rows=100):
+        self.min_rows = min_rows
+        self.revision = None
+        self.profile = None
+        self._bind_sketches({})
+
+    @property
+    def enabled(self):
+        return self.profile is not None
+
+    def _bind_sketches(self, profile):
+        self.numeric = {f: NumericSketch(r) for f, r in profile.get("numeric", {}).items() if f != PREDICTION}
+        self.categorical = {f: CategorySketch(r) for f, r in profile.get("categorical", {}).items()}
+        prediction = profile.get("numeric", {}).get(PREDICTION)
+        self.prediction = NumericSketch(prediction) if prediction else None
+        # Paires (feature, esquisse) parcourues à chaque prédiction
+        self._row_sketches = [*self.numeric.items(), *self.categorical.items()]
+        self.requests = 0
+        self.rows = 0
+        self.started = time.monotonic()
+
+    def bind(self, profile, revision):
+        """Associe le moniteur au profil d'un modèle ; un changement de modèle remet les compteurs à zéro."""
+        if revision == self.revision:
+            return
+        self.revision = revision
+        self.profile = profile
+        self._bind_sketches(profile or {})
+
+    def reset(self):
+        self._bind_sketches(self.profile or {})
+
+    def observe(self, row, price):
+        """Une prédiction unitaire : une mise à jour par feature surveillée."""
+        if self.profile is None:
+            return
+        self.requests += 1
+        self.rows += 1
+        for feature, sketch in self._row_sketches:
+            sketch.add(row[feature])
+        if self.prediction is not None:
+            self.prediction.add(price)
+
+    def observe_frame(self, df, prices):
+        """Un lot : mises à jour vectorisées par colonne."""
+        if self.profile is None:
+            return
+        self.requests += 1
+        self.rows += len(df)
+        for feature, sketch in self._row_sketches:
+            sketch.add_many(df[feature])
+        if self.prediction is not None:
+            self.prediction.add_many(prices)
+
+    def scores(self):
+        """{feature: (psi, ks ou None)} si assez de lignes ont été observées."""
+        if self.profile is None or self.rows < self.min_rows:
+            return {}
+        features = {**self.numeric, **self.categorical}
+        if self.prediction is not None:
+            features[PREDICTION] = self.prediction
+        reports = {feature: sketch.report() for feature, sketch in features.items()}
+        return {feature: (r["psi"], r.get("ks")) for feature, r in reports.items() if "psi" in r}
+
+    def report(self):
+        if self.profile is None:
+            return {"enabled": False}
+        elapsed = time.monotonic() - self.started
+        features = {
+            **{feature: sketch.report() for feature, sketch in self.numeric.items()},
+            **{feature: sketch.report() for feature, sketch in self.categorical.items()},
+        }
+        if self.prediction is not None:
+            features[PREDICTION] = self.prediction.report()
+        ready = self.rows >= self.min_rows
+        if not ready:
+            for feature in features.values():
+                for key in ("psi", "ks", "status"):
+                    feature.pop(key, None)
+        return {
+            "enabled": True,
+            "model_revision": self.revision,
+            "reference_rows": self.profile.get("rows"),
+            "min_rows": self.min_rows,
+            "ready": ready,
+            "traffic": {
+                "requests": self.requests,
+                "rows": self.rows,
+                "window_seconds": round(elapsed, 1),
+                "rows_per_second": round(self.rows / elapsed, 3) if elapsed > 0 else 0.0,
+            },
+            "features": features,
+        }
@@ -0,0 +1,20 @@
+# Service multi-workers : gunicorn -c gunicorn.conf.py app:app
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '7860')}"
+workers = int(os.getenv("WEB_CONCURRENCY", str(min(4, os.cpu_count() or 1))))
+worker_class = "uvicorn_worker.UvicornWorker"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+
+# Avec preload_app, le modèle est chargé une seule fois dans le master puis partagé
+# en copy-on-write par les workers forkés (pas de téléchargement ni de désérialisation par worker).
+# Sans preload, chaque worker charge l'artefact depuis MODEL_CACHE_DIR, téléchargé une seule fois.
+preload_app = os.getenv("GUNICORN_PRELOAD", "1").lower() in ("1", "true", "yes")
+
+
+def when_ready(server):
+    if preload_app:
+        import app
+
+        app.load_model()
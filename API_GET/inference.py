@@ -0,0 +1,126 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import joblib
+from getaround_formats import BUNDLE_SUFFIX
+
+from predictors import build_predictor, load_bundle_predictor, pipeline_vocabularies
+
+
+class LoadedModel:
+    """Modèle résident : pipeline sklearn (None pour un bundle), predictor utilisé pour l'inférence et artefact local.
+
+    `version` est le nom court utilisé pour le routage (`model_version`), `revision`
+    identifie le contenu exact de l'artefact (clé/chemin + ETag ou sha256). `profile` est
+    le profil de référence des entrées enregistré à l'entraînement (None si absent).
+    """
+
+    def __init__(self, pipeline, predictor, version, path, revision=None, source=None, profile=None):
+        self.pipeline = pipeline
+        self.predictor = predictor
+        self.version = version
+        self.path = path
+        self.revision = revision or version
+        self.source = source or path
+        self.profile = profile
+        self.loaded_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self._vocabularies = None
+
+    @property
+    def vocabularies(self):
+        # Catégories connues du modèle (OneHotEncoder), extraites au premier accès
+        if self._vocabularies is None:
+            self._vocabularies = (
+                pipeline_vocabularies(self.pipeline) if self.pipeline is not None else self.predictor.vocabularies
+            )
+        return self._vocabularies
+
+
+def load_pipeline(path):
+    # mmap_mode : les tableaux NumPy du pickle sont lus depuis le page cache, partagé entre processus
+    return joblib.load(path, mmap_mode="r")
+
+
+def load_predictor(path, features, mode="pipeline", tolerance=1e-3):
+    """(pipeline, predictor) de l'artefact : pickle joblib, ou bundle compact (pipeline None)."""
+    if path.endswith(BUNDLE_SUFFIX):
+        return None, load_bundle_predictor(path, tolerance, mode)
+    pipeline = load_pipeline(path)
+    return pipeline, build_predictor(pipeline, features, mode, tolerance)
+
+
+# === Côté processus de calcul (mode "process") ===
+_worker_settings = {}
+_worker_predictors = {}
+_MAX_WORKER_MODELS = 4
+
+
+def _init_worker(settings):
+    _worker_settings.update(settings)
+
+
+def _call_in_worker(revision, path, method, payload, with_timings):
+    predictor = _worker_predictors.get(revision)
+    if predictor is None:
+        # Chaque processus charge le modèle une fois, depuis l'artefact local partagé
+        predictor = _worker_predictors[revision] = load_predictor(path, **_worker_settings)[1]
+        while len(_worker_predictors) > _MAX_WORKER_MODELS:
+            del _worker_predictors[next(iter(_worker_predictors))]
+    if not with_timings:
+        return getattr(predictor, method)(payload), None
+    timings = {}
+    return getattr(predictor, method)(payload, timings), timings
+
+
+class InferencePool:
+    """Exécute l'inférence hors de la boucle asyncio, dans un pool de threads ou de processus.
+
+    En mode "thread", le predictor du modèle est appelé directement (XGBoost libère le GIL).
+    En mode "process", chaque processus charge le modèle depuis `LoadedModel.path`.
+    Les executors sont créés au premier appel, donc après le fork des workers gunicorn.
+    """
+
+    def __init__(self, kind="thread", workers=None, predictor_settings=None):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"INFERENCE_EXECUTOR inconnu : {kind}")
+        self.kind = kind
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.predictor_settings = predictor_settings or {}
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, initializer=_init_worker, initargs=(self.predictor_settings,)
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+        return self._executor
+
+    async def run(self, loaded, method, payload, timings=None):
+        """Appelle `loaded.predictor.<method>(payload)` ; `timings` reçoit la durée des étapes."""
+        loop = asyncio.get_running_loop()
+        if self.kind == "process":
+            result, worker_timings = await loop.run_in_executor(
+                self._get_executor(), _call_in_worker, loaded.revision, loaded.path, method, payload,
+                timings is not None,
+            )
+            for stage, seconds in (worker_timings or {}).items():
+                timings[stage] = timings.get(stage, 0.0) + seconds
+            return result
+        return await loop.run_in_executor(self._get_executor(), getattr(loaded.predictor, method), payload, timings)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def warm_up(self, loaded, rows):
+        # En mode "process", chaque processus charge le modèle au premier appel :
+        # on le fait avant de router du trafic vers cette version.
+        calls = self.workers if self.kind == "process" else 1
+        results = await asyncio.gather(*(self.run(loaded, "predict_records", rows) for _ in range(calls)))
+        return results[0]
@@ -0,0 +1,52 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par log ; les champs passés via `extra={"fields": {...}}` sont ajoutés tels quels."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "pid": record.process,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+_listener = None
+
+
+def _start_listener():
+    # L'écriture sur stderr se fait dans le thread du QueueListener : la boucle asyncio
+    # ne fait que déposer l'enregistrement dans une file, sans I/O bloquante.
+    global _listener
+    log_queue = queue.SimpleQueue()
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(JsonFormatter())
+    _listener = logging.handlers.QueueListener(log_queue, stream)
+    _listener.start()
+
+    logger = logging.getLogger("getaround")
+    logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    logger.propagate = False
+
+
+def configure_logging(level="INFO"):
+    if _listener is not None:
+        return
+    logging.getLogger("getaround").setLevel(level)
+    _start_listener()
+    atexit.register(lambda: _listener.stop())
+    # Le thread du listener ne survit pas au fork des workers gunicorn (preload_app)
+    os.register_at_fork(after_in_child=_start_listener)
@@ -0,0 +1,431 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+import warnings
+import zipfile
+
+import numpy as np
+import pandas as pd
+from getaround_formats import (BUNDLE_MANIFEST, check_manifest, column_transformer, parity_sample,
+                               preprocessing_manifest, python_value, single_step)
+from sklearn.preprocessing import OneHotEncoder
+
+logger = logging.getLogger("getaround.predictors")
+
+
+def _record(timings, stage, start):
+    # `timings` (optionnel) accumule la durée de chaque étape : dataframe, preprocess, inference
+    now = time.perf_counter()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + now - start
+    return now
+
+
+class PipelinePredictor:
+    """Prédiction via le pipeline sklearn complet (ColumnTransformer + XGBRegressor)."""
+
+    name = "pipeline"
+
+    def __init__(self, pipeline, features):
+        self.pipeline = pipeline
+        self.features = features
+        # Équivalent à pipeline.predict, en deux temps pour mesurer chaque étape
+        self.preprocessor, self.regressor = pipeline[:-1], pipeline[-1]
+
+    def predict_frame(self, df, timings=None):
+        start = time.perf_counter()
+        X = self.preprocessor.transform(df[self.features])
+        start = _record(timings, "preprocess", start)
+        prediction = np.asarray(self.regressor.predict(X), dtype=np.float64)
+        _record(timings, "inference", start)
+        return prediction
+
+    def predict_records(self, records, timings=None):
+        start = time.perf_counter()
+        df = pd.DataFrame.from_records(records, columns=self.features)
+        _record(timings, "dataframe", start)
+        return self.predict_frame(df, timings)
+
+
+def pipeline_vocabularies(pipeline):
+    """Catégories vues à l'entraînement par chaque OneHotEncoder du pipeline, par feature."""
+    vocabularies = {}
+    for name, transformer, features in column_transformer(pipeline).transformers_:
+        if name == "remainder" or transformer == "drop":
+            continue
+        step = single_step(transformer)
+        if isinstance(step, OneHotEncoder):
+            for feature, categories in zip(features, step.categories_):
+                vocabularies[feature] = [python_value(c) for c in categories]
+    return vocabularies
+
+
+class CompiledPredictor:
+    """Inférence rapide sans pandas ni ColumnTransformer.
+
+    Les paramètres du prétraitement (moyennes/écarts du StandardScaler, vocabulaires
+    du OneHotEncoder) sont extraits une fois du pipeline entraîné ; à chaque requête
+    les entrées sont encodées directement dans une matrice NumPy envoyée à
+    `Booster.inplace_predict`.
+
+    `numeric` : liste de (feature, colonne, moyenne, écart-type).
+    `categorical` : liste de (feature, {valeur: colonne}) ; une valeur absente du
+    dict (catégorie supprimée par `drop` ou inconnue) n'active aucune colonne.
+    `vocabularies` : toutes les catégories vues à l'entraînement, y compris celles
+    supprimées par `drop`.
+    `zero_as_missing` : vrai quand le ColumnTransformer produit une matrice creuse,
+    XGBoost traite alors les zéros non stockés comme des valeurs manquantes.
+    """
+
+    name = "compiled"
+
+    def __init__(self, booster, numeric, categorical, vocabularies, n_columns, zero_as_missing,
+                 iteration_range=(0, 0)):
+        self.booster = booster
+        self.numeric = numeric
+        self.categorical = categorical
+        self.vocabularies = vocabularies
+        self.n_columns = n_columns
+        self.zero_as_missing = zero_as_missing
+        self.iteration_range = iteration_range
+        self.fill_value = np.nan if zero_as_missing else 0.0
+        self._local = threading.local()
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        return cls.from_bundle(preprocessing_manifest(pipeline), pipeline[-1].get_booster())
+
+    @classmethod
+    def from_bundle(cls, manifest, booster):
+        """Predictor décrit par un manifest de prétraitement (getaround_formats.preprocessing_manifest)."""
+        numeric, categorical, vocabularies = [], [], {}
+        column = 0
+        for transformer in manifest["transformers"]:
+            if transformer["kind"] == "standard_scaler":
+                for feature, mean, scale in zip(transformer["features"], transformer["mean"], transformer["scale"]):
+                    numeric.append((feature, column, float(mean), float(scale)))
+                    column += 1
+            elif transformer["kind"] == "one_hot":
+                for feature, categories, dropped in zip(transformer["features"], transformer["categories"], transformer["drop"]):
+                    vocabularies[feature] = list(categories)
+                    lookup = {}
+                    for i, category in enumerate(categories):
+                        if dropped is not None and i == dropped:
+                            continue
+                        lookup[category] = column
+                        column += 1
+                    categorical.append((feature, lookup))
+            else:
+                raise ValueError(f"Transformer de bundle inconnu : {transformer['kind']}")
+        return cls(
+            booster=booster,
+            numeric=numeric,
+            categorical=categorical,
+            vocabularies=vocabularies,
+            n_columns=column,
+            zero_as_missing=bool(manifest["zero_as_missing"]),
+            iteration_range=tuple(manifest["iteration_range"]),
+        )
+
+    def _row_buffer(self):
+        # Ligne préallouée par thread pour le chemin /predict unitaire
+        buffer = getattr(self._local, "row", None)
+        if buffer is None:
+            buffer = self._local.row = np.empty((1, self.n_columns), dtype=np.float32)
+        return buffer
+
+    def encode_records(self, records):
+        X = self._row_buffer() if len(records) == 1 else np.empty((len(records), self.n_columns), dtype=np.float32)
+        X.fill(self.fill_value)
+        for i, record in enumerate(records):
+            row = X[i]
+            for feature, column, mean, scale in self.numeric:
+                value = (record[feature] - mean) / scale
+                if value != 0 or not self.zero_as_missing:
+                    row[column] = value
+            for feature, lookup in self.categorical:
+                column = lookup.get(record[feature])
+                if column is not None:
+                    row[column] = 1.0
+        return X
+
+    def encode_columns(self, columns):
+        n = len(columns[self.numeric[0][0]] if self.numeric else columns[self.categorical[0][0]])
+        X = np.zeros((n, self.n_columns), dtype=np.float64)
+        for feature, column, mean, scale in self.numeric:
+            X[:, column] = (np.asarray(columns[feature], dtype=np.float64) - mean) / scale
+        rows = np.arange(n)
+        for feature, lookup in self.categorical:
+            # Une recherche par valeur distincte ; le code -1 de factorize (valeur manquante) tombe sur la sentinelle finale
+            codes, uniques = pd.factorize(np.asarray(columns[feature]))
+            columns_of = np.array([lookup.get(python_value(value), -1) for value in uniques] + [-1], dtype=np.int64)
+            index = columns_of[codes]
+            hit = index >= 0
+            X[rows[hit], index[hit]] = 1.0
+        X = X.astype(np.float32)
+        if self.zero_as_missing:
+            X[X == 0] = np.nan
+        return X
+
+    def _predict_matrix(self, X, timings=None):
+        start = time.perf_counter()
+        prediction = self.booster.inplace_predict(X, missing=np.nan, iteration_range=self.iteration_range)
+        prediction = np.asarray(prediction, dtype=np.float64).reshape(-1)
+        _record(timings, "inference", start)
+        return prediction
+
+    def predict_records(self, records, timings=None):
+        start = time.perf_counter()
+        X = self.encode_records(records)
+        _record(timings, "preprocess", start)
+        return self._predict_matrix(X, timings)
+
+    def predict_frame(self, df, timings=None):
+        start = time.perf_counter()
+        X = self.encode_columns({f: df[f].to_numpy() for f, *_ in self.numeric + self.categorical})
+        _record(timings, "preprocess", start)
+        return self._predict_matrix(X, timings)
+
+
+def _tree_depth(tree):
+    # Profondeur réelle (les arbres "lossguide" ne sont pas équilibrés)
+    left, right = tree["left_children"], tree["right_children"]
+    depth, level = 0, [0]
+    while True:
+        level = [child for node in level if left[node] >= 0 for child in (left[node], right[node])]
+        if not level:
+            return depth
+        depth += 1
+
+
+class TreeEnsemblePredictor(CompiledPredictor):
+    """Arbres du booster aplatis en tableaux NumPy, évalués pour toutes les lignes et tous les arbres à la fois.
+
+    Équivalent sans dépendance d'un ensemble d'arbres compilé (style treelite) : même
+    encodage que CompiledPredictor, puis `max_depth` étapes de parcours vectorisées.
+    Les feuilles pointent sur elles-mêmes ; une valeur manquante suit `default_left`.
+    """
+
+    name = "trees"
+
+    @classmethod
+    def from_compiled(cls, compiled):
+        predictor = cls(compiled.booster, compiled.numeric, compiled.categorical, compiled.vocabularies,
+                        compiled.n_columns, compiled.zero_as_missing, compiled.iteration_range)
+        model = json.loads(compiled.booster.save_raw(raw_format="json"))["learner"]
+        if model["objective"]["name"] != "reg:squarederror" or model["gradient_booster"]["name"] != "gbtree":
+            raise ValueError(f"Modèle non supporté : {model['objective']['name']} / {model['gradient_booster']['name']}")
+        trees = model["gradient_booster"]["model"]["trees"]
+        if compiled.iteration_range[1] > 0:
+            trees = trees[:compiled.iteration_range[1]]
+
+        left, right, feature, threshold, default_left, value, roots = [], [], [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            if any(tree["split_type"]):
+                raise ValueError("Splits catégoriels XGBoost non supportés")
+            children = np.asarray(tree["left_children"], dtype=np.int64)
+            nodes = np.arange(len(children))
+            leaf = children < 0
+            left.append(np.where(leaf, nodes, children) + offset)
+            right.append(np.where(leaf, nodes, np.asarray(tree["right_children"], dtype=np.int64)) + offset)
+            feature.append(np.where(leaf, 0, np.asarray(tree["split_indices"], dtype=np.int64)))
+            conditions = np.asarray(tree["split_conditions"], dtype=np.float32)
+            # Pour une feuille, split_conditions contient la valeur de la feuille
+            threshold.append(np.where(leaf, np.float32(np.inf), conditions))
+            value.append(np.where(leaf, conditions, np.float32(0)))
+            default_left.append(np.asarray(tree["default_left"], dtype=bool))
+            roots.append(offset)
+            offset += len(children)
+
+        predictor.left, predictor.right = np.concatenate(left), np.concatenate(right)
+        predictor.feature, predictor.threshold = np.concatenate(feature), np.concatenate(threshold)
+        predictor.default_left, predictor.value = np.concatenate(default_left), np.concatenate(value)
+        predictor.roots = np.asarray(roots, dtype=np.int64)
+        predictor.depth = max(_tree_depth(tree) for tree in trees)
+        predictor.base_score = float(str(model["learner_model_param"]["base_score"]).strip("[]"))
+        return predictor
+
+    def _predict_matrix(self, X, timings=None):
+        start = time.perf_counter()
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.depth):
+            x = X[rows, self.feature[node]]
+            go_left = np.where(np.isnan(x), self.default_left[node], x < self.threshold[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+        prediction = self.value[node].sum(axis=1, dtype=np.float64) + self.base_score
+        _record(timings, "inference", start)
+        return prediction
+
+
+class OnnxPredictor(CompiledPredictor):
+    """Booster converti en ONNX (onnxmltools) et exécuté par ONNX Runtime sur CPU, un thread par appel.
+
+    Seul l'ensemble d'arbres est converti : l'encodage des entrées reste celui de CompiledPredictor.
+    Dépendances optionnelles : onnxruntime, onnxmltools.
+    """
+
+    name = "onnx"
+
+    @classmethod
+    def from_compiled(cls, compiled):
+        import onnxruntime
+        from onnxmltools import convert_xgboost
+        from onnxmltools.convert.common.data_types import FloatTensorType
+
+        predictor = cls(compiled.booster, compiled.numeric, compiled.categorical, compiled.vocabularies,
+                        compiled.n_columns, compiled.zero_as_missing, compiled.iteration_range)
+        booster = compiled.booster
+        if compiled.iteration_range[1] > 0:
+            booster = booster[compiled.iteration_range[0]:compiled.iteration_range[1]]
+        model = convert_xgboost(booster, initial_types=[("input", FloatTensorType([None, compiled.n_columns]))])
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = 1
+        options.inter_op_num_threads = 1
+        predictor.session = onnxruntime.InferenceSession(
+            model.SerializeToString(), options, providers=["CPUExecutionProvider"]
+        )
+        predictor.input_name = predictor.session.get_inputs()[0].name
+        return predictor
+
+    def _predict_matrix(self, X, timings=None):
+        start = time.perf_counter()
+        prediction = self.session.run(None, {self.input_name: X})[0]
+        prediction = np.asarray(prediction, dtype=np.float64).reshape(-1)
+        _record(timings, "inference", start)
+        return prediction
+
+
+# Backends construits à partir du CompiledPredictor (même encodage, moteur d'arbres différent).
+# INFERENCE_MODE : "pipeline", l'un de ces backends, ou "auto" (le plus rapide qui passe le contrôle de parité).
+BACKENDS = {
+    "compiled": lambda compiled: compiled,
+    "trees": TreeEnsemblePredictor.from_compiled,
+    "onnx": OnnxPredictor.from_compiled,
+}
+INFERENCE_MODES = ("pipeline", *BACKENDS, "auto")
+
+
+def check_parity(reference, candidate, df, tolerance):
+    """Écart absolu maximal entre deux predictors ; lève une erreur au-delà de `tolerance`."""
+    with warnings.catch_warnings():
+        # L'échantillon contient volontairement une catégorie inconnue
+        warnings.simplefilter("ignore", UserWarning)
+        expected = reference.predict_frame(df)
+    return check_expected(candidate, df, expected, tolerance)
+
+
+def check_expected(candidate, df, expected, tolerance):
+    """Comme check_parity, contre des prédictions de référence déjà calculées."""
+    max_error = float(np.max(np.abs(candidate.predict_frame(df) - expected)))
+    single = candidate.predict_records(df.head(1).to_dict("records"))
+    max_error = max(max_error, float(np.max(np.abs(single - expected[:1]))))
+    if not max_error <= tolerance:
+        raise ValueError(f"Écart {max_error:.2e} supérieur à la tolérance {tolerance:.0e}")
+    return max_error
+
+
+def read_bundle(path):
+    """(manifest, booster) d'un bundle ; le booster est vérifié par son sha256."""
+    import xgboost
+
+    with zipfile.ZipFile(path) as archive:
+        manifest = check_manifest(json.loads(archive.read(BUNDLE_MANIFEST)))
+        raw = archive.read(manifest["booster"]["file"])
+    if hashlib.sha256(raw).hexdigest() != manifest["booster"]["sha256"]:
+        raise ValueError(f"sha256 du booster invalide dans {path}")
+    booster = xgboost.Booster()
+    booster.load_model(bytearray(raw))
+    # L'API prédit surtout ligne par ligne : un seul thread XGBoost par prédiction (comme model.py)
+    booster.set_param({"nthread": 1})
+    return manifest, booster
+
+
+def _backend_modes(mode):
+    if mode not in INFERENCE_MODES:
+        raise ValueError(f"INFERENCE_MODE inconnu : {mode} (attendu : {', '.join(INFERENCE_MODES)})")
+    return list(BACKENDS) if mode == "auto" else [mode]
+
+
+def single_row_latency(predictor, df, repeat=50):
+    """Latence médiane (s) d'une prédiction unitaire, après préchauffage."""
+    rows = df.head(1).to_dict("records")
+    for _ in range(10):
+        predictor.predict_records(rows)
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        predictor.predict_records(rows)
+        durations.append(time.perf_counter() - start)
+    return float(np.median(durations))
+
+
+def select_backend(compiled, modes, df, expected, tolerance, candidates=()):
+    """Construit les backends `modes`, écarte ceux hors tolérance et renvoie le plus rapide en unitaire.
+
+    `candidates` : predictors déjà validés mis en concurrence (ex. pipeline sklearn).
+    Renvoie None si aucun predictor n'est disponible.
+    """
+    valid = list(candidates)
+    for mode in modes:
+        try:
+            predictor = BACKENDS[mode](compiled)
+            max_error = check_expected(predictor, df, expected, tolerance)
+        except Exception as e:
+            # Convertisseur absent (ImportError), modèle non supporté ou parité insuffisante
+            logger.warning("Backend indisponible", extra={"fields": {"backend": mode, "error": str(e)}})
+            continue
+        logger.info("Backend valide", extra={"fields": {"backend": mode, "max_parity_error": max_error}})
+        valid.append(predictor)
+    if len(valid) <= 1:
+        return valid[0] if valid else None
+    latencies = {predictor.name: single_row_latency(predictor, df) for predictor in valid}
+    best = min(valid, key=lambda predictor: latencies[predictor.name])
+    logger.info("Backend sélectionné", extra={"fields": {
+        "backend": best.name, "single_row_us": {name: round(s * 1e6, 1) for name, s in latencies.items()},
+    }})
+    return best
+
+
+def load_bundle_predictor(path, tolerance=1e-3, mode="compiled"):
+    """Predictor d'un bundle, contrôlé sur l'échantillon du pipeline d'origine enregistré à l'export.
+
+    Sans pipeline sklearn, le mode "pipeline" correspond au CompiledPredictor, qui sert
+    aussi de repli si le backend demandé est indisponible.
+    """
+    manifest, booster = read_bundle(path)
+    compiled = CompiledPredictor.from_bundle(manifest, booster)
+    parity = manifest["parity"]
+    df, expected = pd.DataFrame(parity["columns"]), np.asarray(parity["predictions"])
+    max_error = check_expected(compiled, df, expected, tolerance)
+    logger.info("Bundle chargé", extra={"fields": {"path": path, "max_parity_error": max_error}})
+    modes = [m for m in _backend_modes(mode) if m != "compiled"] if mode != "pipeline" else []
+    return select_backend(compiled, modes, df, expected, tolerance, [compiled]) if modes else compiled
+
+
+def build_predictor(pipeline, features, mode="pipeline", tolerance=1e-3):
+    """Predictor pour le mode demandé ; retombe sur le pipeline sklearn si aucun backend n'est disponible."""
+    reference = PipelinePredictor(pipeline, features)
+    if mode == "pipeline":
+        return reference
+    modes = _backend_modes(mode)
+    try:
+        preprocessing = preprocessing_manifest(pipeline)
+        compiled = CompiledPredictor.from_bundle(preprocessing, pipeline[-1].get_booster())
+        df = parity_sample(preprocessing)
+        with warnings.catch_warnings():
+            # L'échantillon contient volontairement une catégorie inconnue
+            warnings.simplefilter("ignore", UserWarning)
+            expected = reference.predict_frame(df)
+    except Exception as e:
+        logger.warning("Mode compilé indisponible, retour au pipeline sklearn", extra={"fields": {"error": str(e)}})
+        return reference
+    predictor = select_backend(compiled, modes, df, expected, tolerance, [reference] if mode == "auto" else [])
+    if predictor is None:
+        logger.warning("Backend indisponible, retour au pipeline sklearn", extra={"fields": {"mode": mode}})
+        return reference
+    logger.info("Predictor actif", extra={"fields": {"backend": predictor.name}})
+    return predictor
@@ -0,0 +1,125 @@
+import os
+import threading
+
+import numpy as np
+from getaround_formats import artifact_stem
+
+
+def version_name(source):
+    """Nom de version court : le run_id pour `xgboost_model_{run_id}.joblib` (ou .bundle.zip), sinon le nom du fichier."""
+    name = os.path.basename(source)
+    stem = artifact_stem(name)
+    name = stem if stem != name else os.path.splitext(name)[0]
+    prefix = "xgboost_model_"
+    return name[len(prefix):] if name.startswith(prefix) and len(name) > len(prefix) else name
+
+
+class ShadowStats:
+    """Écarts entre le modèle actif et le modèle shadow sur le trafic réel."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.rows = 0
+            self.abs_diff_sum = 0.0
+            self.abs_diff_max = 0.0
+            self.diff_sum = 0.0
+
+    def record(self, primary, shadow):
+        diff = np.asarray(shadow, dtype=np.float64) - np.asarray(primary, dtype=np.float64)
+        with self._lock:
+            self.rows += len(diff)
+            self.diff_sum += float(diff.sum())
+            self.abs_diff_sum += float(np.abs(diff).sum())
+            self.abs_diff_max = max(self.abs_diff_max, float(np.abs(diff).max(initial=0.0)))
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "rows": self.rows,
+                "mean_diff": round(self.diff_sum / self.rows, 4) if self.rows else 0.0,
+                "mean_abs_diff": round(self.abs_diff_sum / self.rows, 4) if self.rows else 0.0,
+                "max_abs_diff": round(self.abs_diff_max, 4),
+            }
+
+
+class ModelRegistry:
+    """Modèles résidents indexés par version.
+
+    `active` sert les requêtes sans `model_version` ; `shadow` (optionnel) est évalué
+    en arrière-plan sur le même trafic pour comparaison. Le remplacement du modèle
+    actif est une simple affectation de référence : une requête en cours garde le
+    LoadedModel qu'elle a lu au départ jusqu'à sa fin.
+    """
+
+    def __init__(self, max_models=3):
+        self.max_models = max_models
+        self.active = None
+        self.shadow = None
+        self.shadow_stats = ShadowStats()
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def get(self, version=None):
+        if version is None:
+            if self.active is None:
+                raise LookupError("Aucun modèle actif")
+            return self.active
+        try:
+            return self._models[version]
+        except KeyError:
+            raise LookupError(f"Version de modèle inconnue : {version}") from None
+
+    def add(self, loaded, activate=False):
+        with self._lock:
+            self._models[loaded.version] = loaded
+            # Rechargement d'une version déjà active/shadow : la nouvelle copie la remplace
+            if activate or (self.active is not None and self.active.version == loaded.version):
+                self.active = loaded
+            if self.shadow is not None and self.shadow.version == loaded.version:
+                self.shadow = loaded
+            self._evict()
+
+    def set_shadow(self, version):
+        with self._lock:
+            self.shadow = self.get(version) if version is not None else None
+        self.shadow_stats.reset()
+        return self.shadow
+
+    def remove(self, version):
+        with self._lock:
+            loaded = self.get(version)
+            if loaded is self.active:
+                raise ValueError("Impossible de supprimer le modèle actif")
+            if loaded is self.shadow:
+                self.shadow = None
+            del self._models[version]
+
+    def _evict(self):
+        # Au-delà de max_models, on retire les plus anciens modèles ni actifs ni shadow
+        for version in list(self._models):
+            if len(self._models) <= self.max_models:
+                break
+            loaded = self._models[version]
+            if loaded is not self.active and loaded is not self.shadow:
+                del self._models[version]
+
+    def describe(self):
+        return {
+            "active": self.active.version if self.active is not None else None,
+            "shadow": self.shadow.version if self.shadow is not None else None,
+            "shadow_stats": self.shadow_stats.snapshot(),
+            "models": [
+                {
+                    "version": loaded.version,
+                    "revision": loaded.revision,
+                    "source": loaded.source,
+                    "predictor": loaded.predictor.name,
+                    "loaded_at": loaded.loaded_at,
+                }
+                for loaded in self._models.values()
+            ],
+        }
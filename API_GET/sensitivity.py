@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+# Analyse de sensibilité : variantes d'une configuration de base, générées côté serveur
+# sous forme de colonnes NumPy puis prédites en un seul appel au modèle.
+#
+# - "one_at_a_time" : chaque feature varie seule, les autres restent à la valeur de base ;
+#   la réponse donne, par feature, la courbe de prix et l'écart au prix de base ;
+# - "grid" : produit cartésien des valeurs de toutes les features demandées.
+#
+# La ligne 0 de la matrice est toujours la configuration de base.
+
+MODES = ("one_at_a_time", "grid")
+
+
+def numeric_values(start, stop, steps):
+    """Valeurs entières régulièrement espacées de start à stop (doublons supprimés)."""
+    return np.unique(np.linspace(start, stop, steps).round().astype(np.int64))
+
+
+def categorical_values(feature, base_value, vocabularies):
+    """Toutes les catégories connues du modèle pour `feature` (False/True pour un booléen)."""
+    if isinstance(base_value, bool):
+        return np.array([False, True])
+    vocabulary = vocabularies.get(feature)
+    if not vocabulary:
+        raise ValueError(f"Aucune catégorie connue du modèle pour '{feature}'")
+    return np.array(vocabulary, dtype=object)
+
+
+class SensitivityPlan:
+    """Matrice des variantes de `base` et lecture des prix prédits.
+
+    `axes` : {feature: valeurs}, dans l'ordre de la requête.
+    """
+
+    def __init__(self, base, features, axes, mode="one_at_a_time"):
+        if mode not in MODES:
+            raise ValueError(f"Mode inconnu : {mode}")
+        if not axes:
+            raise ValueError("Aucune feature à faire varier")
+        self.base = base
+        self.features = features
+        self.axes = axes
+        self.mode = mode
+
+    @classmethod
+    def from_request(cls, base, features, numeric, categorical, vocabularies, mode="one_at_a_time"):
+        """`numeric` : {feature: (start, stop, steps)} ; `categorical` : features à parcourir entièrement."""
+        axes = {feature: numeric_values(*bounds) for feature, bounds in numeric.items()}
+        for feature in categorical:
+            if feature in axes:
+                raise ValueError(f"'{feature}' demandée deux fois")
+            axes[feature] = categorical_values(feature, base[feature], vocabularies)
+        return cls(base, features, axes, mode)
+
+    @property
+    def size(self):
+        lengths = [len(values) for values in self.axes.values()]
+        return 1 + (int(np.prod(lengths)) if self.mode == "grid" else sum(lengths))
+
+    def frame(self):
+        n = self.size
+        columns = {}
+        for feature in self.features:
+            value = self.base[feature]
+            columns[feature] = np.full(n, value, dtype=object if isinstance(value, str) else type(value))
+
+        if self.mode == "grid":
+            mesh = np.meshgrid(*self.axes.values(), indexing="ij")
+            for feature, values in zip(self.axes, mesh):
+                columns[feature][1:] = values.ravel()
+        else:
+            start = 1
+            for feature, values in self.axes.items():
+                columns[feature][start:start + len(values)] = values
+                start += len(values)
+        return pd.DataFrame(columns, columns=self.features)
+
+    def summarize(self, prices):
+        """Réponse JSON : prix de base, courbes et écarts par feature (ou grille complète)."""
+        prices = np.round(np.asarray(prices, dtype=np.float64), 2)
+        base_price = float(prices[0])
+        result = {"mode": self.mode, "count": self.size, "base_price": base_price}
+
+        if self.mode == "grid":
+            result["grid"] = {
+                "features": list(self.axes),
+                "values": {feature: values.tolist() for feature, values in self.axes.items()},
+                "shape": [len(values) for values in self.axes.values()],
+                # Ordre C : la dernière feature varie le plus vite
+                "predicted_price_per_day": prices[1:].tolist(),
+            }
+            return result
+
+        curves, start = {}, 1
+        for feature, values in self.axes.items():
+            curve = prices[start:start + len(values)]
+            start += len(values)
+            curves[feature] = {
+                "values": values.tolist(),
+                "predicted_price_per_day": curve.tolist(),
+                "delta": np.round(curve - base_price, 2).tolist(),
+                "min": float(curve.min()),
+                "max": float(curve.max()),
+                "best_value": values.tolist()[int(np.argmax(curve))],
+            }
+        result["features"] = curves
+        # Features classées par amplitude de l'effet sur le prix
+        result["impact"] = sorted(
+            ({"feature": f, "range": round(c["max"] - c["min"], 2)} for f, c in curves.items()),
+            key=lambda item: -item["range"],
+        )
+        return result
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modules de l'API importables sans installation (dossier plat, comme `uvicorn app:app`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
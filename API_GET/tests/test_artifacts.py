@@ -0,0 +1,66 @@
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+from artifacts import ArtifactCache
+
+BUCKET = "getaround-models"
+KEY = "models/xgboost_model_abc.joblib"
+
+
+@pytest.fixture
+def s3():
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        client.put_object(Bucket=BUCKET, Key=KEY, Body=b"v1")
+        yield client
+
+
+@pytest.fixture
+def downloads(s3, monkeypatch):
+    calls = []
+    download_file = s3.download_file
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return download_file(*args, **kwargs)
+
+    monkeypatch.setattr(s3, "download_file", counting)
+    return calls
+
+
+def test_cache_hit_skips_download(s3, downloads, tmp_path):
+    cache = ArtifactCache(s3, str(tmp_path))
+    first = cache.fetch(BUCKET, KEY)
+    second = cache.fetch(BUCKET, KEY)
+    assert first == second
+    assert len(downloads) == 1
+    with open(first[0], "rb") as f:
+        assert f.read() == b"v1"
+
+
+def test_etag_change_downloads_again(s3, downloads, tmp_path):
+    cache = ArtifactCache(s3, str(tmp_path))
+    _, old_version = cache.fetch(BUCKET, KEY)
+    s3.put_object(Bucket=BUCKET, Key=KEY, Body=b"v2")
+    path, version = cache.fetch(BUCKET, KEY)
+    assert version != old_version
+    assert len(downloads) == 2
+    with open(path, "rb") as f:
+        assert f.read() == b"v2"
+
+
+def test_offline_uses_cached_copy(s3, tmp_path):
+    cache = ArtifactCache(s3, str(tmp_path))
+    expected = cache.fetch(BUCKET, KEY)
+    # Objet inaccessible : head_object lève une ClientError, comme un S3 injoignable
+    s3.delete_object(Bucket=BUCKET, Key=KEY)
+    assert cache.fetch(BUCKET, KEY) == expected
+
+
+def test_offline_without_cache_raises(s3, tmp_path):
+    s3.delete_object(Bucket=BUCKET, Key=KEY)
+    with pytest.raises(ClientError):
+        ArtifactCache(s3, str(tmp_path)).fetch(BUCKET, KEY)
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+from getaround_formats import UNKNOWN_CATEGORY, parity_sample, preprocessing_manifest
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from xgboost import XGBRegressor
+
+from predictors import BACKENDS, CompiledPredictor, PipelinePredictor, check_parity
+
+NUMERIC = ["mileage", "engine_power"]
+CATEGORICAL = ["model_key", "fuel", "has_gps"]
+
+
+def _pipeline():
+    # Même structure que MLFLOW_GET/pipeline.py, sur un petit jeu synthétique
+    rng = np.random.default_rng(0)
+    size = 300
+    X = pd.DataFrame({
+        "mileage": rng.integers(0, 300_000, size),
+        "engine_power": rng.integers(60, 250, size),
+        "model_key": rng.choice(["Citroën", "Peugeot", "Renault", "BMW"], size),
+        "fuel": rng.choice(["diesel", "petrol"], size),
+        "has_gps": rng.choice([False, True], size),
+    })
+    y = 100 + X["engine_power"] * 0.5 - X["mileage"] / 10_000 + np.where(X["has_gps"], 10, 0)
+    pipeline = Pipeline(steps=[
+        ("preprocessor", ColumnTransformer(transformers=[
+            ("num", Pipeline(steps=[("scaler", StandardScaler())]), NUMERIC),
+            ("cat", Pipeline(steps=[("encoder", OneHotEncoder(drop="if_binary", handle_unknown="ignore"))]),
+             CATEGORICAL),
+        ])),
+        ("xgboost_best", XGBRegressor(n_estimators=20, max_depth=3, n_jobs=1)),
+    ])
+    return pipeline.fit(X, y)
+
+
+@pytest.mark.parametrize("backend", list(BACKENDS))
+def test_backend_matches_pipeline(backend):
+    pipeline = _pipeline()
+    compiled = CompiledPredictor.from_pipeline(pipeline)
+    try:
+        predictor = BACKENDS[backend](compiled)
+    except ImportError as e:
+        pytest.skip(f"{backend} indisponible : {e}")
+    df = parity_sample(preprocessing_manifest(pipeline))
+    assert df["model_key"].eq(UNKNOWN_CATEGORY).any()
+    assert check_parity(PipelinePredictor(pipeline, NUMERIC + CATEGORICAL), predictor, df, 1e-3) <= 1e-3
@@ -0,0 +1,181 @@
+import hashlib
+import io
+import json
+import os
+import time
+import uuid
+
+import joblib
+
+# Backends de suivi des runs (tracking) et de stockage des modèles.
+# Les imports mlflow/boto3 sont faits à la demande : le mode hors-ligne n'en dépend pas.
+
+
+# === Tracking ===
+class FileRun:
+   def __init__(self, run_dir, run_id):
+      self.run_dir = run_dir
+      self.run_id = run_id
+      self.data = {"run_id": run_id, "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "params": {}, "metrics": {}}
+
+   def log_params(self, params):
+      self.data["params"].update({k: _jsonable(v) for k, v in params.items()})
+
+   def log_metrics(self, metrics):
+      self.data["metrics"].update({k: float(v) for k, v in metrics.items()})
+
+   def log_dict(self, payload, name):
+      with open(os.path.join(self.run_dir, name), "w") as f:
+         json.dump(payload, f, indent=2, default=_jsonable)
+
+   def set_tag(self, key, value):
+      self.data.setdefault("tags", {})[key] = value
+
+   def close(self):
+      self.data["ended_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+      self.log_dict(self.data, "run.json")
+
+
+class FileTracker:
+   """Runs enregistrés en JSON sous `root/<experiment>/<run_id>/run.json`."""
+
+   name = "file"
+
+   def __init__(self, root, experiment):
+      self.root = root
+      self.experiment = experiment
+
+   def describe(self):
+      return os.path.abspath(os.path.join(self.root, self.experiment))
+
+   def start_run(self):
+      run_id = uuid.uuid4().hex
+      run_dir = os.path.join(self.root, self.experiment, run_id)
+      os.makedirs(run_dir, exist_ok=True)
+      return FileRun(run_dir, run_id)
+
+
+class MlflowRun:
+   def __init__(self, mlflow, active_run):
+      self.mlflow = mlflow
+      self.active_run = active_run
+      self.run_id = active_run.info.run_id
+
+   def log_params(self, params):
+      self.mlflow.log_params({k: _jsonable(v) for k, v in params.items()})
+
+   def log_metrics(self, metrics):
+      self.mlflow.log_metrics({k: float(v) for k, v in metrics.items()})
+
+   def log_dict(self, payload, name):
+      self.mlflow.log_dict(json.loads(json.dumps(payload, default=_jsonable)), name)
+
+   def set_tag(self, key, value):
+      self.mlflow.set_tag(key, value)
+
+   def close(self):
+      self.mlflow.end_run()
+
+
+class MlflowTracker:
+   """Serveur MLflow distant (BACKEND_STORE_URI) ou store local `file:./mlruns`."""
+
+   name = "mlflow"
+
+   def __init__(self, tracking_uri, experiment):
+      if tracking_uri.startswith("file:"):
+         # Les versions récentes de MLflow refusent le store fichier sans cette option
+         os.environ.setdefault("MLFLOW_ALLOW_FILE_STORE", "true")
+      import mlflow
+
+      self.mlflow = mlflow
+      mlflow.set_tracking_uri(tracking_uri)
+      mlflow.set_experiment(experiment)
+
+   def describe(self):
+      return self.mlflow.get_tracking_uri()
+
+   def start_run(self):
+      return MlflowRun(self.mlflow, self.mlflow.start_run())
+
+
+def get_tracker(kind, uri, experiment):
+   if kind == "file":
+      return FileTracker(uri or "runs", experiment)
+   if kind == "mlflow":
+      return MlflowTracker(uri or os.getenv("BACKEND_STORE_URI") or "file:./mlruns", experiment)
+   raise ValueError(f"Backend de tracking inconnu : {kind}")
+
+
+# === Stockage des modèles ===
+def _dump(model):
+   buffer = io.BytesIO()
+   joblib.dump(model, buffer)
+   return buffer.getvalue()
+
+
+class LocalStorage:
+   name = "local"
+
+   def __init__(self, directory):
+      self.directory = directory
+
+   def save(self, model, filename):
+      return self.save_bytes(_dump(model), filename)
+
+   def save_bytes(self, body, filename):
+      os.makedirs(self.directory, exist_ok=True)
+      path = os.path.join(self.directory, filename)
+      with open(path + ".tmp", "wb") as f:
+         f.write(body)
+      os.replace(path + ".tmp", path)
+      return os.path.abspath(path), hashlib.sha256(body).hexdigest()
+
+
+class S3Storage:
+   name = "s3"
+
+   def __init__(self, bucket, prefix="mlflow/models/"):
+      import boto3
+
+      if not bucket:
+         raise ValueError("S3_BUCKET non défini")
+      self.bucket = bucket
+      self.prefix = prefix
+      self.s3 = boto3.client('s3')
+
+   def save(self, model, filename):
+      return self.save_bytes(_dump(model), filename)
+
+   def save_bytes(self, body, filename):
+      # Préfixe attendu par l'API (MODEL_KEY, MODEL_WATCH_PREFIX)
+      key = self.prefix + filename
+      sha256 = hashlib.sha256(body).hexdigest()
+      # sha256 publié en métadonnée : l'API vérifie l'artefact téléchargé avec
+      self.s3.put_object(Bucket=self.bucket, Key=key, Body=body, Metadata={'sha256': sha256})
+      return f"s3://{self.bucket}/{key}", sha256
+
+
+def load_model(location):
+   """Pipeline d'un chemin local ou d'une URI s3://bucket/key (tag `model_location` d'un run)."""
+   if not location.startswith("s3://"):
+      return joblib.load(location)
+   import boto3
+
+   bucket, key = location[len("s3://"):].split("/", 1)
+   body = boto3.client('s3').get_object(Bucket=bucket, Key=key)["Body"].read()
+   return joblib.load(io.BytesIO(body))
+
+
+def get_storage(kind, location):
+   if kind == "local":
+      return LocalStorage(location or "models")
+   if kind == "s3":
+      return S3Storage(location or os.getenv("S3_BUCKET"))
+   raise ValueError(f"Backend de stockage inconnu : {kind}")
+
+
+def _jsonable(value):
+   if hasattr(value, "item"):
+      return value.item()
+   return value if isinstance(value, (str, int, float, bool, type(None))) else str(value)
@@ -0,0 +1,79 @@
+"""Export compact du modèle pour l'API.
+
+    python bundle.py models/xgboost_model_<run_id>.joblib     # écrit models/xgboost_model_<run_id>.bundle.zip
+
+Le bundle est une archive zip contenant :
+- booster.ubj : le booster XGBoost au format natif UBJSON ;
+- manifest.json : ordre des features, paramètres du prétraitement (moyennes/écarts du
+  StandardScaler, vocabulaires et catégorie supprimée du OneHotEncoder), plage
+  d'itérations, et un échantillon de contrôle avec les prédictions du pipeline d'origine ;
+- profile.json (optionnel) : profil de référence des entrées (reference.py), utilisé par
+  l'API pour mesurer la dérive du trafic.
+
+L'API reconstruit un predictor sans sklearn ni pickle (API_GET/predictors.py,
+CompiledPredictor.from_bundle) et vérifie l'échantillon de contrôle au chargement.
+"""
+import argparse
+import hashlib
+import io
+import json
+import sys
+import time
+import warnings
+import zipfile
+
+from getaround_formats import (BUNDLE_BOOSTER, BUNDLE_FORMAT, BUNDLE_MANIFEST, BUNDLE_PROFILE, BUNDLE_SUFFIX,
+                               BUNDLE_VERSION, bundle_filename, parity_sample, preprocessing_manifest)
+
+PARITY_ROWS = 200
+
+
+def export_bundle(pipeline, metadata=None, profile=None):
+   """Contenu (bytes) du bundle zip du pipeline entraîné."""
+   import sklearn
+   import xgboost
+
+   preprocessing = preprocessing_manifest(pipeline)
+   booster = bytes(pipeline[-1].get_booster().save_raw(raw_format="ubj"))
+   # Même échantillonnage que le contrôle de parité de l'API, dans l'ordre des features du pipeline
+   sample = parity_sample(preprocessing, PARITY_ROWS)
+   with warnings.catch_warnings():
+      warnings.simplefilter("ignore", UserWarning)
+      expected = pipeline.predict(sample)
+
+   manifest = {
+      "format": BUNDLE_FORMAT,
+      "version": BUNDLE_VERSION,
+      "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+      "trained_with": {"xgboost": xgboost.__version__, "scikit-learn": sklearn.__version__},
+      "booster": {"file": BUNDLE_BOOSTER, "sha256": hashlib.sha256(booster).hexdigest()},
+      **preprocessing,
+      "parity": {
+         "columns": {f: sample[f].tolist() for f in preprocessing["features"]},
+         "predictions": [float(p) for p in expected],
+      },
+      **(metadata or {}),
+   }
+   buffer = io.BytesIO()
+   with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+      archive.writestr(BUNDLE_MANIFEST, json.dumps(manifest, ensure_ascii=False))
+      archive.writestr(BUNDLE_BOOSTER, booster)
+      if profile is not None:
+         archive.writestr(BUNDLE_PROFILE, json.dumps(profile, ensure_ascii=False))
+   return buffer.getvalue()
+
+
+if __name__ == "__main__":
+   import joblib
+
+   parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+   parser.add_argument("model", help="pipeline joblib produit par model.py")
+   parser.add_argument("--output", help=f"chemin du bundle (défaut : <model>{BUNDLE_SUFFIX})")
+   args = parser.parse_args()
+
+   body = export_bundle(joblib.load(args.model), {"source": args.model})
+   output = args.output or bundle_filename(args.model)
+   with open(output, "wb") as f:
+      f.write(body)
+   print(f"Bundle écrit : {output} ({len(body) / 1024:.0f} Ko)")
+   sys.exit(0)
@@ -0,0 +1,100 @@
+"""Réentraînement incrémental à partir d'un modèle déjà entraîné.
+
+Le prétraitement ajusté du modèle précédent est conservé tel quel (moyennes/écarts du
+StandardScaler, vocabulaires du OneHotEncoder) : une nouvelle catégorie serait ignorée
+en silence par `handle_unknown='ignore'`, elle impose donc une reconstruction complète.
+XGBoost ajoute ensuite `rounds` arbres au booster existant (`xgb_model`), appris sur les
+lignes nouvelles et récentes uniquement.
+"""
+from sklearn.base import clone
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+
+DEFAULT_ROUNDS = 50
+DEFAULT_RECENT_ROWS = 1000
+# Part des lignes nouvelles (les dernières) réservée au test, vue par aucun des deux modèles
+DEFAULT_HOLDOUT = 0.2
+# Écart relatif de RMSE (incrémental vs complet) au-delà duquel une reconstruction est conseillée
+DEFAULT_REBUILD_THRESHOLD = 0.02
+
+
+class VocabularyChanged(ValueError):
+   def __init__(self, unknown):
+      self.unknown = unknown
+      details = ", ".join(f"{feature}: {values}" for feature, values in unknown.items())
+      super().__init__(f"Catégories inconnues du modèle précédent ({details})")
+
+
+def _encoders(preprocessor):
+   if isinstance(preprocessor, Pipeline) and len(preprocessor.steps) == 1:
+      preprocessor = preprocessor[0]
+   if not isinstance(preprocessor, ColumnTransformer):
+      raise ValueError("Le pipeline doit commencer par un ColumnTransformer")
+   for name, transformer, features in preprocessor.transformers_:
+      steps = [step for _, step in transformer.steps] if isinstance(transformer, Pipeline) else [transformer]
+      for step in steps:
+         if isinstance(step, OneHotEncoder):
+            yield features, step
+
+
+def unknown_categories(preprocessor, X):
+   """{feature: valeurs de X absentes du vocabulaire ajusté}."""
+   unknown = {}
+   for features, encoder in _encoders(preprocessor):
+      for feature, categories in zip(features, encoder.categories_):
+         values = set(X[feature].dropna().unique()) - set(categories.tolist())
+         if values:
+            unknown[feature] = sorted(values, key=str)
+   return unknown
+
+
+def check_vocabularies(preprocessor, X):
+   unknown = unknown_categories(preprocessor, X)
+   if unknown:
+      raise VocabularyChanged(unknown)
+
+
+def holdout_split(X, y, new_rows, holdout=DEFAULT_HOLDOUT):
+   """(X_train, X_test, y_train, y_test) : le test est la fin des `new_rows` dernières lignes.
+
+   Les CSV sont complétés par la fin : ces lignes n'ont été vues ni par le modèle
+   précédent, ni par le nouveau (incrémental ou complet), contrairement à un découpage
+   aléatoire du fichier entier dont le test recouvre l'entraînement du modèle précédent.
+   """
+   if not 0 < new_rows <= len(X):
+      raise ValueError(f"--new-rows doit être compris entre 1 et {len(X)}")
+   n_test = int(round(new_rows * holdout))
+   if not 0 < n_test < new_rows:
+      raise ValueError(f"Test vide ou sans ligne nouvelle à apprendre ({n_test} sur {new_rows})")
+   cut = len(X) - n_test
+   return X.iloc[:cut], X.iloc[cut:], y.iloc[:cut], y.iloc[cut:]
+
+
+def recent_window(X, y, new_rows, recent_rows):
+   """Les `new_rows + recent_rows` dernières lignes de (X, y), dans l'ordre du fichier.
+
+   Les dernières lignes sont les nouvelles locations, toutes apprises ; les `recent_rows`
+   précédentes sont rejouées pour limiter l'oubli.
+   """
+   start = max(0, len(X) - new_rows - recent_rows)
+   return X.iloc[start:], y.iloc[start:]
+
+
+def continue_training(previous, X, y, rounds=DEFAULT_ROUNDS, n_jobs=None):
+   """Nouveau pipeline : prétraitement du modèle précédent + booster prolongé de `rounds` arbres."""
+   preprocessor = previous[:-1]
+   check_vocabularies(preprocessor, X)
+
+   booster = previous[-1].get_booster()
+   try:
+      # Arrêt anticipé : on repart du meilleur modèle, pas des arbres surnuméraires
+      booster = booster[:previous[-1].best_iteration + 1]
+   except AttributeError:
+      pass
+   params = {"n_estimators": rounds, "early_stopping_rounds": None}
+   if n_jobs is not None:
+      params["n_jobs"] = n_jobs
+   regressor = clone(previous[-1]).set_params(**params)
+   regressor.fit(preprocessor.transform(X), y, xgb_model=booster, verbose=False)
+   return Pipeline(previous.steps[:-1] + [(previous.steps[-1][0], regressor)])
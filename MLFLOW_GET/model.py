@@ -1,107 +1,229 @@
-import mlflow
-import pandas as pd
+"""Entraînement du modèle de pricing.
+
+    # Hors-ligne : runs en JSON sous ./runs, modèle sous ./models
+    python model.py --search random --n-trials 40 --tree-method hist --early-stopping-rounds 30
+
+    # Production (comportement historique) : serveur MLflow + S3, configurés par .secrets
+    python model.py --tracking mlflow --storage s3
+
+    # Incrémental : reprise du booster précédent sur les 300 dernières lignes (+ 1000 récentes)
+    python model.py --incremental models/xgboost_model_<run_id>.joblib --new-rows 300 --compare-full
+"""
+import argparse
+import json
 import os
-import subprocess
+import time
+
 import numpy as np
 from dotenv import load_dotenv
-from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
-from sklearn.impute import SimpleImputer
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from getaround_formats import bundle_filename, profile_filename
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, r2_score, mean_squared_error
-from xgboost import XGBRegressor
-import boto3
-import joblib
-import io
-
-load_dotenv(dotenv_path='.secrets')
-
-mlflow.set_tracking_uri(os.getenv('BACKEND_STORE_URI'))
-os.environ['AWS_ACCESS_KEY_ID'] = os.getenv('AWS_ACCESS_KEY_ID')
-os.environ['AWS_SECRET_ACCESS_KEY'] = os.getenv('AWS_SECRET_ACCESS_KEY')
-os.environ['MLFLOW_DEFAULT_ARTIFACT_ROOT'] = os.getenv('MLFLOW_DEFAULT_ARTIFACT_ROOT')
-os.environ['S3_BUCKET'] = os.getenv('S3_BUCKET')
-
-# Log configurations au démarrage
-print("=== Configuration MLflow ===")
-print(f"Tracking URI: {mlflow.get_tracking_uri()}")
-print(f"Artifact Store: {os.getenv('MLFLOW_DEFAULT_ARTIFACT_ROOT')}")
-print(f"AWS Access: {'Configuré' if os.getenv('AWS_ACCESS_KEY_ID') else 'Manquant'}")
-
-s3 = boto3.client('s3')
-try:
-   response = s3.list_objects_v2(Bucket=os.getenv('S3_BUCKET'))
-   print("S3 contents:", response.get('Contents', []))
-except Exception as e:
-   print("S3 error:", e)
-
-df = pd.read_csv('/mnt/c/Users/m_bar/dsfs_ft/GETAROUND/pricing_clean.csv')
-feature_list = df.drop('rental_price_per_day', axis=1)
-target = df['rental_price_per_day']
-X = feature_list
-Y = target
-X_train, X_test, Y_train, Y_test = train_test_split(X,Y, test_size=0.2, random_state=42)
-
-numeric_features = ['mileage', 'engine_power']
-categorical_features = ['model_key','fuel', 'paint_color', 'car_type', 'private_parking_available', 'has_gps', 'has_air_conditioning','automatic_car','has_getaround_connect','has_speed_regulator','winter_tires']
-
-numeric_transformer = Pipeline(steps=[('scaler', StandardScaler())])
-categorical_transformer = Pipeline(steps=[('encoder', OneHotEncoder(drop='if_binary', handle_unknown='ignore'))])
-
-preprocessor = ColumnTransformer(transformers =[
-    ('num', numeric_transformer, numeric_features),
-    ('cat', categorical_transformer, categorical_features)
-])
-
-def train_evaluate_model_with_mlflow(model, X_train, X_test, Y_train, Y_test, model_name):
+
+from backends import get_storage, get_tracker, load_model
+from bundle import export_bundle
+from incremental import (DEFAULT_HOLDOUT, DEFAULT_REBUILD_THRESHOLD, DEFAULT_RECENT_ROWS, DEFAULT_ROUNDS,
+                         VocabularyChanged, check_vocabularies, continue_training, holdout_split, recent_window)
+from pipeline import BEST_PARAMS, dataset_version, fit_pipeline, load_dataset
+from reference import reference_profile
+from search import grid_configs, random_configs, run_search
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+# Entrepôt typé (python STREAM_GET/store.py) s'il a été construit, sinon le CSV
+DEFAULT_STORE = os.path.join(ROOT, 'STREAM_GET', 'data', 'store', 'pricing.parquet')
+DEFAULT_DATA = DEFAULT_STORE if os.path.isfile(DEFAULT_STORE) else os.path.join(ROOT, 'pricing_clean.csv')
+
+
+def evaluate(model, X_test, Y_test):
+   y_pred = model.predict(X_test)
+   return {
+       "RMSE": np.sqrt(mean_squared_error(Y_test, y_pred)),
+       "MAE": mean_absolute_error(Y_test, y_pred),
+       "R2": r2_score(Y_test, y_pred),
+   }
+
+
+def timed_fit(fit):
+   start = time.perf_counter()
+   model = fit()
+   return model, time.perf_counter() - start
+
+
+def train_evaluate_model(params, X_train, X_test, Y_train, Y_test, model_name, tracker, storage,
+                         early_stopping_rounds=None, search_results=None, bundle=True,
+                         fit=None, compare=None, tags=None, rebuild_threshold=DEFAULT_REBUILD_THRESHOLD):
+   """Entraîne, évalue et enregistre un modèle.
+
+   `fit` : entraînement sans argument (défaut : fit_pipeline sur X_train) ; `compare` :
+   {préfixe: modèle ajusté ou entraînement sans argument} évalués sur le même jeu de test.
+   """
    print(f"\n=== Démarrage entraînement {model_name} ===")
-   print(f"Tracking URI: {mlflow.get_tracking_uri()}")
-   print(f"Registry URI: {mlflow.get_registry_uri()}")
-   
-   mlflow.set_experiment("price_prediction")
-   print(f"Experiment: price_prediction")
-   s3 = boto3.client('s3')
-
-   with mlflow.start_run() as run:
-       print(f"Run ID: {run.info.run_id}")
-       
+   print(f"Tracking ({tracker.name}) : {tracker.describe()}")
+
+   run = tracker.start_run()
+   try:
+       print(f"Run ID: {run.run_id}")
+       run.log_params({**params, 'early_stopping_rounds': early_stopping_rounds})
+       for key, value in (tags or {}).items():
+           run.set_tag(key, value)
+
        print("Entraînement du modèle...")
-       model.fit(X_train, Y_train)
-       
-       #save model to S3
-       print("Enregistrement du modèle sur S3...")
-       model_path = f"mlflow/models/{model_name}_{run.info.run_id}.joblib"
-       buffer = io.BytesIO()
-       joblib.dump(model, buffer)
-       s3.put_object(
-           Bucket=os.getenv('S3_BUCKET'),
-           Key=model_path,
-           Body=buffer.getvalue()
-       )
-       print("Modèle enregistré")
-       
-       y_pred = model.predict(X_test)
-       metrics = {
-           "RMSE": np.sqrt(mean_squared_error(Y_test, y_pred)),
-           "MAE": mean_absolute_error(Y_test, y_pred),
-           "R2": r2_score(Y_test, y_pred)
-       }
-       
+       model, fit_seconds = timed_fit(fit or (lambda: fit_pipeline(params, X_train, Y_train, early_stopping_rounds)))
+       # L'API prédit ligne par ligne : un seul thread XGBoost par prédiction
+       model[-1].set_params(n_jobs=1)
+
+       metrics = {**evaluate(model, X_test, Y_test), "fit_seconds": fit_seconds}
+       # Un booster prolongé par le mode incrémental n'a pas de best_iteration
+       if early_stopping_rounds and getattr(model[-1], "best_iteration", None) is not None:
+           metrics["best_iteration"] = model[-1].best_iteration
+       for prefix, other in (compare or {}).items():
+           print(f"Comparaison : {prefix}...")
+           if callable(other):
+               other, seconds = timed_fit(other)
+               metrics[f"{prefix}_fit_seconds"] = seconds
+           metrics.update({f"{prefix}_{name}": value for name, value in evaluate(other, X_test, Y_test).items()})
+       if "full_RMSE" in metrics:
+           # Coût et précision relatifs à un réentraînement complet
+           metrics["rmse_gap"] = metrics["RMSE"] / metrics["full_RMSE"] - 1
+           metrics["fit_speedup"] = metrics["full_fit_seconds"] / fit_seconds
+           rebuild = metrics["rmse_gap"] > rebuild_threshold
+           run.set_tag("full_rebuild_recommended", str(rebuild).lower())
+           if rebuild:
+               print(f"RMSE {metrics['rmse_gap']:.1%} au-dessus du réentraînement complet : reconstruction conseillée")
+
        print("\nEnregistrement des métriques...")
+       run.log_metrics(metrics)
        for name, value in metrics.items():
-           mlflow.log_metric(name, value)
            print(f"{name}: {value:.2f}")
-       
-       return model, run.info.run_id
+       if search_results is not None:
+           run.log_dict(search_results, "search_results.json")
+
+       print(f"Enregistrement du modèle ({storage.name})...")
+       filename = f"{model_name}_{run.run_id}.joblib"
+       location, sha256 = storage.save(model, filename)
+       run.set_tag("model_location", location)
+       run.set_tag("model_sha256", sha256)
+       print(f"Modèle enregistré : {location}")
+       # Distribution d'entraînement, référence du suivi de dérive de l'API
+       profile = reference_profile(X_train, model.predict(X_train))
+       location, _ = storage.save_bytes(json.dumps(profile, ensure_ascii=False).encode(), profile_filename(filename))
+       run.set_tag("profile_location", location)
+       if bundle:
+           # Export compact (booster UBJSON + manifest) chargé par l'API sans pickle
+           body = export_bundle(model, {"run_id": run.run_id}, profile)
+           location, sha256 = storage.save_bytes(body, bundle_filename(filename))
+           run.set_tag("bundle_location", location)
+           run.set_tag("bundle_sha256", sha256)
+           print(f"Bundle enregistré : {location}")
+   finally:
+       run.close()
+   return model, run.run_id
+
+
+def parse_args():
+   parser = argparse.ArgumentParser(description="Entraînement du modèle de pricing Getaround")
+   parser.add_argument('--data', default=os.getenv('DATA_PATH', DEFAULT_DATA))
+   parser.add_argument('--env-file', default='.secrets', help="variables d'environnement (MLflow, AWS)")
+   parser.add_argument('--tracking', choices=['file', 'mlflow'], default='file')
+   parser.add_argument('--tracking-uri', help="dossier des runs (file) ou URI MLflow, ex. file:./mlruns")
+   parser.add_argument('--experiment', default='price_prediction')
+   parser.add_argument('--storage', choices=['local', 's3'], default='local')
+   parser.add_argument('--storage-location', help="dossier local ou bucket S3 (défaut : S3_BUCKET)")
+   parser.add_argument('--model-name', default='xgboost_model')
+   parser.add_argument('--search', choices=['none', 'grid', 'random'], default='none')
+   parser.add_argument('--n-trials', type=int, default=20, help="nombre d'essais en recherche aléatoire")
+   parser.add_argument('--cv', type=int, default=5, help="nombre de folds")
+   parser.add_argument('--workers', type=int, default=os.cpu_count(), help="processus de recherche")
+   parser.add_argument('--tree-method', choices=['auto', 'exact', 'approx', 'hist'])
+   parser.add_argument('--early-stopping-rounds', type=int)
+   parser.add_argument('--n-jobs', type=int, default=-1, help="threads XGBoost pour l'entraînement final")
+   parser.add_argument('--seed', type=int, default=42)
+   parser.add_argument('--bundle', action=argparse.BooleanOptionalAction, default=True,
+                       help="exporte aussi le bundle compact (booster UBJSON + manifest)")
+   incremental = parser.add_argument_group("réentraînement incrémental")
+   incremental.add_argument('--incremental', metavar='MODEL',
+                            help="pipeline joblib précédent (chemin ou s3://) dont le booster est prolongé")
+   incremental.add_argument('--new-rows', type=int, help="nombre de lignes ajoutées en fin de CSV depuis ce modèle")
+   incremental.add_argument('--holdout', type=float, default=DEFAULT_HOLDOUT,
+                            help="part des lignes nouvelles (les dernières) réservée au test")
+   incremental.add_argument('--recent-rows', type=int, default=DEFAULT_RECENT_ROWS,
+                            help="lignes précédentes rejouées avec les nouvelles")
+   incremental.add_argument('--incremental-rounds', type=int, default=DEFAULT_ROUNDS, help="arbres ajoutés")
+   incremental.add_argument('--compare-full', action='store_true',
+                            help="entraîne aussi un modèle complet pour comparer coût et précision")
+   incremental.add_argument('--rebuild-threshold', type=float, default=DEFAULT_REBUILD_THRESHOLD,
+                            help="écart relatif de RMSE au-delà duquel une reconstruction est conseillée")
+   args = parser.parse_args()
+   if args.incremental and args.new_rows is None:
+      parser.error("--incremental requiert --new-rows")
+   if args.incremental and args.search != 'none':
+      parser.error("--incremental reprend les hyperparamètres du modèle précédent : pas de --search")
+   return args
+
+
+def incremental_setup(args, X_train, Y_train, n_test):
+   """(params, fit, compare, tags) du mode incrémental.
+
+   X_train se termine par les lignes nouvelles non réservées au test (holdout_split), toutes
+   apprises. Les hyperparamètres sont ceux du modèle précédent. Si les lignes nouvelles et
+   récentes contiennent des catégories inconnues de son prétraitement, retombe sur un
+   entraînement complet.
+   """
+   previous = load_model(args.incremental)
+   regressor_params = previous[-1].get_params()
+   params = {k: regressor_params[k] for k in [*BEST_PARAMS, 'tree_method'] if regressor_params.get(k) is not None}
+   full = lambda: fit_pipeline({**params, 'n_jobs': args.n_jobs}, X_train, Y_train, args.early_stopping_rounds)
+   X_window, Y_window = recent_window(X_train, Y_train, args.new_rows - n_test, args.recent_rows)
+   try:
+      check_vocabularies(previous[:-1], X_window)
+   except VocabularyChanged as e:
+      print(f"{e} : réentraînement complet")
+      return params, full, {}, {"training_mode": "full", "incremental_fallback": str(e)}
+
+   print(f"Incrémental : {args.incremental}, {len(X_window)} lignes récentes, +{args.incremental_rounds} arbres")
+   fit = lambda: continue_training(previous, X_window, Y_window, args.incremental_rounds, args.n_jobs)
+   compare = {"full": full} if args.compare_full else {}
+   tags = {"training_mode": "incremental", "parent_model": args.incremental, "incremental_rows": str(len(X_window))}
+   return {**params, 'incremental_rounds': args.incremental_rounds}, fit, compare, tags
+
 
 if __name__ == "__main__":
-    xgb_best_param = XGBRegressor(learning_rate = 0.1, max_depth = 5, n_estimators =200, n_jobs = 1)
-    xgb_final = Pipeline(steps=[
-        ('preprocessor', preprocessor),
-        ('xgboost_best', xgb_best_param)
-    ])
-    _, run_id = train_evaluate_model_with_mlflow(
-        xgb_final, X_train, X_test, Y_train, Y_test, "xgboost_model"
+    args = parse_args()
+    load_dotenv(dotenv_path=args.env_file)
+
+    X, Y = load_dataset(args.data)
+    if args.incremental:
+        # Test = fin des lignes nouvelles, jamais vue par le modèle précédent
+        X_train, X_test, Y_train, Y_test = holdout_split(X, Y, args.new_rows, args.holdout)
+    else:
+        X_train, X_test, Y_train, Y_test = train_test_split(X,Y, test_size=0.2, random_state=args.seed)
+    print(f"Données : {args.data} ({len(X_train)} lignes d'entraînement, {len(X_test)} de test)")
+
+    base_params = {} if args.tree_method is None else {'tree_method': args.tree_method}
+    params = {**BEST_PARAMS, **base_params}
+    search_results = None
+    if args.search != 'none':
+        configs = grid_configs() if args.search == 'grid' else random_configs(args.n_trials, args.seed)
+        search_results = run_search(
+            X_train, Y_train, configs, n_splits=args.cv, workers=args.workers,
+            early_stopping_rounds=args.early_stopping_rounds, base_params=base_params, seed=args.seed
+        )
+        best = search_results[0]
+        print(f"\nMeilleure configuration (essai {best['trial']}, RMSE CV {best['cv_rmse']:.3f}) : {best['params']}")
+        params = {**BEST_PARAMS, **best['params']}
+
+    fit, compare, tags = None, None, {}
+    if args.incremental:
+        params, fit, compare, tags = incremental_setup(args, X_train, Y_train, len(X_test))
+    data_version = dataset_version(args.data)
+    if data_version:
+        tags = {**tags, 'data_content_sha256': data_version}
+
+    tracker = get_tracker(args.tracking, args.tracking_uri, args.experiment)
+    storage = get_storage(args.storage, args.storage_location)
+    _, run_id = train_evaluate_model(
+        {**params, 'n_jobs': args.n_jobs}, X_train, X_test, Y_train, Y_test, args.model_name,
+        tracker, storage, args.early_stopping_rounds, search_results, args.bundle,
+        fit, compare, tags, args.rebuild_threshold
     )
-    print(f"Run ID: {run_id}")
\ No newline at end of file
+    print(f"Run ID: {run_id}")
@@ -0,0 +1,77 @@
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from xgboost import XGBRegressor
+
+# Définition du pipeline, sans MLflow ni S3 : importable par l'entraînement et les benchmarks
+
+TARGET = 'rental_price_per_day'
+numeric_features = ['mileage', 'engine_power']
+categorical_features = ['model_key','fuel', 'paint_color', 'car_type', 'private_parking_available', 'has_gps', 'has_air_conditioning','automatic_car','has_getaround_connect','has_speed_regulator','winter_tires']
+
+# Meilleurs hyperparamètres retenus dans modele_pricing.ipynb
+BEST_PARAMS = {'learning_rate': 0.1, 'max_depth': 5, 'n_estimators': 200, 'n_jobs': 1}
+
+
+def build_preprocessor():
+   numeric_transformer = Pipeline(steps=[('scaler', StandardScaler())])
+   categorical_transformer = Pipeline(steps=[('encoder', OneHotEncoder(drop='if_binary', handle_unknown='ignore'))])
+   return ColumnTransformer(transformers =[
+       ('num', numeric_transformer, numeric_features),
+       ('cat', categorical_transformer, categorical_features)
+   ])
+
+
+def build_pipeline(**params):
+   """Pipeline préprocessing + XGBoost ; `params` surcharge BEST_PARAMS."""
+   return Pipeline(steps=[
+       ('preprocessor', build_preprocessor()),
+       ('xgboost_best', XGBRegressor(**{**BEST_PARAMS, **params}))
+   ])
+
+
+def load_dataset(path):
+   """(X, y) d'un CSV, ou d'un fichier Parquet de l'entrepôt typé (STREAM_GET/store.py).
+
+   Pour le Parquet, seules les features et la cible sont lues, en mémoire mappée ; les
+   colonnes gardent leurs types déclarés (catégories, booléens).
+   """
+   if not path.endswith(".parquet"):
+      df = pd.read_csv(path)
+      return df.drop(TARGET, axis=1), df[TARGET]
+   import pyarrow.parquet as pq
+
+   wanted = set(numeric_features + categorical_features + [TARGET])
+   columns = [name for name in pq.read_schema(path).names if name in wanted]
+   df = pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+   return df.drop(TARGET, axis=1), df[TARGET]
+
+
+def dataset_version(path):
+   """Empreinte du contenu typé enregistrée par l'entrepôt (None pour un CSV)."""
+   if not path.endswith(".parquet"):
+      return None
+   import json
+
+   import pyarrow.parquet as pq
+
+   raw = (pq.read_schema(path).metadata or {}).get(b"getaround_store")
+   return json.loads(raw)["content_sha256"] if raw else None
+
+
+def fit_pipeline(params, X, y, early_stopping_rounds=None, validation_fraction=0.1, random_state=42):
+   """Entraîne le pipeline ; avec early stopping, une fraction de (X, y) sert de jeu de validation."""
+   pipeline = build_pipeline(**params)
+   if not early_stopping_rounds:
+      return pipeline.fit(X, y)
+   X_fit, X_valid, y_fit, y_valid = train_test_split(X, y, test_size=validation_fraction, random_state=random_state)
+   # pipeline[:-1] partage le ColumnTransformer du pipeline : il est ajusté en place
+   preprocessor = pipeline[:-1].fit(X_fit, y_fit)
+   regressor = pipeline[-1].set_params(early_stopping_rounds=early_stopping_rounds)
+   regressor.fit(
+       preprocessor.transform(X_fit), y_fit,
+       eval_set=[(preprocessor.transform(X_valid), y_valid)], verbose=False
+   )
+   return pipeline
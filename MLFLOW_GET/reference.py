@@ -0,0 +1,77 @@
+"""Profil de référence des entrées et des prédictions, enregistré avec le modèle.
+
+    python reference.py models/xgboost_model_<run_id>.joblib    # écrit models/xgboost_model_<run_id>.profile.json
+
+Pour chaque feature numérique surveillée (et le prix prédit) : bornes des cases aux
+quantiles du jeu d'entraînement et proportion de lignes par case ; pour chaque feature
+catégorielle : fréquence de chaque modalité. L'API (API_GET/drift.py) compare le trafic
+réel à ce profil (PSI, KS) sans garder les requêtes.
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+from getaround_formats import PROFILE_FORMAT, PROFILE_SUFFIX, PROFILE_VERSION, profile_filename
+
+NUMERIC_FEATURES = ["mileage", "engine_power"]
+CATEGORICAL_FEATURES = ["model_key", "fuel", "car_type"]
+PREDICTION = "predicted_price"
+BINS = 20
+
+
+def numeric_profile(values, bins=BINS):
+   """Cases aux quantiles 1/bins … (bins-1)/bins ; la case d'une valeur x est bisect_right(edges, x)."""
+   values = np.asarray(values, dtype=np.float64)
+   values = values[~np.isnan(values)]
+   edges = np.unique(np.quantile(values, np.arange(1, bins) / bins))
+   counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+   return {
+      "edges": edges.tolist(),
+      "proportions": (counts / len(values)).tolist(),
+      "min": float(values.min()),
+      "max": float(values.max()),
+      "quantiles": {f"p{q}": float(np.quantile(values, q / 100)) for q in (10, 50, 90)},
+   }
+
+
+def categorical_profile(values):
+   frequencies = values.astype(str).value_counts(normalize=True)
+   return {"proportions": {str(k): float(v) for k, v in frequencies.items()}}
+
+
+def reference_profile(X, predictions, bins=BINS):
+   """Profil de X (features d'entraînement) et des prix prédits par le modèle sur X."""
+   return {
+      "format": PROFILE_FORMAT,
+      "version": PROFILE_VERSION,
+      "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+      "rows": len(X),
+      "numeric": {
+         **{feature: numeric_profile(X[feature], bins) for feature in NUMERIC_FEATURES},
+         PREDICTION: numeric_profile(predictions, bins),
+      },
+      "categorical": {feature: categorical_profile(X[feature]) for feature in CATEGORICAL_FEATURES},
+   }
+
+
+if __name__ == "__main__":
+   import joblib
+
+   from model import DEFAULT_DATA
+   from pipeline import load_dataset
+
+   parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+   parser.add_argument("model", help="pipeline joblib produit par model.py")
+   parser.add_argument("--data", default=DEFAULT_DATA, help="jeu d'entraînement (CSV ou Parquet)")
+   parser.add_argument("--output", help=f"chemin du profil (défaut : <model>{PROFILE_SUFFIX})")
+   args = parser.parse_args()
+
+   X, _ = load_dataset(args.data)
+   profile = reference_profile(X, joblib.load(args.model).predict(X))
+   output = args.output or profile_filename(args.model)
+   with open(output, "w") as f:
+      json.dump(profile, f, ensure_ascii=False)
+   print(f"Profil écrit : {output} ({profile['rows']} lignes)")
+   sys.exit(0)
@@ -0,0 +1,105 @@
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import KFold
+
+from pipeline import fit_pipeline
+
+# Recherche d'hyperparamètres parallèle : un essai = une configuration évaluée en k-fold.
+# Les essais tournent dans des processus distincts, chacun avec XGBoost en n_jobs=1,
+# pour occuper tous les cœurs sans sursouscription.
+
+GRID = {
+   'learning_rate': [0.05, 0.1, 0.2],
+   'max_depth': [3, 5, 7],
+   'n_estimators': [200, 400],
+   'min_child_weight': [1, 5],
+   'subsample': [0.8, 1.0],
+}
+
+
+def grid_configs(grid=GRID):
+   names = list(grid)
+   return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def random_configs(n_trials, seed=42):
+   rng = np.random.default_rng(seed)
+   return [
+      {
+         'learning_rate': round(float(np.exp(rng.uniform(np.log(0.01), np.log(0.3)))), 4),
+         'max_depth': int(rng.integers(3, 10)),
+         'n_estimators': int(rng.choice([100, 200, 400, 800])),
+         'min_child_weight': int(rng.integers(1, 11)),
+         'subsample': round(float(rng.uniform(0.6, 1.0)), 3),
+         'colsample_bytree': round(float(rng.uniform(0.6, 1.0)), 3),
+      }
+      for _ in range(n_trials)
+   ]
+
+
+# === Côté processus de calcul ===
+_data = {}
+
+
+def _init_worker(X, y):
+   _data['X'], _data['y'] = X, y
+
+
+def evaluate(trial, params, n_splits, early_stopping_rounds, seed):
+   """Score k-fold d'une configuration ; renvoie un dict de résultats de l'essai."""
+   X, y = _data['X'], _data['y']
+   start = time.perf_counter()
+   rmse, mae, r2, iterations = [], [], [], []
+   for train_idx, valid_idx in KFold(n_splits, shuffle=True, random_state=seed).split(X):
+      model = fit_pipeline(params, X.iloc[train_idx], y.iloc[train_idx], early_stopping_rounds, random_state=seed)
+      y_valid, y_pred = y.iloc[valid_idx], model.predict(X.iloc[valid_idx])
+      rmse.append(np.sqrt(mean_squared_error(y_valid, y_pred)))
+      mae.append(mean_absolute_error(y_valid, y_pred))
+      r2.append(r2_score(y_valid, y_pred))
+      if early_stopping_rounds:
+         iterations.append(model[-1].best_iteration + 1)
+   return {
+      'trial': trial,
+      'params': params,
+      'cv_rmse': float(np.mean(rmse)),
+      'cv_rmse_std': float(np.std(rmse)),
+      'cv_mae': float(np.mean(mae)),
+      'cv_r2': float(np.mean(r2)),
+      'best_iterations': iterations,
+      'wall_seconds': round(time.perf_counter() - start, 3),
+   }
+
+
+def run_search(X, y, configs, n_splits=5, workers=None, early_stopping_rounds=None, base_params=None, seed=42):
+   """Évalue `configs` en parallèle ; renvoie les essais triés par RMSE croissante."""
+   workers = workers or os.cpu_count() or 1
+   base_params = {**(base_params or {}), 'n_jobs': 1}
+   results, best = [], None
+   start = time.perf_counter()
+   print(f"\n=== Recherche : {len(configs)} essais, {n_splits}-fold, {workers} processus ===")
+   with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(X, y)) as pool:
+      futures = [
+         pool.submit(evaluate, trial, {**base_params, **params}, n_splits, early_stopping_rounds, seed)
+         for trial, params in enumerate(configs)
+      ]
+      for done, future in enumerate(as_completed(futures), start=1):
+         result = future.result()
+         results.append(result)
+         if best is None or result['cv_rmse'] < best['cv_rmse']:
+            best = result
+         print(
+            f"[{done}/{len(configs)}] essai {result['trial']} : RMSE {result['cv_rmse']:.3f} "
+            f"± {result['cv_rmse_std']:.3f} en {result['wall_seconds']:.1f} s | "
+            f"meilleur : essai {best['trial']} RMSE {best['cv_rmse']:.3f} {_short(best['params'])}"
+         )
+   print(f"Recherche terminée en {time.perf_counter() - start:.1f} s")
+   return sorted(results, key=lambda r: r['cv_rmse'])
+
+
+def _short(params):
+   return ", ".join(f"{k}={v}" for k, v in params.items() if k != 'n_jobs')
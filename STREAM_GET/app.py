@@ -1,38 +1,110 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import requests
 
-st.set_page_config(page_title="Getaround – Dashboard Analyse", layout="wide")
+# Navigation par section : à chaque rerun (clic, saisie), seule la section affichée est
+# exécutée. Les figures sont mémoïsées par version des données (empreinte de
+# l'instantané) ; pandas, plotly et le client de prédiction ne sont importés que par les
+# sections qui s'en servent.
 
-st.title("🚗 Dashboard Analyse – Getaround")
-st.markdown("""
-Bienvenue sur le dashboard interactif de l’étude Getaround.  
-Vous avez 3 onglets pour naviguer sur les themes suivant :  
-1. Analyse Retards  
-2. Analyse Pricing 
-3. Prédiction API 
-""")
+SECTIONS = ["📊 Analyse Retards", "💰 Analyse Pricing", "🤖 Prédiction API"]
+
+
+def dashboard_snapshot():
+    # Agrégats précalculés (snapshot.py), ou recalculés à partir des CSV s'ils manquent
+    from snapshot import load_dashboard_snapshot
+
+    return load_dashboard_snapshot()
+
+
+# === Figures mémoïsées (clé : version des données) ===
+@st.cache_resource(show_spinner=False)
+def delay_figures(_snapshot, version):
+    import plotly.express as px
+
+    from charts import histogram_figure, pie_figure
+
+    fig_type = histogram_figure(
+        _snapshot["delay_hist_checkin"],
+        color="checkin_type",
+        overlay=True,
+        opacity=0.2,
+        title="Distribution des retards par type de check-in",
+        labels={"center": "Retard (minutes)"},
+        range_x=[-150, 150],
+        width=1200, height=600,
+    )
+    fig_type.update_yaxes(title="Nombre de locations")
+
+    # Courbe complète, minute par minute
+    curve = _snapshot["buffer_curve"]
+    fig_curve = px.line(
+        curve.melt(id_vars=["buffer", "checkin_type"], value_vars=["lost_revenue", "saved_revenue"]),
+        x="buffer", y="value", color="checkin_type", line_dash="variable",
+        labels={"buffer": "Buffer (min)", "value": "Revenu ($)", "variable": ""},
+        title="Revenu perdu (locations bloquées) vs préservé (annulations évitées)",
+    )
+    return {
+        "state": pie_figure(_snapshot["states"], names="state", title="Répartition par état des locations"),
+        "delay": histogram_figure(
+            _snapshot["delay_hist"],
+            title="Distribution des retards (fenêtre -150 à 150 min)",
+            labels={"center": "delay_at_checkout_in_minutes"},
+        ),
+        "checkin_type": fig_type,
+        "buffer_curve": fig_curve,
+    }
 
-tab1, tab2, tab3 = st.tabs(["📊 Analyse Retards", "💰 Analyse Pricing", "🤖 Prédiction API"])
 
-with tab1:
+@st.cache_resource(show_spinner=False)
+def pricing_figures(_snapshot, version):
+    import plotly.express as px
+
+    from charts import box_figure, histogram_figure
+
+    corr = _snapshot["correlation"].set_index("column").rename_axis(None)
+    return {
+        "price": histogram_figure(_snapshot["price_hist"], title="Distribution des prix de location par jour",
+                                  labels={"center": "rental_price_per_day"}),
+        # Boîtes à moustaches à partir des quartiles précalculés (points aberrants non tracés)
+        "car_type": box_figure(_snapshot["price_box"], "car_type", title="Prix par type de véhicule",
+                               yaxis_title="rental_price_per_day"),
+        "correlation": px.imshow(
+            corr,
+            text_auto=True,
+            color_continuous_scale="RdBu_r",
+            title="Matrice de corrélation",
+            height=800,
+            width=1000
+        ),
+    }
+
+
+@st.cache_resource(show_spinner=False)
+def prediction_client():
+    # Une seule session HTTP (pool de connexions) partagée par toutes les sessions du dashboard
+    from prediction_client import PredictionClient
+
+    return PredictionClient()
+
+
+# === Sections ===
+def render_delays():
+    from buffers import ALL, DEFAULT_BUFFERS
+
     st.header("Analyse des retards")
 
-    df = pd.read_csv("data/get_around_delay_analysis.csv")
-    df_pricing = pd.read_csv("data/pricing_clean.csv")
+    snapshot = dashboard_snapshot()
+    metrics = snapshot.metrics
+    figures = delay_figures(snapshot, snapshot.version)
 
-    loc_moyenne = df_pricing["rental_price_per_day"].mean()
+    loc_moyenne = metrics["mean_price"]
 
     # EDA SUR LES RETARDS 
     st.header("📊 Analyse des retards et annulations")
 
 
-    fig_state = px.pie(df, names="state", title="Répartition par état des locations")
-    st.plotly_chart(fig_state, use_container_width=True)
+    st.plotly_chart(figures["state"], use_container_width=True)
 
-    annulation = (df["state"] == "canceled").sum()
-    st.metric("Nombre total d'annulations", annulation)
+    st.metric("Nombre total d'annulations", metrics["canceled"])
 
     st.markdown("""
     👉 Environ **15 % des transactions sont annulées**.  
@@ -40,13 +112,7 @@ with tab1:
     """)
 
 
-    fig_delay = px.histogram(
-        df.query("-150 <= delay_at_checkout_in_minutes <= 150"),
-        x="delay_at_checkout_in_minutes",
-        nbins=60,
-        title="Distribution des retards (fenêtre -150 à 150 min)"
-    )
-    st.plotly_chart(fig_delay, use_container_width=True)
+    st.plotly_chart(figures["delay"], use_container_width=True)
 
     st.markdown("""
     👉 La majorité des retards est **courte** :  
@@ -58,27 +124,12 @@ with tab1:
     # ANALYSE DES ANNULATIONS 
     st.header("❌ Analyse des annulations liées aux retards")
 
-    mask = df['previous_ended_rental_id'] > 0
-    df_nan = df[mask]
-    st.metric("Le nombre d'annulations du au retard du véhicule liées à un location précendente est de", (df_nan["state"] == "canceled").sum())
-    annulation = (df_nan["state"] == "canceled").sum() 
-    st.metric("La location moyenne d'un véhicule par jour est de ", df_pricing['rental_price_per_day'].mean().round(2))
-    st.metric("La perte du aux annulations s'élève a :", (annulation * loc_moyenne).round(2))
-
-    canceled = df[df["state"] == "canceled"][["rental_id", "car_id", "previous_ended_rental_id", "checkin_type","time_delta_with_previous_rental_in_minutes"]]
-
-    merged = canceled.merge(
-        df[["rental_id", "car_id", "delay_at_checkout_in_minutes", "checkin_type"]],
-        left_on="previous_ended_rental_id",   
-        right_on="rental_id",                 
-        suffixes=("_canceled", "_previous")
-    )
+    st.metric("Le nombre d'annulations du au retard du véhicule liées à un location précendente est de", metrics["canceled_linked"])
+    st.metric("La location moyenne d'un véhicule par jour est de ", round(loc_moyenne, 2))
+    st.metric("La perte du aux annulations s'élève a :", round(metrics["lost_revenue"], 2))
 
-    conflict_strict = merged[
-        merged["delay_at_checkout_in_minutes"] > merged["time_delta_with_previous_rental_in_minutes"]
-    ]
-    st.metric("Conflits stricts :", len(conflict_strict))
-    st.metric("Moyenne retard précédent (conflits seulement) :", conflict_strict["delay_at_checkout_in_minutes"].mean().round(2))
+    st.metric("Conflits stricts :", metrics["strict_conflicts"][ALL])
+    st.metric("Moyenne retard précédent (conflits seulement) :", round(metrics["strict_conflict_delay"][ALL], 2))
 
     st.markdown("""
     👉 Parmi les **229 annulations liées à une location précédente**,  
@@ -86,132 +137,25 @@ with tab1:
     Ces retards sont très longs (~4h15 en moyenne).
     """)
 
-    conflict_minus30 = merged[
-        merged["delay_at_checkout_in_minutes"] > merged["time_delta_with_previous_rental_in_minutes"] - 30
-    ]
-
-    conflict_minus60 = merged[
-        merged["delay_at_checkout_in_minutes"] > merged["time_delta_with_previous_rental_in_minutes"] - 60
-    ]
-
-    conflict_minus90 = merged[
-        merged["delay_at_checkout_in_minutes"] > merged["time_delta_with_previous_rental_in_minutes"] - 90
-    ]
-
-    conflict_minus180 = merged[
-        merged["delay_at_checkout_in_minutes"] > merged["time_delta_with_previous_rental_in_minutes"] - 180
-    ]
-
-
-    results = [
-        {"Buffer": "-30 min", "Conflits": (len(conflict_minus30)-len(conflict_strict)), "Moyenne retard (min)": conflict_minus30["delay_at_checkout_in_minutes"].mean()},
-        {"Buffer": "-60 min", "Conflits": (len(conflict_minus60)-len(conflict_strict)), "Moyenne retard (min)": conflict_minus60["delay_at_checkout_in_minutes"].mean()},
-        {"Buffer": "-90 min", "Conflits": (len(conflict_minus90)-len(conflict_strict)), "Moyenne retard (min)": conflict_minus90["delay_at_checkout_in_minutes"].mean()},
-        {"Buffer": "-180 min", "Conflits": (len(conflict_minus180)-len(conflict_strict)), "Moyenne retard (min)": conflict_minus180["delay_at_checkout_in_minutes"].mean()},
-    ]
-    df_conflicts = pd.DataFrame(results)
-    df_conflicts['lost_value'] = df_conflicts["Conflits"]*loc_moyenne
-    st.dataframe(df_conflicts)
+    st.dataframe(snapshot[f"conflicts_{ALL}"])
 
     st.markdown("""Si on regarde 30 miniutes avant le début de la location du véhicule combien ont été annulé (buffer de 30 minutes), on détecte 10 annulations supplémentaires : ces cas correspondent à des locations rendues trop proches de la suivante (<30 min de marge).
     Avec un buffer de 60 minutes, seulement 3 cas en plus → ce sont donc des situations rares mais critiques.
     En élargissant à 90 minutes, on ajoute encore 7 cas.""")
 
 
-    fig_type = px.histogram(
-        df.query("-150 <= delay_at_checkout_in_minutes <= 150"),
-        x="delay_at_checkout_in_minutes",
-        color="checkin_type",
-        nbins=int((150 - (-150)) / 10),  
-        opacity=0.2,
-        title="Distribution des retards par type de check-in",
-        labels={"delay_at_checkout_in_minutes": "Retard (minutes)"},
-        range_x=[-150, 150],
-        width=1200, height=600,
-    )
-    fig_type.update_layout(barmode="overlay")
-    fig_type.update_yaxes(title="Nombre de locations")
-    #
-    st.plotly_chart(fig_type, use_container_width=True)
-
-
-    st.markdown(""" ANALYSE SUR MOBILE """)
+    st.plotly_chart(figures["checkin_type"], use_container_width=True)
 
-    mask = merged["checkin_type_canceled"] == "mobile"
-    merged_mob = merged[mask]
-    conflict_strict1= merged_mob[
-        merged_mob["delay_at_checkout_in_minutes"] > merged_mob["time_delta_with_previous_rental_in_minutes"]
-    ]
-    st.metric("Conflits stricts :", len(conflict_strict1))
-    st.metric("Moyenne retard précédent (conflits seulement) :", conflict_strict1["delay_at_checkout_in_minutes"].mean().round(2))
 
-    conflict_1minus30 = merged_mob[
-        merged_mob["delay_at_checkout_in_minutes"] > merged_mob["time_delta_with_previous_rental_in_minutes"] - 30
-    ]
+    for checkin_type, title in [("mobile", " ANALYSE SUR MOBILE "), ("connect", " ANALYSE SUR CONNECT ")]:
+        st.markdown(title)
+        st.metric("Conflits stricts :", metrics["strict_conflicts"][checkin_type])
+        st.metric("Moyenne retard précédent (conflits seulement) :", round(metrics["strict_conflict_delay"][checkin_type], 2))
+        st.dataframe(snapshot[f"conflicts_{checkin_type}"])
 
-    conflict_1minus60 = merged_mob[
-        merged_mob["delay_at_checkout_in_minutes"] > merged_mob["time_delta_with_previous_rental_in_minutes"] - 60
-    ]
-
-    conflict_1minus90 = merged_mob[
-        merged_mob["delay_at_checkout_in_minutes"] > merged_mob["time_delta_with_previous_rental_in_minutes"] - 90
-    ]
-
-    conflict_1minus180 = merged_mob[
-        merged_mob["delay_at_checkout_in_minutes"] > merged_mob["time_delta_with_previous_rental_in_minutes"] - 180
-    ]
-
-
-    results = [
-        {"Buffer": "-30 min", "Conflits": (len(conflict_1minus30)-len(conflict_strict1)), "Moyenne retard (min)": conflict_1minus30["delay_at_checkout_in_minutes"].mean()},
-        {"Buffer": "-60 min", "Conflits": (len(conflict_1minus60)-len(conflict_strict1)), "Moyenne retard (min)": conflict_1minus60["delay_at_checkout_in_minutes"].mean()},
-        {"Buffer": "-90 min", "Conflits": (len(conflict_1minus90)-len(conflict_strict1)), "Moyenne retard (min)": conflict_1minus90["delay_at_checkout_in_minutes"].mean()},
-        {"Buffer": "-180 min", "Conflits": (len(conflict_1minus180)-len(conflict_strict1)), "Moyenne retard (min)": conflict_1minus180["delay_at_checkout_in_minutes"].mean()},
-    ]
-    df_conflicts_mob = pd.DataFrame(results)
-    df_conflicts_mob['lost_value'] = df_conflicts_mob["Conflits"]*loc_moyenne
-    st.dataframe(df_conflicts_mob)
-
-    st.markdown(""" ANALYSE SUR CONNECT """)
-
-    mask = merged["checkin_type_canceled"] == "connect"
-    merged_connect = merged[mask]
-    conflict_strict2 = merged_connect[
-        merged_connect["delay_at_checkout_in_minutes"] > merged_connect["time_delta_with_previous_rental_in_minutes"]
-    ]
-    st.metric("Conflits stricts :", len(conflict_strict2))
-    st.metric("Moyenne retard précédent (conflits seulement) :", conflict_strict2["delay_at_checkout_in_minutes"].mean().round(2))
-
-
-    conflict_2minus30 = merged_connect[
-        merged_connect["delay_at_checkout_in_minutes"] > merged_connect["time_delta_with_previous_rental_in_minutes"] - 30
-    ]
-
-
-    conflict_2minus60 = merged_connect[
-        merged_connect["delay_at_checkout_in_minutes"] > merged_connect["time_delta_with_previous_rental_in_minutes"] - 60
-    ]
-
-    conflict_2minus90 = merged_connect[
-        merged_connect["delay_at_checkout_in_minutes"] > merged_connect["time_delta_with_previous_rental_in_minutes"] - 90
-    ]
-
-    conflict_2minus180 = merged_connect[
-        merged_connect["delay_at_checkout_in_minutes"] > merged_connect["time_delta_with_previous_rental_in_minutes"] - 180
-    ]
-
-
-    results = [
-        {"Buffer": "-30 min", "Conflits": (len(conflict_2minus30)-len(conflict_strict2)), "Moyenne retard (min)": conflict_2minus30["delay_at_checkout_in_minutes"].mean()},
-        {"Buffer": "-60 min", "Conflits": (len(conflict_2minus60)-len(conflict_strict2)), "Moyenne retard (min)": conflict_2minus60["delay_at_checkout_in_minutes"].mean()},
-        {"Buffer": "-90 min", "Conflits": (len(conflict_2minus90)-len(conflict_strict2)), "Moyenne retard (min)": conflict_2minus90["delay_at_checkout_in_minutes"].mean()},
-        {"Buffer": "-180 min", "Conflits": (len(conflict_2minus180)-len(conflict_strict2)), "Moyenne retard (min)": conflict_2minus180["delay_at_checkout_in_minutes"].mean()},
-    ]
-    df_conflicts_con = pd.DataFrame(results)
-
-    df_conflicts_con['lost_value'] = df_conflicts_con["Conflits"]*loc_moyenne
-
-    st.dataframe(df_conflicts_con)
+    st.subheader("🔗 Chaînes de locations")
+    for column, (label, value) in zip(st.columns(5), metrics["chains"].items()):
+        column.metric(label, value)
 
     st.markdown("""Les deux systèmes subissent des annulations liées aux délais courts.
     Connect est plus fréquent en volume absolu, mais ses retards sont légèrement moins sévères.
@@ -224,60 +168,23 @@ with tab1:
     st.markdown(""" Afin d'analyser l'impact d'un buffer nous prenons cette fois ci que les locations qui ont eu lieu et filtrons toutes les locations ayant débutées dans les 30 minutes qui suit la précéddentes.
     Ces locations sont celle qui risquent d'etre impactées par ce delai """)
 
-    loc_moyenne = df_pricing["rental_price_per_day"].mean()
-    CA_total = (df['state'] == 'ended').sum() * loc_moyenne
-
-
-    df_valid = df[df["state"] == "ended"].copy()
-    df_valid["ecart"] = df_valid["time_delta_with_previous_rental_in_minutes"] - df_valid["delay_at_checkout_in_minutes"]
-
-    def count_blocked(df, buffer):
-        return (df["ecart"] < buffer).sum()
-
-    results = []
-    for b in [30, 60, 90, 180]:
-        blocked = count_blocked(df_valid, b)
-        perte_estimee = blocked * loc_moyenne
-        results.append({"Buffer (min)": b, "Locations bloquées": blocked, "Perte estimée ($)": round(perte_estimee, 2)})
-
-    df_results = pd.DataFrame(results)
-    st.dataframe(df_results)
-
-
-    st.markdown(""" MOBILE UNIQUEMENT""")
-
-    df_valid_mob = df[(df["state"] == "ended") & (df["checkin_type"] == "mobile")].copy()
-    df_valid_mob["ecart"] = df_valid_mob["time_delta_with_previous_rental_in_minutes"] - df_valid_mob["delay_at_checkout_in_minutes"]
-
-    def count_blocked(df, buffer):
-        return (df["ecart"] < buffer).sum()
+    for checkin_type, title in [(ALL, None), ("mobile", " MOBILE UNIQUEMENT"), ("connect", " CONNECT UNIQUEMENT")]:
+        if title:
+            st.markdown(title)
+        st.dataframe(snapshot[f"blocked_{checkin_type}"])
 
-    results2 = []
-    for b in [30, 60, 90, 180]:
-        blocked = count_blocked(df_valid_mob, b)
-        perte_estimee = blocked * loc_moyenne
-        results2.append({"Buffer (min)": b, "Locations bloquées": blocked, "Perte estimée ($)": round(perte_estimee, 2)})
+    # Courbe complète, minute par minute
+    st.subheader("Courbe complète des buffers")
+    curve = snapshot["buffer_curve"]
+    st.plotly_chart(figures["buffer_curve"], use_container_width=True)
 
-    df_results_mob = pd.DataFrame(results2)
-    st.dataframe(df_results_mob)
-
-
-    st.markdown(""" CONNECT UNIQUEMENT""")
-
-    df_valid_con = df[(df["state"] == "ended") & (df["checkin_type"] == "connect")].copy()
-    df_valid_con["ecart"] = df_valid_con["time_delta_with_previous_rental_in_minutes"] - df_valid_con["delay_at_checkout_in_minutes"]
-
-    def count_blocked(df, buffer):
-        return (df["ecart"] < buffer).sum()
-
-    results3 = []
-    for b in [30, 60, 90, 180]:
-        blocked = count_blocked(df_valid_con, b)
-        perte_estimee = blocked * loc_moyenne
-        results3.append({"Buffer (min)": b, "Locations bloquées": blocked, "Perte estimée ($)": round(perte_estimee, 2)})
-
-    df_results_con = pd.DataFrame(results3)
-    st.dataframe(df_results_con)
+    selected = st.slider("Buffer (min)", min_value=0, max_value=int(DEFAULT_BUFFERS[-1]), value=60, step=1)
+    at_buffer = curve[curve["buffer"] == selected].set_index("checkin_type")
+    for column, checkin_type in zip(st.columns(len(at_buffer)), at_buffer.index):
+        row = at_buffer.loc[checkin_type]
+        column.metric(f"Bloquées ({checkin_type})", int(row["blocked"]))
+        column.metric(f"Conflits évités ({checkin_type})", int(row["avoided_conflicts"]))
+        column.metric(f"Bilan ({checkin_type})", round(row["saved_revenue"] - row["lost_revenue"], 2))
 
     st.markdown("""
     👉 Un buffer **de 30 min bloque ~340 locations** → pertes supérieures aux gains.  
@@ -309,19 +216,16 @@ with tab1:
     
 
 # ANALYSE DU PRICING
-with tab2:
+def render_pricing():
     st.header("Analyse Pricing")
     
-    df_pricing = pd.read_csv("data/pricing_clean.csv")
+    snapshot = dashboard_snapshot()
+    figures = pricing_figures(snapshot, snapshot.version)
 
-    fig_price = px.histogram(df_pricing, x="rental_price_per_day", nbins=50,
-                            title="Distribution des prix de location par jour")
-    st.plotly_chart(fig_price, use_container_width=True)
+    st.plotly_chart(figures["price"], use_container_width=True)
 
 
-    fig_car_typ = px.box(df_pricing, x="car_type", y="rental_price_per_day",
-                title="Prix par type de véhicule")
-    st.plotly_chart(fig_car_typ, use_container_width=True)
+    st.plotly_chart(figures["car_type"], use_container_width=True)
 
 
     st.markdown("""
@@ -331,23 +235,7 @@ with tab2:
     """)
 
 
-    df_corr = df_pricing.copy()
-    bool_cols = df_corr.select_dtypes(include="bool").columns
-    df_corr[bool_cols] = df_corr[bool_cols].astype(int)
-
-    num_df = df_corr.select_dtypes(include=["int64", "float64"])
-
-    corr = num_df.corr()
-
-    fig_cor = px.imshow(
-        corr,
-        text_auto=True,
-        color_continuous_scale="RdBu_r",
-        title="Matrice de corrélation",
-        height=800,
-        width=1000
-    )
-    st.plotly_chart(fig_cor, use_container_width=True)
+    st.plotly_chart(figures["correlation"], use_container_width=True)
 
     st.markdown(""" 
     + corrélation prix ↔ puissance moteur
@@ -358,7 +246,9 @@ with tab2:
                 
     Présence de GPS = + valeur ajoutée """)
     
-with tab3:
+def render_prediction():
+    from prediction_client import API_URL, WHAT_IF_FEATURES, PredictionError
+
     st.header("🔧 Prédiction API")
 
     # Sélection des valeurs
@@ -394,13 +284,48 @@ with tab3:
         "winter_tires": winter_tires
     }
 
+    client = prediction_client()
     if st.button("🔮 Prédire le prix"):
         try:
-            response = requests.post("https://gdleds-api-get.hf.space/predict", json=payload)
-            if response.status_code == 200:
-                result = response.json()
-                st.success(f"💰 Prix estimé : {result['predicted_price_per_day'][0]} $/jour")
-            else:
-                st.error(f"Erreur API ({response.status_code}) : {response.text}")
-        except Exception as e:
-            st.error(f"⚠️ Impossible d'appeler l'API : {e}")
+            price, source = client.predict(payload)
+            st.success(f"💰 Prix estimé : {price} $/jour")
+            if source == "local":
+                st.caption(f"API injoignable ({API_URL}) : prédiction par le modèle local")
+        except PredictionError as e:
+            st.error(f"⚠️ Prédiction impossible : {e}")
+
+    # Et si… : la configuration ci-dessus, en faisant varier une seule caractéristique
+    st.subheader("📈 Et si… ?")
+    feature = st.selectbox("Caractéristique à faire varier", WHAT_IF_FEATURES)
+    limits = {"mileage": (0, 300000, (0, 200000), 1000), "engine_power": (50, 300, (70, 250), 5)}[feature]
+    low, high = st.slider("Plage", min_value=limits[0], max_value=limits[1], value=limits[2], step=limits[3])
+    steps = st.number_input("Nombre de points", min_value=2, max_value=200, value=25)
+
+    if st.button("Tracer la courbe de prix"):
+        import numpy as np
+        import plotly.express as px
+
+        try:
+            curve, source = client.what_if(payload, feature, np.linspace(low, high, int(steps)).round())
+            fig_what_if = px.line(curve, x=feature, y="predicted_price_per_day", markers=True,
+                                  title=f"Prix estimé selon {feature}",
+                                  labels={"predicted_price_per_day": "Prix estimé ($/jour)"})
+            st.plotly_chart(fig_what_if, use_container_width=True)
+            st.caption(f"{len(curve)} configurations prédites ({source})")
+        except PredictionError as e:
+            st.error(f"⚠️ Prédiction impossible : {e}")
+
+
+st.set_page_config(page_title="Getaround – Dashboard Analyse", layout="wide")
+
+st.title("🚗 Dashboard Analyse – Getaround")
+st.markdown("""
+Bienvenue sur le dashboard interactif de l’étude Getaround.  
+Vous avez 3 sections pour naviguer sur les themes suivant :  
+1. Analyse Retards  
+2. Analyse Pricing 
+3. Prédiction API 
+""")
+
+section = st.radio("Section", SECTIONS, horizontal=True, label_visibility="collapsed", key="section")
+{SECTIONS[0]: render_delays, SECTIONS[1]: render_pricing, SECTIONS[2]: render_prediction}[section]()
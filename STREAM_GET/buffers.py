@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+# Simulation d'un délai minimum (buffer) entre deux locations.
+# La marge d'une location est `slack = time_delta_with_previous_rental - delay_at_checkout`
+# du véhicule précédent ; un buffer de b minutes concerne toutes les locations dont la
+# marge est < b. Les marges sont triées une fois par type de check-in, chaque buffer se
+# résout ensuite par `searchsorted`, et la somme des retards par somme cumulée.
+
+ALL = "all"
+DEFAULT_BUFFERS = np.arange(0, 721)
+
+
+def compute_slack(delta, delay):
+    return np.asarray(delta, dtype=np.float64) - np.asarray(delay, dtype=np.float64)
+
+
+class BufferEngine:
+    """Comptages « marge < buffer » pour un tableau quelconque de buffers.
+
+    `slack`, `groups` (ex. checkin_type) et `delays` sont alignés ligne à ligne ;
+    les marges manquantes (NaN) sont ignorées, comme dans une comparaison pandas.
+    """
+
+    def __init__(self, slack, groups=None, delays=None):
+        slack = np.asarray(slack, dtype=np.float64)
+        groups = np.full(len(slack), ALL, dtype=object) if groups is None else np.asarray(groups, dtype=object)
+        delays = np.zeros(len(slack)) if delays is None else np.asarray(delays, dtype=np.float64)
+        valid = ~np.isnan(slack)
+        slack, groups, delays = slack[valid], groups[valid], delays[valid]
+
+        order = np.argsort(slack, kind="stable")
+        slack, groups, delays = slack[order], groups[order], delays[order]
+        self.groups = [ALL] + sorted({g for g in groups if g != ALL})
+        self._sorted = {}
+        for group in self.groups:
+            mask = np.ones(len(slack), dtype=bool) if group == ALL else groups == group
+            # cumsum précédé de 0 : somme des k premiers retards = cum[k]
+            self._sorted[group] = (slack[mask], np.concatenate(([0.0], np.cumsum(delays[mask]))))
+
+    def count_below(self, buffers, group=ALL):
+        sorted_slack, _ = self._sorted[group]
+        return np.searchsorted(sorted_slack, np.asarray(buffers, dtype=np.float64), side="left")
+
+    def count_resolved(self, buffers, group=ALL):
+        """Lignes dont la marge est dans [0, b) : celles qu'un buffer de b minutes change réellement.
+
+        Les marges déjà négatives sont des conflits stricts, présents quel que soit le buffer.
+        """
+        strict = self.count_below([0], group)[0]
+        return np.maximum(self.count_below(buffers, group) - strict, 0)
+
+    def mean_delay_below(self, buffers, group=ALL):
+        sorted_slack, cumulative = self._sorted[group]
+        counts = np.searchsorted(sorted_slack, np.asarray(buffers, dtype=np.float64), side="left")
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, cumulative[counts] / counts, np.nan)
+
+
+def conflict_engine(pairs):
+    """Annulations dont le retard précédent dépasse la marge − buffer, par type de check-in de l'annulée."""
+    return BufferEngine(
+        compute_slack(pairs["time_delta_with_previous_rental_in_minutes"], pairs["delay_at_checkout_in_minutes"]),
+        groups=pairs["checkin_type_canceled"].astype(str),
+        delays=pairs["delay_at_checkout_in_minutes"],
+    )
+
+
+def blocking_engine(df):
+    """Locations terminées qu'un buffer aurait bloquées."""
+    ended = df[df["state"] == "ended"]
+    return BufferEngine(
+        compute_slack(ended["time_delta_with_previous_rental_in_minutes"], ended["delay_at_checkout_in_minutes"]),
+        groups=ended["checkin_type"].astype(str),
+        delays=ended["delay_at_checkout_in_minutes"],
+    )
+
+
+def buffer_curve(blocking, conflicts, buffers=DEFAULT_BUFFERS, price=0.0):
+    """Courbe complète buffer × checkin_type.
+
+    Colonnes : locations bloquées (marge < buffer, comme blocked_table), conflits évités
+    (marge dans [0, buffer), comme conflict_table : un buffer nul n'en évite aucun),
+    revenus perdus (bloquées × prix moyen) et préservés (conflits évités × prix moyen).
+    """
+    buffers = np.asarray(buffers)
+    frames = []
+    for group in blocking.groups:
+        blocked = blocking.count_below(buffers, group)
+        avoided = conflicts.count_resolved(buffers, group) if group in conflicts.groups else np.zeros(len(buffers), dtype=int)
+        frames.append(pd.DataFrame({
+            "buffer": buffers,
+            "checkin_type": group,
+            "blocked": blocked,
+            "avoided_conflicts": avoided,
+            "lost_revenue": blocked * price,
+            "saved_revenue": avoided * price,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def conflict_table(engine, group, buffers, price):
+    """Tableau historique : conflits au-delà des conflits stricts pour chaque buffer."""
+    counts = engine.count_resolved(buffers, group)
+    table = pd.DataFrame({
+        "Buffer": [f"-{b} min" for b in buffers],
+        "Conflits": counts,
+        "Moyenne retard (min)": engine.mean_delay_below(buffers, group),
+    })
+    table["lost_value"] = table["Conflits"] * price
+    return table
+
+
+def blocked_table(engine, group, buffers, price):
+    blocked = engine.count_below(buffers, group)
+    return pd.DataFrame({
+        "Buffer (min)": buffers,
+        "Locations bloquées": blocked,
+        "Perte estimée ($)": np.round(blocked * price, 2),
+    })
@@ -0,0 +1,182 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Index des chaînes de locations, construit une fois puis mis à jour par ajout.
+#
+# - rental_id → position de ligne : identifiants triés + positions, résolus par searchsorted ;
+# - car_id → locations du véhicule : positions triées par (car_id, rental_id) avec des
+#   offsets de type CSR. Le journal n'a pas d'horodatage : l'ordre des rental_id, croissants
+#   dans le temps, sert d'ordre chronologique ;
+# - position → position de la location précédente (-1 si absente), ce qui remplace les
+#   jointures `previous_ended_rental_id → rental_id`.
+
+_KEY = np.dtype([("car", np.int64), ("rental", np.int64)])
+_FORMAT_VERSION = 1
+
+
+def _as_int(values):
+    """Identifiants (éventuellement nullables) en int64, -1 pour les valeurs manquantes."""
+    return pd.Series(values).astype("Float64").fillna(-1).to_numpy(dtype=np.int64)
+
+
+class RentalIndex:
+    def __init__(self, sorted_ids, id_positions, chain_keys, chain_positions, previous_ids, previous, source=None):
+        self.sorted_ids = sorted_ids
+        self.id_positions = id_positions
+        self.chain_keys = chain_keys
+        self.chain_positions = chain_positions
+        self.previous_ids = previous_ids
+        self.previous = previous
+        self.source = source or {}
+        self._car_offsets = None
+
+    @property
+    def n_rows(self):
+        return len(self.previous)
+
+    # === Construction ===
+    @classmethod
+    def build(cls, df, source=None):
+        rental_ids = _as_int(df["rental_id"])
+        order = np.argsort(rental_ids, kind="stable")
+        sorted_ids = rental_ids[order]
+        if len(sorted_ids) > 1 and (np.diff(sorted_ids) == 0).any():
+            raise ValueError("rental_id en double dans le journal")
+
+        keys = np.empty(len(df), dtype=_KEY)
+        keys["car"], keys["rental"] = _as_int(df["car_id"]), rental_ids
+        chain_order = np.lexsort((keys["rental"], keys["car"]))
+
+        previous_ids = _as_int(df["previous_ended_rental_id"])
+        index = cls(sorted_ids, order.astype(np.int64), keys[chain_order], chain_order.astype(np.int64),
+                    previous_ids, np.full(len(df), -1, dtype=np.int64), source)
+        index.previous = index.lookup(previous_ids)
+        return index
+
+    def append(self, df, source=None):
+        """Ajoute des locations (positions n_rows, n_rows + 1, …) sans reconstruire l'index."""
+        start = self.n_rows
+        rental_ids = _as_int(df["rental_id"])
+        positions = np.arange(start, start + len(df), dtype=np.int64)
+
+        order = np.argsort(rental_ids, kind="stable")
+        new_ids = rental_ids[order]
+        if (self.lookup(new_ids) >= 0).any() or (len(new_ids) > 1 and (np.diff(new_ids) == 0).any()):
+            raise ValueError("rental_id déjà présent dans l'index")
+        insert_at = np.searchsorted(self.sorted_ids, new_ids)
+        self.sorted_ids = np.insert(self.sorted_ids, insert_at, new_ids)
+        self.id_positions = np.insert(self.id_positions, insert_at, positions[order])
+
+        keys = np.empty(len(df), dtype=_KEY)
+        keys["car"], keys["rental"] = _as_int(df["car_id"]), rental_ids
+        chain_order = np.lexsort((keys["rental"], keys["car"]))
+        insert_at = np.searchsorted(self.chain_keys, keys[chain_order])
+        self.chain_keys = np.insert(self.chain_keys, insert_at, keys[chain_order])
+        self.chain_positions = np.insert(self.chain_positions, insert_at, positions[chain_order])
+        self._car_offsets = None
+
+        # Liens des nouvelles lignes, puis des anciennes dont la précédente arrive seulement maintenant
+        previous_ids = _as_int(df["previous_ended_rental_id"])
+        self.previous_ids = np.concatenate([self.previous_ids, previous_ids])
+        self.previous = np.concatenate([self.previous, self.lookup(previous_ids)])
+        pending = np.flatnonzero((self.previous[:start] < 0) & (self.previous_ids[:start] >= 0))
+        if len(pending):
+            self.previous[pending] = self.lookup(self.previous_ids[pending])
+        if source is not None:
+            self.source = source
+        return positions
+
+    # === Accès ===
+    def lookup(self, rental_ids):
+        """Positions des rental_id (-1 si inconnus)."""
+        rental_ids = np.asarray(rental_ids, dtype=np.int64)
+        result = np.full(len(rental_ids), -1, dtype=np.int64)
+        if not len(self.sorted_ids):
+            return result
+        found = np.minimum(np.searchsorted(self.sorted_ids, rental_ids), len(self.sorted_ids) - 1)
+        hit = (self.sorted_ids[found] == rental_ids) & (rental_ids >= 0)
+        result[hit] = self.id_positions[found[hit]]
+        return result
+
+    def car_offsets(self):
+        """(car_ids, offsets) : les locations du véhicule i sont chain_positions[offsets[i]:offsets[i + 1]]."""
+        if self._car_offsets is None:
+            cars = self.chain_keys["car"]
+            starts = np.flatnonzero(np.r_[True, cars[1:] != cars[:-1]]) if len(cars) else np.array([], dtype=np.int64)
+            self._car_offsets = (cars[starts], np.append(starts, len(cars)))
+        return self._car_offsets
+
+    def chain_depths(self):
+        """Nombre de locations précédentes enchaînées derrière chaque ligne (saut de pointeurs)."""
+        depth = (self.previous >= 0).astype(np.int64)
+        pointer = self.previous.copy()
+        active = np.flatnonzero(pointer >= 0)
+        while len(active):
+            target = pointer[active]
+            depth[active] += depth[target]
+            pointer[active] = pointer[target]
+            active = active[pointer[active] >= 0]
+        return depth
+
+    def chain_lengths(self):
+        """Longueur de chaque chaîne maximale (les lignes qui ne sont la précédente d'aucune autre)."""
+        has_successor = np.zeros(self.n_rows, dtype=bool)
+        has_successor[self.previous[self.previous >= 0]] = True
+        return self.chain_depths()[~has_successor] + 1
+
+    # === Persistance ===
+    def save(self, path):
+        tmp = path + ".tmp.npz"
+        np.savez(
+            tmp, sorted_ids=self.sorted_ids, id_positions=self.id_positions, chain_keys=self.chain_keys,
+            chain_positions=self.chain_positions, previous_ids=self.previous_ids, previous=self.previous,
+            source=np.array([json.dumps(self.source)]), version=np.array([_FORMAT_VERSION]),
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"][0]) != _FORMAT_VERSION:
+                raise ValueError("Format d'index obsolète")
+            return cls(data["sorted_ids"], data["id_positions"], data["chain_keys"], data["chain_positions"],
+                       data["previous_ids"], data["previous"], json.loads(str(data["source"][0])))
+
+    def rental_ids_by_position(self):
+        ids = np.empty(self.n_rows, dtype=np.int64)
+        ids[self.id_positions] = self.sorted_ids
+        return ids
+
+
+# === Statistiques à partir de l'index ===
+def conflict_pairs(df, index):
+    """Locations annulées et location précédente du même véhicule, reliées par l'index (sans jointure)."""
+    canceled = np.flatnonzero((df["state"] == "canceled").to_numpy())
+    previous = index.previous[canceled]
+    linked = previous >= 0
+    left = df.iloc[canceled[linked]][["rental_id", "car_id", "previous_ended_rental_id", "checkin_type", "time_delta_with_previous_rental_in_minutes"]]
+    right = df.iloc[previous[linked]][["rental_id", "car_id", "delay_at_checkout_in_minutes", "checkin_type"]]
+    left = left.rename(columns={"rental_id": "rental_id_canceled", "car_id": "car_id_canceled", "checkin_type": "checkin_type_canceled"})
+    right = right.rename(columns={"rental_id": "rental_id_previous", "car_id": "car_id_previous", "checkin_type": "checkin_type_previous"})
+    pairs = pd.concat([left.reset_index(drop=True), right.reset_index(drop=True)], axis=1)
+    # Même ordre de colonnes que la jointure pandas
+    return pairs[["rental_id_canceled", "car_id_canceled", "previous_ended_rental_id", "checkin_type_canceled",
+                  "time_delta_with_previous_rental_in_minutes", "rental_id_previous", "car_id_previous",
+                  "delay_at_checkout_in_minutes", "checkin_type_previous"]]
+
+
+def chain_summary(index):
+    lengths = index.chain_lengths()
+    car_ids, offsets = index.car_offsets()
+    per_car = np.diff(offsets)
+    linked = lengths[lengths > 1]
+    return {
+        "Chaînes (≥ 2 locations)": int(len(linked)),
+        "Longueur moyenne": round(float(linked.mean()), 2) if len(linked) else 0.0,
+        "Longueur max": int(lengths.max(initial=0)),
+        "Véhicules": int(len(car_ids)),
+        "Locations par véhicule (moy.)": round(float(per_car.mean()), 2) if len(per_car) else 0.0,
+    }
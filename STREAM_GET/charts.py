@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+
+# Données des graphiques calculées côté serveur : Plotly ne reçoit que des agrégats
+# (cases d'histogramme, effectifs, quartiles), jamais les lignes brutes. La taille de la
+# figure envoyée au navigateur dépend du nombre de cases et de groupes, pas du nombre
+# de locations. Plotly n'est importé qu'à la construction d'une figure.
+
+
+# === Agrégats ===
+def _values(values):
+    values = np.asarray(values, dtype=np.float64)
+    return values[~np.isnan(values)]
+
+
+def _factorize(groups, sort=False):
+    # Les catégories pandas sont factorisées par leurs codes, sans conversion ligne à ligne en str
+    codes, labels = pd.factorize(groups if isinstance(groups, pd.Series) else np.asarray(groups), sort=sort)
+    return codes, np.asarray(labels).astype(str)
+
+
+def _bin_index(values, edges):
+    # Case de chaque valeur (-1 hors des bornes), dernière case fermée comme np.histogram
+    index = np.searchsorted(edges, values, side="right") - 1
+    index[values == edges[-1]] = len(edges) - 2
+    index[(index < 0) | (index >= len(edges) - 1) | np.isnan(values)] = -1
+    return index
+
+
+def histogram(values, edges):
+    """Effectifs par case (colonnes left/right/count) ; la dernière case est fermée, comme np.histogram."""
+    edges = np.asarray(edges, dtype=np.float64)
+    counts = np.histogram(_values(values), bins=edges)[0]
+    return pd.DataFrame({"left": edges[:-1], "right": edges[1:], "count": counts})
+
+
+def grouped_histogram(values, groups, edges, name):
+    """Un histogramme par valeur de `groups` (colonne `name`), en un seul passage (bincount)."""
+    values = np.asarray(values, dtype=np.float64)
+    edges = np.asarray(edges, dtype=np.float64)
+    codes, labels = _factorize(groups, sort=True)
+    bins = len(edges) - 1
+    index = _bin_index(values, edges)
+    keep = (index >= 0) & (codes >= 0)
+    counts = np.bincount(codes[keep] * bins + index[keep], minlength=len(labels) * bins)
+    return pd.DataFrame({
+        "left": np.tile(edges[:-1], len(labels)),
+        "right": np.tile(edges[1:], len(labels)),
+        "count": counts,
+        name: np.repeat(labels, len(edges) - 1),
+    })
+
+
+def category_counts(values, name):
+    """Effectif par modalité, dans l'ordre d'apparition (camemberts, barres)."""
+    codes, labels = _factorize(values)
+    return pd.DataFrame({name: labels, "count": np.bincount(codes[codes >= 0], minlength=len(labels))})
+
+
+def box_stats(values, groups, name, whisker=1.5):
+    """Statistiques des boîtes à moustaches par groupe : quartiles (interpolation linéaire),
+    moustaches au dernier point à `whisker` × IQR des quartiles, moyenne et nombre de points aberrants."""
+    values = np.asarray(values, dtype=np.float64)
+    codes, labels = _factorize(groups, sort=True)
+    keep = ~np.isnan(values) & (codes >= 0)
+    order = np.argsort(codes[keep], kind="stable")
+    sorted_values = values[keep][order]
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(codes[keep], minlength=len(labels)))])
+
+    rows = []
+    for label, start, stop in zip(labels, bounds[:-1], bounds[1:]):
+        group = sorted_values[start:stop]
+        if not len(group):
+            continue
+        q1, median, q3 = np.quantile(group, [0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        inside = group[(group >= q1 - whisker * iqr) & (group <= q3 + whisker * iqr)]
+        rows.append({name: label, "count": len(group), "q1": q1, "median": median, "q3": q3,
+                     "lowerfence": inside.min(), "upperfence": inside.max(), "mean": group.mean(),
+                     "outliers": int(len(group) - len(inside))})
+    return pd.DataFrame(rows)
+
+
+# === Figures ===
+def histogram_figure(table, title, color=None, overlay=False, **kwargs):
+    """Histogramme déjà agrégé (left/right/count) : une barre par case, une trace par `color`."""
+    import plotly.express as px
+
+    table = table.assign(center=(table["left"] + table["right"]) / 2)
+    fig = px.bar(table, x="center", y="count", color=color, title=title, **kwargs)
+    fig.update_traces(width=float((table["right"] - table["left"]).iloc[0]))
+    fig.update_layout(bargap=0, barmode="overlay" if overlay else "relative")
+    return fig
+
+
+def pie_figure(table, names, title):
+    import plotly.express as px
+
+    return px.pie(table, names=names, values="count", title=title)
+
+
+def box_figure(table, group, title, yaxis_title):
+    """Boîtes à moustaches à partir de box_stats (points aberrants non tracés)."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Box(
+        x=table[group], q1=table["q1"], median=table["median"], q3=table["q3"],
+        lowerfence=table["lowerfence"], upperfence=table["upperfence"], mean=table["mean"], name=yaxis_title,
+    ))
+    fig.update_layout(title=title, xaxis_title=group, yaxis_title=yaxis_title)
+    return fig
+
+
+def payload_size(fig):
+    """Taille (octets) du JSON de la figure envoyé au navigateur."""
+    return len(fig.to_json().encode())
@@ -0,0 +1,90 @@
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from chains import RentalIndex
+from store import CACHE_DIR, DATA_DIR, DATASETS, DELAY_FILE, load_dataset
+
+# Chargement des jeux de données du dashboard.
+# Chaque source est convertie une seule fois dans l'entrepôt typé (store.py), et
+# reconvertie quand elle change ; la lecture est projetée sur les colonnes demandées, et le
+# DataFrame est mis en cache par Streamlit pour toutes les sessions du processus.
+
+logger = logging.getLogger(__name__)
+
+
+def read_typed(name, path, columns=None):
+    """Jeu `name` lu depuis l'entrepôt (converti depuis `path` si besoin), ou depuis le CSV sans pyarrow."""
+    try:
+        return load_dataset(name, path, columns)
+    except ImportError:
+        # Sans pyarrow : lecture directe du CSV, sans entrepôt
+        return pd.read_csv(path, dtype=DATASETS[name]["dtypes"], usecols=columns)
+    except OSError as e:
+        logger.warning("Entrepôt indisponible, lecture du CSV : %s", e)
+        return pd.read_csv(path, dtype=DATASETS[name]["dtypes"], usecols=columns)
+
+
+@st.cache_data(show_spinner=False)
+def _load(name, path, mtime_ns, columns):
+    # mtime_ns fait partie de la clé : une source modifiée invalide le cache Streamlit
+    return read_typed(name, path, list(columns) if columns else None)
+
+
+def _load_file(name, columns=None):
+    path = os.path.join(DATA_DIR, DATASETS[name]["source"])
+    return _load(name, path, os.stat(path).st_mtime_ns, tuple(columns) if columns else None)
+
+
+def load_delays(columns=None):
+    return _load_file("delays", columns)
+
+
+def load_pricing(columns=None):
+    return _load_file("pricing", columns)
+
+
+# === Index des chaînes de locations ===
+def _index_path(path):
+    return os.path.join(CACHE_DIR, os.path.splitext(os.path.basename(path))[0] + ".index.npz")
+
+
+def load_or_build_index(df, path, mtime_ns):
+    """Index persisté dans CACHE_DIR.
+
+    S'il correspond à une version antérieure du journal complétée par ajout de lignes
+    (mêmes rental_id en tête), seules les nouvelles lignes sont indexées.
+    """
+    index_path = _index_path(path)
+    source = {"file": os.path.basename(path), "mtime_ns": mtime_ns, "rows": len(df)}
+    try:
+        index = RentalIndex.load(index_path)
+    except (OSError, ValueError, KeyError):
+        index = None
+
+    if index is not None and index.source == source:
+        return index
+    rental_ids = df["rental_id"].to_numpy(dtype=np.int64)
+    if index is not None and index.n_rows <= len(df) and np.array_equal(index.rental_ids_by_position(), rental_ids[:index.n_rows]):
+        index.append(df.iloc[index.n_rows:], source)
+    else:
+        index = RentalIndex.build(df, source)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        index.save(index_path)
+    except OSError as e:
+        logger.warning("Impossible d'écrire l'index %s : %s", index_path, e)
+    return index
+
+
+@st.cache_resource(show_spinner=False)
+def _load_index(path, mtime_ns, _df):
+    return load_or_build_index(_df, path, mtime_ns)
+
+
+def load_rental_index(df):
+    path = os.path.join(DATA_DIR, DELAY_FILE)
+    return _load_index(path, os.stat(path).st_mtime_ns, df)
@@ -0,0 +1,177 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from charts import category_counts, grouped_histogram, histogram
+
+# Agrégation parallèle : le DataFrame est découpé en partitions de lignes, chaque
+# processus calcule un agrégat partiel, puis les partiels sont fusionnés (`merge`).
+# Avec le démarrage "fork", les processus héritent du DataFrame sans sérialisation :
+# seules les bornes des partitions transitent. AGGREGATION_WORKERS=1 (défaut) calcule
+# les mêmes partiels dans le processus courant.
+
+AGGREGATION_WORKERS = int(os.getenv("AGGREGATION_WORKERS", "1"))
+
+PRICE_BIN_WIDTH = 10
+
+
+def price_bins(values, width=PRICE_BIN_WIDTH):
+    """Bornes de l'histogramme du prix, multiples de `width` couvrant [min, max] (passe min/max préalable)."""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return np.array([0.0, float(width)])
+    lo = np.floor(values.min() / width) * width
+    hi = (np.floor(values.max() / width) + 1) * width
+    return np.arange(lo, hi + width / 2, width)
+
+
+class PricingAggregates:
+    """Agrégats fusionnables du jeu pricing.
+
+    - effectif, moyennes et co-moments centrés des colonnes numériques/booléennes
+      (matrice de corrélation ; fusion par la formule de Chan, plus stable que les
+      sommes de carrés brutes) ;
+    - histogramme du prix sur `bins`, à dériver des données (price_bins) : une valeur hors
+      des bornes ne serait comptée dans aucune case.
+    """
+
+    def __init__(self, columns, bins, target="rental_price_per_day"):
+        self.columns = list(columns)
+        self.target = target
+        self.bins = np.asarray(bins, dtype=np.float64)
+        self.n = 0
+        self.mean = np.zeros(len(self.columns))
+        self.comoment = np.zeros((len(self.columns), len(self.columns)))
+        self.hist = np.zeros(len(self.bins) - 1, dtype=np.int64)
+
+    def update(self, df):
+        X = df[self.columns].to_numpy(dtype=np.float64)
+        if not len(X):
+            return self
+        partial = PricingAggregates(self.columns, self.bins, self.target)
+        partial.n = len(X)
+        partial.mean = X.mean(axis=0)
+        centered = X - partial.mean
+        partial.comoment = centered.T @ centered
+
+        partial.hist = np.histogram(df[self.target].to_numpy(dtype=np.float64), bins=self.bins)[0]
+        return self.merge(partial)
+
+    def merge(self, other):
+        if other.n:
+            n = self.n + other.n
+            delta = other.mean - self.mean
+            self.comoment = self.comoment + other.comoment + np.outer(delta, delta) * self.n * other.n / n
+            self.mean = self.mean + delta * other.n / n
+            self.n = n
+        self.hist = self.hist + other.hist
+        return self
+
+    def corr(self):
+        std = np.sqrt(np.diag(self.comoment))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = self.comoment / np.outer(std, std)
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+    def histogram(self):
+        return pd.DataFrame({"left": self.bins[:-1], "right": self.bins[1:], "count": self.hist})
+
+
+class DelayCounts:
+    """Agrégats fusionnables du journal des retards affichés par le dashboard.
+
+    - effectif par état (ordre de première apparition, comme charts.category_counts) ;
+    - histogramme des retards sur `edges` et par `group` (checkin_type) sur `group_edges`,
+      identiques à charts.histogram / charts.grouped_histogram sur le jeu entier.
+    """
+
+    def __init__(self, edges, group_edges, column="delay_at_checkout_in_minutes", group="checkin_type"):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.group_edges = np.asarray(group_edges, dtype=np.float64)
+        self.column = column
+        self.group = group
+        self.state_counts = {}
+        self.hist = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.group_hist = {}
+
+    def update(self, df):
+        partial = DelayCounts(self.edges, self.group_edges, self.column, self.group)
+        for state, count in category_counts(df["state"], "state").itertuples(index=False):
+            partial.state_counts[state] = int(count)
+        delay = df[self.column].to_numpy(dtype=np.float64, na_value=np.nan)
+        partial.hist = histogram(delay, self.edges)["count"].to_numpy()
+        grouped = grouped_histogram(delay, df[self.group], self.group_edges, self.group)
+        for key, table in grouped.groupby(self.group, sort=False):
+            partial.group_hist[key] = table["count"].to_numpy()
+        return self.merge(partial)
+
+    def merge(self, other):
+        for state, count in other.state_counts.items():
+            self.state_counts[state] = self.state_counts.get(state, 0) + count
+        self.hist = self.hist + other.hist
+        for key, counts in other.group_hist.items():
+            self.group_hist[key] = self.group_hist.get(key, 0) + counts
+        return self
+
+    def states(self):
+        return pd.DataFrame({"state": list(self.state_counts), "count": list(self.state_counts.values())})
+
+    def histogram(self):
+        return pd.DataFrame({"left": self.edges[:-1], "right": self.edges[1:], "count": self.hist})
+
+    def grouped_histogram(self):
+        keys = sorted(self.group_hist)
+        bins = len(self.group_edges) - 1
+        return pd.DataFrame({
+            "left": np.tile(self.group_edges[:-1], len(keys)),
+            "right": np.tile(self.group_edges[1:], len(keys)),
+            "count": np.concatenate([self.group_hist[k] for k in keys]) if keys else np.array([], dtype=np.int64),
+            self.group: np.repeat(np.array(keys, dtype=str), bins),
+        })
+
+
+def pricing_columns(df):
+    """Colonnes de la matrice de corrélation du dashboard : numériques et booléennes, dans l'ordre."""
+    return [c for c in df.columns if pd.api.types.is_bool_dtype(df[c]) or pd.api.types.is_integer_dtype(df[c])
+            or pd.api.types.is_float_dtype(df[c])]
+
+
+# === Côté processus de calcul ===
+_partition_data = {}
+
+
+def _set_data(df):
+    _partition_data["df"] = df
+
+
+def _aggregate_partition(factory, start, stop):
+    return factory().update(_partition_data["df"].iloc[start:stop])
+
+
+def partition_bounds(n_rows, partitions):
+    edges = np.linspace(0, n_rows, max(1, min(partitions, n_rows or 1)) + 1).astype(np.int64)
+    return list(zip(edges[:-1].tolist(), edges[1:].tolist()))
+
+
+def parallel_aggregate(df, factory, workers=None, partitions=None):
+    """Agrège `df` par partitions ; `factory()` crée un agrégat vide (picklable : classe ou functools.partial)."""
+    workers = workers or AGGREGATION_WORKERS
+    bounds = partition_bounds(len(df), partitions or workers)
+    if workers <= 1:
+        result = factory()
+        for start, stop in bounds:
+            result.merge(factory().update(df.iloc[start:stop]))
+        return result
+
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_set_data, initargs=(df,)) as pool:
+        partials = list(pool.map(_aggregate_partition, [factory] * len(bounds), *zip(*bounds)))
+    result = factory()
+    for partial in partials:
+        result.merge(partial)
+    return result
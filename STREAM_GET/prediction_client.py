@@ -0,0 +1,158 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Client de l'API de prédiction pour l'onglet Prédiction.
+# Une session HTTP unique (pool de connexions keep-alive) est réutilisée pour tous les
+# appels, avec timeouts et nouvelles tentatives (backoff exponentiel sur erreurs réseau,
+# 429 et 5xx). Plusieurs configurations partent en un seul appel /predict/batch ; si
+# l'API ne l'expose pas, en appels /predict concurrents. Si l'API reste injoignable et
+# qu'un artefact local est configuré (LOCAL_MODEL_PATH), la prédiction se fait dans le
+# processus du dashboard ; une requête refusée (4xx) est remontée telle quelle. Le client
+# est partagé par toutes les sessions Streamlit : la provenance de chaque prédiction est
+# renvoyée avec les prix, jamais stockée sur l'instance. numpy/pandas ne sont importés que pour l'inférence locale et
+# la courbe « Et si… ? ».
+
+logger = logging.getLogger(__name__)
+
+API_URL = os.getenv("API_URL", "https://gdleds-api-get.hf.space").rstrip("/")
+API_CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", "3.05"))
+API_READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", "30"))
+API_RETRIES = int(os.getenv("API_RETRIES", "3"))
+API_BACKOFF = float(os.getenv("API_BACKOFF", "0.5"))
+API_CONCURRENCY = int(os.getenv("API_CONCURRENCY", "8"))
+LOCAL_MODEL_PATH = os.getenv("LOCAL_MODEL_PATH")
+
+# Ordre des colonnes attendu par le pipeline (identique à pricing_clean.csv et à InputData)
+FEATURES = [
+    "model_key", "mileage", "engine_power", "fuel", "paint_color", "car_type",
+    "private_parking_available", "has_gps", "has_air_conditioning", "automatic_car",
+    "has_getaround_connect", "has_speed_regulator", "winter_tires",
+]
+WHAT_IF_FEATURES = ["mileage", "engine_power"]
+
+# Codes indiquant que /predict/batch n'existe pas sur l'API distante
+_NO_BATCH_STATUS = (404, 405, 415)
+
+
+class PredictionError(Exception):
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+    @property
+    def unavailable(self):
+        """Vrai si l'API est en panne (5xx) ; faux pour une requête refusée (4xx)."""
+        return self.status_code is not None and self.status_code >= 500
+
+
+def make_session(retries=API_RETRIES, backoff=API_BACKOFF, pool_size=API_CONCURRENCY):
+    retry = Retry(
+        total=retries, backoff_factor=backoff, status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "POST"}), respect_retry_after_header=True, raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class PredictionClient:
+    def __init__(self, base_url=API_URL, timeout=(API_CONNECT_TIMEOUT, API_READ_TIMEOUT), retries=API_RETRIES,
+                 backoff=API_BACKOFF, concurrency=API_CONCURRENCY, model_path=LOCAL_MODEL_PATH):
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.model_path = model_path
+        self.session = make_session(retries, backoff, concurrency)
+        # Capacité de l'API distante, commune à toutes les sessions : ne passe que de True à False
+        self.batch_supported = True
+        self._model = None
+
+    # === Appels HTTP ===
+    def _post(self, path, payload):
+        response = self.session.post(f"{self.base_url}{path}", json=payload, timeout=self.timeout)
+        if response.status_code != 200:
+            raise PredictionError(f"Erreur API ({response.status_code}) : {response.text[:200]}", response.status_code)
+        return response.json()["predicted_price_per_day"]
+
+    def _predict_remote(self, rows):
+        """(prix, provenance) : api-batch ou api."""
+        if len(rows) > 1 and self.batch_supported:
+            try:
+                return self._post("/predict/batch", rows), "api-batch"
+            except PredictionError as e:
+                if e.status_code not in _NO_BATCH_STATUS:
+                    raise
+                logger.info("API sans /predict/batch : appels /predict concurrents")
+                self.batch_supported = False
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(rows))) as pool:
+            prices = [result[0] for result in pool.map(lambda row: self._post("/predict", row), rows)]
+        return prices, "api"
+
+    # === Inférence locale ===
+    def _local_model(self):
+        if self._model is None:
+            import joblib
+
+            try:
+                self._model = joblib.load(self.model_path)
+            except ImportError as e:
+                # Le pipeline picklé référence xgboost et sklearn : ils doivent être installés ici aussi
+                raise PredictionError(
+                    f"Inférence locale impossible, dépendance manquante pour {self.model_path} : {e.name or e}"
+                ) from e
+        return self._model
+
+    def _predict_local(self, rows):
+        import numpy as np
+        import pandas as pd
+
+        prices = self._local_model().predict(pd.DataFrame.from_records(rows, columns=FEATURES))
+        return np.round(prices.astype(float), 2).tolist(), "local"
+
+    # === Interface ===
+    def predict_many(self, rows):
+        """(prix prédits, provenance) pour une liste de configurations (dicts FEATURES).
+
+        Provenance : api-batch, api ou local. Seules une erreur réseau ou une réponse 5xx
+        basculent sur le modèle local ; une requête refusée (4xx) lève PredictionError.
+        """
+        rows = [{feature: row[feature] for feature in FEATURES} for row in rows]
+        if not rows:
+            return [], None
+        if self.base_url:
+            try:
+                return self._predict_remote(rows)
+            except requests.RequestException as e:
+                if not self.model_path:
+                    raise PredictionError(f"API injoignable : {e}") from e
+                logger.warning("API injoignable, inférence locale : %s", e)
+            except PredictionError as e:
+                if not e.unavailable or not self.model_path:
+                    raise
+                logger.warning("API indisponible, inférence locale : %s", e)
+        if not self.model_path:
+            raise PredictionError("Ni API_URL ni LOCAL_MODEL_PATH configuré")
+        return self._predict_local(rows)
+
+    def predict(self, row):
+        """(prix, provenance) d'une configuration."""
+        prices, source = self.predict_many([row])
+        return prices[0], source
+
+    def what_if(self, row, feature, values):
+        """(courbe, provenance) : prix quand `feature` parcourt `values`, les autres caractéristiques fixées."""
+        import pandas as pd
+
+        values = [int(v) for v in values]
+        prices, source = self.predict_many([{**row, feature: value} for value in values])
+        return pd.DataFrame({feature: values, "predicted_price_per_day": prices}), source
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,265 @@
+"""Instantané des agrégats affichés par le dashboard.
+
+    python snapshot.py                       # matérialise data/snapshots/<hash>/
+    python snapshot.py --force --workers 4
+
+Tout ce que l'onglet Retards et l'onglet Pricing affichent dépend uniquement des deux
+CSV de data/ : les agrégats sont calculés une fois, hors ligne, dans un répertoire
+versionné par l'empreinte sha256 des fichiers sources (manifest.json + tables Parquet).
+Le dashboard lit cet instantané ; sans instantané à jour, il recalcule les mêmes
+agrégats à partir des données brutes.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from buffers import ALL, DEFAULT_BUFFERS, blocked_table, blocking_engine, buffer_curve, conflict_engine, conflict_table
+from charts import box_stats
+from chains import RentalIndex, chain_summary, conflict_pairs
+from parallel import AGGREGATION_WORKERS, DelayCounts, PricingAggregates, parallel_aggregate, price_bins, pricing_columns
+from store import DATA_DIR, DELAY_FILE, PRICING_FILE, STORE_DIR, load_dataset
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", os.path.join(DATA_DIR, "snapshots"))
+# auto : instantané s'il correspond aux CSV (ou s'ils sont absents), sinon données brutes
+DASHBOARD_SOURCE = os.getenv("DASHBOARD_SOURCE", "auto")
+
+SNAPSHOT_VERSION = 4
+TABLE_BUFFERS = [30, 60, 90, 180]
+DELAY_WINDOW = (-150, 150)
+_LATEST = "latest"
+
+
+# === Empreinte des données ===
+def source_paths(data_dir=DATA_DIR):
+    return [os.path.join(data_dir, DELAY_FILE), os.path.join(data_dir, PRICING_FILE)]
+
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def dataset_hash(paths):
+    """Empreinte du jeu de données : sha256 des empreintes des fichiers, dans l'ordre."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(f"{os.path.basename(path)}:{file_sha256(path)}\n".encode())
+    return digest.hexdigest()
+
+
+def _source_stats(paths):
+    return {os.path.basename(p): {"size": os.stat(p).st_size, "mtime_ns": os.stat(p).st_mtime_ns} for p in paths}
+
+
+# === Calcul des agrégats ===
+def delay_counts():
+    # np.histogram ferme la dernière case : même fenêtre que `-150 <= retard <= 150`
+    lo, hi = DELAY_WINDOW
+    return DelayCounts(np.arange(lo, hi + 1, 5), np.arange(lo, hi + 1, 10))
+
+
+class Snapshot:
+    """Agrégats du dashboard : scalaires (manifest["metrics"]) et petites tables."""
+
+    def __init__(self, manifest, tables):
+        self.manifest = manifest
+        self.tables = tables
+
+    @property
+    def metrics(self):
+        return self.manifest["metrics"]
+
+    @property
+    def version(self):
+        """Version des données : empreinte des CSV, ou de leurs taille/mtime pour un calcul à partir des données brutes."""
+        if "dataset_hash" in self.manifest:
+            return self.manifest["dataset_hash"][:16]
+        sources = json.dumps(self.manifest.get("sources"), sort_keys=True)
+        return hashlib.sha256(sources.encode()).hexdigest()[:16]
+
+    def __getitem__(self, name):
+        return self.tables[name]
+
+    # === Persistance ===
+    def save(self, directory):
+        tmp = directory + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for name, table in self.tables.items():
+            table.to_parquet(os.path.join(tmp, f"{name}.parquet"), index=False)
+        with open(os.path.join(tmp, "manifest.json"), "w") as f:
+            json.dump({**self.manifest, "tables": sorted(self.tables)}, f, indent=1, ensure_ascii=False)
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp, directory)
+
+    @classmethod
+    def load(cls, directory):
+        with open(os.path.join(directory, "manifest.json")) as f:
+            manifest = json.load(f)
+        if manifest.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Version d'instantané {manifest.get('version')} != {SNAPSHOT_VERSION}")
+        tables = {name: pd.read_parquet(os.path.join(directory, f"{name}.parquet")) for name in manifest["tables"]}
+        return cls(manifest, tables)
+
+
+def build_snapshot(delays, pricing, index=None, workers=None, manifest=None):
+    """Calcule tous les agrégats affichés à partir des DataFrames bruts."""
+    index = index or RentalIndex.build(delays)
+    price = float(pricing["rental_price_per_day"].mean())
+    canceled = delays["state"] == "canceled"
+    linked_canceled = int((canceled & (delays["previous_ended_rental_id"] > 0)).sum())
+
+    conflicts = conflict_engine(conflict_pairs(delays, index))
+    blocking = blocking_engine(delays)
+    groups = [ALL] + [g for g in blocking.groups if g != ALL]
+    metrics = {
+        "canceled": int(canceled.sum()),
+        "canceled_linked": linked_canceled,
+        "mean_price": price,
+        "lost_revenue": linked_canceled * price,
+        "strict_conflicts": {g: int(conflicts.count_below([0], g)[0]) for g in groups if g in conflicts.groups},
+        "strict_conflict_delay": {g: float(conflicts.mean_delay_below([0], g)[0]) for g in groups if g in conflicts.groups},
+        "chains": chain_summary(index),
+    }
+
+    # Le box plot du prix reste calculé en série : les quartiles ne se fusionnent pas exactement
+    counts = parallel_aggregate(delays, delay_counts, workers)
+    bins = price_bins(pricing["rental_price_per_day"])
+    aggregates = parallel_aggregate(pricing, partial(PricingAggregates, pricing_columns(pricing), bins), workers)
+    tables = {
+        "states": counts.states(),
+        "delay_hist": counts.histogram(),
+        "delay_hist_checkin": counts.grouped_histogram(),
+        "buffer_curve": buffer_curve(blocking, conflicts, DEFAULT_BUFFERS, price),
+        "price_hist": aggregates.histogram(),
+        "price_box": box_stats(pricing["rental_price_per_day"], pricing["car_type"], "car_type"),
+        "correlation": aggregates.corr().rename_axis("column").reset_index(),
+    }
+    for group in groups:
+        if group in conflicts.groups:
+            tables[f"conflicts_{group}"] = conflict_table(conflicts, group, TABLE_BUFFERS, price)
+        tables[f"blocked_{group}"] = blocked_table(blocking, group, TABLE_BUFFERS, price)
+
+    manifest = {"version": SNAPSHOT_VERSION, "metrics": metrics, **(manifest or {})}
+    return Snapshot(manifest, tables)
+
+
+# === Matérialisation ===
+def _stored_version(directory):
+    # Un instantané d'une version antérieure (définitions d'agrégats modifiées) est recalculé
+    try:
+        with open(os.path.join(directory, "manifest.json")) as f:
+            return json.load(f).get("version")
+    except (OSError, ValueError):
+        return None
+
+
+def materialize(data_dir=DATA_DIR, output_dir=SNAPSHOT_DIR, workers=None, force=False):
+    """Écrit output_dir/<hash>/ (si absent ou `force`) et le désigne comme dernier instantané."""
+    paths = source_paths(data_dir)
+    key = dataset_hash(paths)
+    directory = os.path.join(output_dir, key[:16])
+    if force or _stored_version(directory) != SNAPSHOT_VERSION:
+        start = time.perf_counter()
+        # Lecture par l'entrepôt typé (conversion au premier passage)
+        store_dir = STORE_DIR if data_dir == DATA_DIR else os.path.join(data_dir, "store")
+        delays = load_dataset("delays", paths[0], store_dir=store_dir)
+        pricing = load_dataset("pricing", paths[1], store_dir=store_dir)
+        manifest = {
+            "dataset_hash": key,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "sources": _source_stats(paths),
+            "rows": {DELAY_FILE: len(delays), PRICING_FILE: len(pricing)},
+        }
+        snapshot = build_snapshot(delays, pricing, workers=workers, manifest=manifest)
+        snapshot.manifest["build_seconds"] = round(time.perf_counter() - start, 3)
+        os.makedirs(output_dir, exist_ok=True)
+        snapshot.save(directory)
+    with open(os.path.join(output_dir, _LATEST + ".tmp"), "w") as f:
+        f.write(key[:16])
+    os.replace(os.path.join(output_dir, _LATEST + ".tmp"), os.path.join(output_dir, _LATEST))
+    return directory
+
+
+def latest_snapshot(output_dir=SNAPSHOT_DIR):
+    """Dernier instantané matérialisé, ou None."""
+    try:
+        with open(os.path.join(output_dir, _LATEST)) as f:
+            return Snapshot.load(os.path.join(output_dir, f.read().strip()))
+    except (OSError, ValueError, KeyError) as e:
+        logger.info("Pas d'instantané utilisable dans %s : %s", output_dir, e)
+        return None
+
+
+def is_current(snapshot, paths):
+    """L'instantané correspond-il aux CSV ? Taille et mtime d'abord, empreinte sha256 sinon."""
+    if not all(os.path.isfile(p) for p in paths):
+        return True
+    if snapshot.manifest.get("sources") == _source_stats(paths):
+        return True
+    return snapshot.manifest.get("dataset_hash") == dataset_hash(paths)
+
+
+# === Dashboard ===
+@st.cache_resource(show_spinner=False)
+def _load_latest(output_dir, marker_mtime_ns):
+    # le mtime du fichier `latest` fait partie de la clé : une nouvelle matérialisation est prise en compte
+    return latest_snapshot(output_dir)
+
+
+@st.cache_resource(show_spinner="Calcul des agrégats à partir des données brutes…")
+def _build_from_raw(stats_key, workers):
+    from loaders import load_delays, load_pricing, load_rental_index
+
+    delays = load_delays()
+    manifest = {"source": "raw", "sources": json.loads(stats_key)}
+    return build_snapshot(delays, load_pricing(), load_rental_index(delays), workers, manifest)
+
+
+def load_dashboard_snapshot(source=DASHBOARD_SOURCE):
+    """Instantané matérialisé si possible (`source` : auto, snapshot ou raw), sinon calcul à partir des CSV."""
+    paths = source_paths()
+    if source != "raw":
+        marker = os.path.join(SNAPSHOT_DIR, _LATEST)
+        snapshot = _load_latest(SNAPSHOT_DIR, os.stat(marker).st_mtime_ns) if os.path.isfile(marker) else None
+        if snapshot is not None and (source == "snapshot" or is_current(snapshot, paths)):
+            return snapshot
+        if source == "snapshot":
+            raise FileNotFoundError(f"Aucun instantané dans {SNAPSHOT_DIR} : lancer `python snapshot.py`")
+        logger.warning("Instantané absent ou périmé : agrégats recalculés à partir des données brutes")
+    return _build_from_raw(json.dumps(_source_stats(paths), sort_keys=True), AGGREGATION_WORKERS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--output-dir", default=SNAPSHOT_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="processus pour les agrégats pricing")
+    parser.add_argument("--force", action="store_true", help="recalcule même si l'instantané existe")
+    args = parser.parse_args()
+
+    directory = materialize(args.data_dir, args.output_dir, args.workers, args.force)
+    snapshot = Snapshot.load(directory)
+    size = sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory))
+    print(f"Instantané {snapshot.manifest['dataset_hash'][:16]} : {directory} ({size / 1024:.0f} Ko, "
+          f"{len(snapshot.tables)} tables, calculé en {snapshot.manifest['build_seconds']} s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""Entrepôt de données typé : une copie Parquet de chaque jeu, avec schéma déclaré et empreinte.
+
+    python store.py                                        # data/*.csv -> data/store/<jeu>.parquet
+    python store.py --delays ../get_around_delay_analysis.xlsx --verify
+
+Chaque source (CSV, ou feuille XLSX) est parsée une seule fois avec les types déclarés
+ci-dessous (catégories, entiers nullables, booléens). Les métadonnées du fichier Parquet
+portent ces types, la source (nom, taille, mtime, sha256) et l'empreinte sha256 du
+contenu typé. Le dashboard, l'entraînement et les benchmarks lisent ces fichiers en
+mémoire mappée, en ne chargeant que les colonnes utiles.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+STORE_DIR = os.getenv("DATA_STORE_DIR", os.path.join(DATA_DIR, "store"))
+# Fichiers dérivés hors entrepôt (index des chaînes, CSV convertis depuis le XLSX)
+CACHE_DIR = os.getenv("DATA_CACHE_DIR", os.path.join(DATA_DIR, ".cache"))
+STORE_VERSION = 1
+
+DELAY_FILE = "get_around_delay_analysis.csv"
+PRICING_FILE = "pricing_clean.csv"
+XLSX_SHEET = "rentals_data"
+
+# === Schéma déclaré ===
+# Types pandas ; "Int64" : entier nullable, "int64"/"bool" : valeur obligatoire
+DELAY_DTYPES = {
+    "rental_id": "Int64",
+    "car_id": "Int64",
+    "checkin_type": "category",
+    "state": "category",
+    "delay_at_checkout_in_minutes": "float64",
+    "previous_ended_rental_id": "Int64",
+    "time_delta_with_previous_rental_in_minutes": "float64",
+}
+
+PRICING_DTYPES = {
+    "model_key": "category",
+    "mileage": "int64",
+    "engine_power": "int64",
+    "fuel": "category",
+    "paint_color": "category",
+    "car_type": "category",
+    "private_parking_available": "bool",
+    "has_gps": "bool",
+    "has_air_conditioning": "bool",
+    "automatic_car": "bool",
+    "has_getaround_connect": "bool",
+    "has_speed_regulator": "bool",
+    "winter_tires": "bool",
+    "rental_price_per_day": "int64",
+}
+
+DATASETS = {
+    "delays": {"source": DELAY_FILE, "dtypes": DELAY_DTYPES},
+    "pricing": {"source": PRICING_FILE, "dtypes": PRICING_DTYPES},
+}
+
+_METADATA_KEY = b"getaround_store"
+
+
+def arrow_schema(dtypes):
+    import pyarrow as pa
+
+    types = {
+        "category": pa.dictionary(pa.int32(), pa.string()),
+        "Int64": pa.int64(),
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "bool": pa.bool_(),
+    }
+    return pa.schema([pa.field(name, types[dtype], nullable=dtype not in ("int64", "bool"))
+                      for name, dtype in dtypes.items()])
+
+
+def store_path(name, store_dir=STORE_DIR):
+    return os.path.join(store_dir, f"{name}.parquet")
+
+
+# === Conversion ===
+def _file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_stats(path):
+    stat = os.stat(path)
+    return {"file": os.path.basename(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def content_sha256(df):
+    """Empreinte du contenu typé : noms, types et hachage des valeurs de chaque colonne.
+
+    Indépendante de la disposition physique (fichier, groupes de lignes, compression).
+    """
+    digest = hashlib.sha256()
+    for name in df.columns:
+        digest.update(f"{name}:{df[name].dtype}\n".encode())
+        digest.update(pd.util.hash_pandas_object(df[name], index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def read_source(path, dtypes):
+    """Parse la source avec les types déclarés (CSV, ou feuille XLSX_SHEET via openpyxl)."""
+    if os.path.splitext(path)[1].lower() == ".xlsx":
+        return pd.read_excel(path, sheet_name=XLSX_SHEET, engine="openpyxl").astype(dtypes)[list(dtypes)]
+    return pd.read_csv(path, dtype=dtypes)[list(dtypes)]
+
+
+def convert(name, source, store_dir=STORE_DIR):
+    """Écrit store_dir/<name>.parquet à partir de `source` ; renvoie ses métadonnées."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    dtypes = DATASETS[name]["dtypes"]
+    df = read_source(source, dtypes)
+    table = pa.Table.from_pandas(df, schema=arrow_schema(dtypes), preserve_index=False)
+    metadata = {
+        "version": STORE_VERSION,
+        "dataset": name,
+        "dtypes": dtypes,
+        "rows": table.num_rows,
+        "content_sha256": content_sha256(df),
+        "source": {**_source_stats(source), "sha256": _file_sha256(source)},
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+    table = table.replace_schema_metadata({**table.schema.metadata, _METADATA_KEY: json.dumps(metadata).encode()})
+    path = store_path(name, store_dir)
+    os.makedirs(store_dir, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)
+    return metadata
+
+
+# === Lecture ===
+def read_metadata(path):
+    """Métadonnées de l'entrepôt d'un fichier Parquet, ou None (absent, ancienne version, autre fichier)."""
+    import pyarrow.parquet as pq
+
+    if not os.path.isfile(path):
+        return None
+    raw = (pq.read_schema(path, memory_map=True).metadata or {}).get(_METADATA_KEY)
+    metadata = json.loads(raw) if raw else None
+    return metadata if metadata and metadata.get("version") == STORE_VERSION else None
+
+
+def is_current(metadata, source):
+    """Le fichier de l'entrepôt correspond-il à `source` ? Taille et mtime d'abord, sha256 sinon."""
+    if metadata is None:
+        return False
+    if not os.path.isfile(source):
+        return True
+    recorded = metadata["source"]
+    if {k: recorded[k] for k in ("file", "size", "mtime_ns")} == _source_stats(source):
+        return True
+    return recorded.get("sha256") == _file_sha256(source)
+
+
+def read_dataset(name, columns=None, store_dir=STORE_DIR):
+    """DataFrame typé du jeu `name`, limité à `columns`, lu en mémoire mappée."""
+    import pyarrow.parquet as pq
+
+    return pq.read_table(store_path(name, store_dir), columns=columns, memory_map=True).to_pandas()
+
+
+def load_dataset(name, source=None, columns=None, store_dir=STORE_DIR):
+    """Comme read_dataset, en (re)convertissant d'abord `source` si le fichier est absent ou périmé."""
+    source = source or os.path.join(DATA_DIR, DATASETS[name]["source"])
+    if not is_current(read_metadata(store_path(name, store_dir)), source):
+        convert(name, source, store_dir)
+    return read_dataset(name, columns, store_dir)
+
+
+def verify(name, store_dir=STORE_DIR):
+    """Recalcule l'empreinte du contenu et la compare à celle des métadonnées."""
+    metadata = read_metadata(store_path(name, store_dir))
+    return metadata is not None and content_sha256(read_dataset(name, store_dir=store_dir)) == metadata["content_sha256"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--store-dir", default=STORE_DIR)
+    for name, dataset in DATASETS.items():
+        parser.add_argument(f"--{name}", default=os.path.join(DATA_DIR, dataset["source"]), help="fichier source")
+    parser.add_argument("--force", action="store_true", help="reconvertit même si le fichier est à jour")
+    parser.add_argument("--verify", action="store_true", help="recalcule les empreintes après conversion")
+    args = parser.parse_args()
+
+    for name in DATASETS:
+        source = getattr(args, name)
+        path = store_path(name, args.store_dir)
+        start = time.perf_counter()
+        metadata = read_metadata(path)
+        if args.force or not is_current(metadata, source):
+            metadata = convert(name, source, args.store_dir)
+        print(f"{name} : {path} ({metadata['rows']} lignes, {os.path.getsize(path) / 1024:.0f} Ko, "
+              f"contenu {metadata['content_sha256'][:16]}, {time.perf_counter() - start:.2f} s)")
+        if args.verify and not verify(name, args.store_dir):
+            print(f"{name} : empreinte du contenu invalide")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+"""Agrégation du journal des retards par blocs, en mémoire bornée.
+
+    python streaming.py data/get_around_delay_analysis.csv --chunksize 5000 --check
+    python streaming.py ../get_around_delay_analysis.xlsx --output aggregates.json
+
+Le fichier (CSV, Parquet, ou XLSX converti une fois en CSV) est lu bloc par bloc ;
+chaque bloc met à jour des agrégats de taille fixe : comptages par état, histogrammes
+des retards, t-digest des retards et histogramme des marges pour les buffers.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from buffers import ALL
+from sketches import TDigest
+from store import CACHE_DIR, DELAY_DTYPES
+
+DELAY_WINDOW = (-150, 150)
+MAX_BUFFER = 720
+QUANTILES = (0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+
+
+# === Lecture par blocs ===
+def convert_xlsx(path, csv_path=None, sheet="rentals_data"):
+    """Convertit la feuille XLSX en CSV ligne à ligne (openpyxl en lecture seule), une seule fois par mtime."""
+    from openpyxl import load_workbook
+
+    csv_path = csv_path or os.path.join(CACHE_DIR, os.path.splitext(os.path.basename(path))[0] + ".csv")
+    if os.path.isfile(csv_path) and os.stat(csv_path).st_mtime_ns >= os.stat(path).st_mtime_ns:
+        return csv_path
+    os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+    workbook = load_workbook(path, read_only=True)
+    try:
+        with open(csv_path + ".tmp", "w", newline="") as f:
+            writer = csv.writer(f)
+            for row in workbook[sheet].iter_rows(values_only=True):
+                writer.writerow(["" if value is None else value for value in row])
+    finally:
+        workbook.close()
+    os.replace(csv_path + ".tmp", csv_path)
+    return csv_path
+
+
+def iter_chunks(path, chunksize=100_000):
+    """DataFrames successifs de `chunksize` lignes, typés comme store.DELAY_DTYPES."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".xlsx":
+        path, extension = convert_xlsx(path), ".csv"
+    if extension == ".parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas().astype(DELAY_DTYPES)
+        return
+    yield from pd.read_csv(path, dtype=DELAY_DTYPES, chunksize=chunksize)
+
+
+# === Agrégats ===
+class DelayAggregates:
+    """Agrégats fusionnables du journal des retards, indexés par checkin_type (et ALL)."""
+
+    def __init__(self, window=DELAY_WINDOW, max_buffer=MAX_BUFFER, compression=200):
+        self.window = window
+        self.max_buffer = max_buffer
+        self.compression = compression
+        self.rows = 0
+        self.state_counts = {}
+        # Histogramme des retards par pas d'une minute sur [window[0], window[1]]
+        self.delay_hist = {}
+        self.delay_outside = {}
+        self.digests = {}
+        # Marge des locations terminées : < 0 comptées à part, puis une case par minute
+        self.slack_negative = {}
+        self.slack_hist = {}
+
+    def _group(self, group):
+        if group not in self.delay_hist:
+            self.delay_hist[group] = np.zeros(self.window[1] - self.window[0] + 1, dtype=np.int64)
+            self.delay_outside[group] = 0
+            self.digests[group] = TDigest(self.compression)
+            self.slack_negative[group] = 0
+            self.slack_hist[group] = np.zeros(self.max_buffer, dtype=np.int64)
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        checkin = chunk["checkin_type"].astype(str).to_numpy()
+        state = chunk["state"].astype(str).to_numpy()
+        delay = chunk["delay_at_checkout_in_minutes"].to_numpy(dtype=np.float64, na_value=np.nan)
+        delta = chunk["time_delta_with_previous_rental_in_minutes"].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        for key, count in pd.DataFrame({"checkin_type": checkin, "state": state}).value_counts().items():
+            self.state_counts[key] = self.state_counts.get(key, 0) + int(count)
+
+        for group in [ALL, *map(str, np.unique(checkin))]:
+            mask = slice(None) if group == ALL else checkin == group
+            self._group(group)
+            self._update_group(group, delay[mask], delta[mask], state[mask] == "ended")
+        return self
+
+    def _update_group(self, group, delay, delta, ended):
+        values = delay[~np.isnan(delay)]
+        binned = np.floor(values).astype(np.int64) - self.window[0]
+        inside = (binned >= 0) & (binned < len(self.delay_hist[group]))
+        self.delay_hist[group] += np.bincount(binned[inside], minlength=len(self.delay_hist[group]))
+        self.delay_outside[group] += int((~inside).sum())
+        self.digests[group].update(values)
+
+        slack = delta[ended] - delay[ended]
+        slack = np.floor(slack[~np.isnan(slack)]).astype(np.int64)
+        self.slack_negative[group] += int((slack < 0).sum())
+        kept = slack[(slack >= 0) & (slack < self.max_buffer)]
+        self.slack_hist[group] += np.bincount(kept, minlength=self.max_buffer)
+
+    def merge(self, other):
+        self.rows += other.rows
+        for key, count in other.state_counts.items():
+            self.state_counts[key] = self.state_counts.get(key, 0) + count
+        for group in other.delay_hist:
+            self._group(group)
+            self.delay_hist[group] += other.delay_hist[group]
+            self.delay_outside[group] += other.delay_outside[group]
+            self.digests[group].merge(other.digests[group])
+            self.slack_negative[group] += other.slack_negative[group]
+            self.slack_hist[group] += other.slack_hist[group]
+        return self
+
+    # === Lecture des résultats ===
+    def states(self):
+        frame = pd.DataFrame(
+            [(checkin, state, count) for (checkin, state), count in self.state_counts.items()],
+            columns=["checkin_type", "state", "count"],
+        )
+        return frame.sort_values(["checkin_type", "state"], ignore_index=True)
+
+    def delay_histogram(self, group=ALL):
+        edges = np.arange(self.window[0], self.window[1] + 1)
+        return pd.DataFrame({"delay": edges, "count": self.delay_hist[group]})
+
+    def quantiles(self, qs=QUANTILES, group=ALL):
+        return dict(zip(qs, self.digests[group].quantile(qs).tolist()))
+
+    def blocked(self, buffers, group=ALL):
+        """Locations terminées dont la marge est < buffer (buffers entiers dans [0, max_buffer])."""
+        buffers = np.asarray(buffers)
+        if (buffers < 0).any() or (buffers > self.max_buffer).any() or (buffers % 1 != 0).any():
+            raise ValueError(f"Buffers entiers entre 0 et {self.max_buffer} attendus")
+        cumulative = np.concatenate([[0], np.cumsum(self.slack_hist[group])])
+        return self.slack_negative[group] + cumulative[buffers.astype(np.int64)]
+
+    def to_dict(self):
+        return {
+            "rows": self.rows,
+            "window": list(self.window),
+            "max_buffer": self.max_buffer,
+            "state_counts": [[checkin, state, count] for (checkin, state), count in self.state_counts.items()],
+            "groups": {
+                group: {
+                    "delay_hist": self.delay_hist[group].tolist(),
+                    "delay_outside": self.delay_outside[group],
+                    "digest": self.digests[group].to_dict(),
+                    "slack_negative": self.slack_negative[group],
+                    "slack_hist": self.slack_hist[group].tolist(),
+                }
+                for group in self.delay_hist
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        aggregates = cls(tuple(data["window"]), data["max_buffer"])
+        aggregates.rows = data["rows"]
+        aggregates.state_counts = {(checkin, state): count for checkin, state, count in data["state_counts"]}
+        for group, values in data["groups"].items():
+            aggregates.delay_hist[group] = np.asarray(values["delay_hist"], dtype=np.int64)
+            aggregates.delay_outside[group] = values["delay_outside"]
+            aggregates.digests[group] = TDigest.from_dict(values["digest"])
+            aggregates.slack_negative[group] = values["slack_negative"]
+            aggregates.slack_hist[group] = np.asarray(values["slack_hist"], dtype=np.int64)
+        return aggregates
+
+
+def aggregate_file(path, chunksize=100_000, **kwargs):
+    aggregates = DelayAggregates(**kwargs)
+    for chunk in iter_chunks(path, chunksize):
+        aggregates.update(chunk)
+    return aggregates
+
+
+# === Vérification contre le calcul en mémoire ===
+def check_against_memory(aggregates, df, buffers=(30, 60, 90, 180), tolerance=0.01):
+    """Compare aux calculs pandas/numpy sur le DataFrame complet ; renvoie la liste des écarts."""
+    from buffers import blocking_engine
+
+    errors = []
+    expected = df.groupby(["checkin_type", "state"], observed=True).size()
+    for (checkin, state), count in aggregates.state_counts.items():
+        if expected.get((checkin, state), 0) != count:
+            errors.append(f"état {checkin}/{state} : {count} != {expected.get((checkin, state), 0)}")
+    if sum(aggregates.state_counts.values()) != len(df):
+        errors.append("nombre de lignes différent")
+
+    blocking = blocking_engine(df)
+    for group in aggregates.delay_hist:
+        subset = df if group == ALL else df[df["checkin_type"] == group]
+        delay = subset["delay_at_checkout_in_minutes"].dropna().to_numpy(dtype=np.float64)
+        lo, hi = aggregates.window
+        hist = np.bincount((np.floor(delay[(delay >= lo) & (delay < hi + 1)]) - lo).astype(np.int64), minlength=hi - lo + 1)
+        if not np.array_equal(hist, aggregates.delay_hist[group]):
+            errors.append(f"histogramme des retards différent ({group})")
+
+        got, want = aggregates.blocked(buffers, group), blocking.count_below(buffers, group)
+        if not np.array_equal(got, want):
+            errors.append(f"locations bloquées ({group}) : {got.tolist()} != {want.tolist()}")
+
+        # t-digest : erreur de rang (proportion de valeurs ≤ estimation) bornée par `tolerance`
+        ordered = np.sort(delay)
+        for q, value in aggregates.quantiles(group=group).items():
+            rank = np.searchsorted(ordered, value, side="right") / len(ordered)
+            low = np.searchsorted(ordered, value, side="left") / len(ordered)
+            if not (low - tolerance <= q <= rank + tolerance):
+                errors.append(f"quantile {q} ({group}) : {value:.1f} hors tolérance")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--output", help="fichier JSON des agrégats")
+    parser.add_argument("--check", action="store_true", help="compare au calcul en mémoire (petits fichiers)")
+    args = parser.parse_args()
+
+    aggregates = aggregate_file(args.path, args.chunksize)
+    print(f"{aggregates.rows} lignes agrégées")
+    print(aggregates.states().to_string(index=False))
+    for q, value in aggregates.quantiles().items():
+        print(f"  retard p{q * 100:g} : {value:.1f} min")
+    print("  bloquées (30/60/90/180 min) :", aggregates.blocked([30, 60, 90, 180]).tolist())
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(aggregates.to_dict(), f)
+
+    if args.check:
+        df = pd.concat(iter_chunks(args.path, args.chunksize), ignore_index=True)
+        errors = check_against_memory(aggregates, df)
+        print("\n".join(errors) if errors else "Identique au calcul en mémoire")
+        return 1 if errors else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
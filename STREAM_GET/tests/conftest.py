@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modules du dashboard importables sans installation (dossier plat, comme `streamlit run app.py`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
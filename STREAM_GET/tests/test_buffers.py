@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from buffers import ALL, blocked_table, blocking_engine, buffer_curve, conflict_engine, conflict_table
+from chains import RentalIndex, conflict_pairs
+
+
+def _delays():
+    # Annulations : conflit strict (véhicule 1, marge -30 min) et marge de 40 min (véhicule 2).
+    # Locations terminées : marge de 20 min (véhicule 3) et marge négative (véhicule 4)
+    return pd.DataFrame({
+        "rental_id": [1, 2, 3, 4, 5, 6, 7, 8],
+        "car_id": [1, 1, 2, 2, 3, 3, 4, 4],
+        "checkin_type": ["mobile", "mobile", "connect", "connect", "mobile", "mobile", "connect", "connect"],
+        "state": ["ended", "canceled", "ended", "canceled", "ended", "ended", "ended", "ended"],
+        "delay_at_checkout_in_minutes": [90.0, np.nan, 20.0, np.nan, 100.0, 10.0, 10.0, 50.0],
+        "previous_ended_rental_id": [np.nan, 1, np.nan, 3, np.nan, 5, np.nan, 7],
+        "time_delta_with_previous_rental_in_minutes": [np.nan, 60.0, np.nan, 60.0, np.nan, 30.0, np.nan, 30.0],
+    })
+
+
+def test_zero_buffer_avoids_nothing():
+    delays = _delays()
+    curve = buffer_curve(blocking_engine(delays), conflict_engine(conflict_pairs(delays, RentalIndex.build(delays))), [0, 30, 60], price=100.0)
+    at_zero = curve[curve["buffer"] == 0]
+    for column in ("avoided_conflicts", "saved_revenue"):
+        assert (at_zero[column] == 0).all(), column
+
+
+def test_curve_matches_conflict_table():
+    delays = _delays()
+    conflicts = conflict_engine(conflict_pairs(delays, RentalIndex.build(delays)))
+    curve = buffer_curve(blocking_engine(delays), conflicts, [30, 60], price=100.0)
+    for group in conflicts.groups:
+        table = conflict_table(conflicts, group, [30, 60], 100.0)
+        expected = curve[curve["checkin_type"] == group]["avoided_conflicts"].to_numpy()
+        assert (table["Conflits"].to_numpy() == expected).all(), group
+    # Seule l'annulation à 40 min de marge est évitée à 60 min ; le conflit strict ne compte pas
+    assert curve[(curve["checkin_type"] == ALL) & (curve["buffer"] == 60)]["avoided_conflicts"].item() == 1
+
+
+def test_curve_matches_blocked_table():
+    delays = _delays()
+    blocking = blocking_engine(delays)
+    curve = buffer_curve(blocking, conflict_engine(conflict_pairs(delays, RentalIndex.build(delays))), [30, 60], price=100.0)
+    for group in blocking.groups:
+        table = blocked_table(blocking, group, [30, 60], 100.0)
+        rows = curve[curve["checkin_type"] == group]
+        assert (table["Locations bloquées"].to_numpy() == rows["blocked"].to_numpy()).all(), group
+        assert (table["Perte estimée ($)"].to_numpy() == rows["lost_revenue"].to_numpy()).all(), group
+    # À 30 min : la marge de 20 min et la marge négative
+    assert curve[(curve["checkin_type"] == ALL) & (curve["buffer"] == 30)]["blocked"].item() == 2
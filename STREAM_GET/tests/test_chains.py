@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from chains import RentalIndex, chain_summary, conflict_pairs
+
+
+def _delays():
+    # Véhicule 1 : chaîne 1 → 2 → 3 (3 annulée) ; véhicule 2 : 4 puis 5 annulée ; 6 annulée sans précédente connue
+    return pd.DataFrame({
+        "rental_id": [1, 2, 3, 4, 5, 6],
+        "car_id": [1, 1, 1, 2, 2, 3],
+        "checkin_type": ["mobile", "connect", "connect", "mobile", "mobile", "connect"],
+        "state": ["ended", "ended", "canceled", "ended", "canceled", "canceled"],
+        "delay_at_checkout_in_minutes": [10.0, 45.0, np.nan, -5.0, np.nan, np.nan],
+        "previous_ended_rental_id": [np.nan, 1, 2, np.nan, 4, 99],
+        "time_delta_with_previous_rental_in_minutes": [np.nan, 60.0, 30.0, np.nan, 120.0, 90.0],
+    })
+
+
+def _joined(df):
+    # Référence : jointure pandas previous_ended_rental_id → rental_id
+    canceled = df[df["state"] == "canceled"][["rental_id", "car_id", "previous_ended_rental_id", "checkin_type",
+                                              "time_delta_with_previous_rental_in_minutes"]]
+    return canceled.merge(df[["rental_id", "car_id", "delay_at_checkout_in_minutes", "checkin_type"]],
+                          left_on="previous_ended_rental_id", right_on="rental_id", suffixes=("_canceled", "_previous"))
+
+
+def test_conflict_pairs_match_join():
+    delays = _delays()
+    pd.testing.assert_frame_equal(conflict_pairs(delays, RentalIndex.build(delays)), _joined(delays), check_dtype=False)
+
+
+def test_append_matches_build():
+    delays = _delays()
+    index = RentalIndex.build(delays.head(2))
+    index.append(delays.iloc[2:])
+    pd.testing.assert_frame_equal(conflict_pairs(delays, index), _joined(delays), check_dtype=False)
+    assert chain_summary(index) == chain_summary(RentalIndex.build(delays))
+    assert chain_summary(index)["Longueur max"] == 3
@@ -0,0 +1,51 @@
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from charts import category_counts, grouped_histogram, histogram
+from parallel import DelayCounts, PricingAggregates, parallel_aggregate, price_bins, pricing_columns
+
+EDGES = np.arange(-150, 151, 5)
+GROUP_EDGES = np.arange(-150, 151, 10)
+
+
+def _delays(size=200):
+    rng = np.random.default_rng(0)
+    delay = rng.normal(0, 120, size)
+    delay[rng.random(size) < 0.2] = np.nan
+    return pd.DataFrame({
+        "state": rng.choice(["ended", "canceled"], size, p=[0.8, 0.2]),
+        "checkin_type": rng.choice(["mobile", "connect"], size),
+        "delay_at_checkout_in_minutes": delay,
+    })
+
+
+def _pricing(size=200):
+    rng = np.random.default_rng(1)
+    return pd.DataFrame({
+        "mileage": rng.integers(0, 300_000, size),
+        "has_gps": rng.choice([False, True], size),
+        "rental_price_per_day": rng.gamma(9, 14, size).round(),
+    })
+
+
+def test_delay_counts_match_serial_tables():
+    delays = _delays()
+    counts = parallel_aggregate(delays, partial(DelayCounts, EDGES, GROUP_EDGES), workers=1, partitions=7)
+    delay = delays["delay_at_checkout_in_minutes"].to_numpy()
+    pd.testing.assert_frame_equal(counts.states(), category_counts(delays["state"], "state"), check_dtype=False)
+    pd.testing.assert_frame_equal(counts.histogram(), histogram(delay, EDGES), check_dtype=False)
+    pd.testing.assert_frame_equal(counts.grouped_histogram(),
+                                  grouped_histogram(delay, delays["checkin_type"], GROUP_EDGES, "checkin_type"),
+                                  check_dtype=False)
+
+
+def test_price_histogram_counts_every_rental():
+    pricing = _pricing()
+    pricing.loc[0, "rental_price_per_day"] = 1200.0
+    bins = price_bins(pricing["rental_price_per_day"])
+    aggregates = parallel_aggregate(pricing, partial(PricingAggregates, pricing_columns(pricing), bins),
+                                    workers=1, partitions=5)
+    assert aggregates.histogram()["count"].sum() == len(pricing)
+    pd.testing.assert_frame_equal(aggregates.corr(), pricing.astype(float).corr())
@@ -0,0 +1,46 @@
+import pytest
+import requests
+
+from prediction_client import FEATURES, PredictionClient, PredictionError
+
+ROW = dict.fromkeys(FEATURES, 0)
+
+
+class _Response:
+    def __init__(self, status_code, prices=None):
+        self.status_code = status_code
+        self.text = "erreur"
+        self._prices = prices
+
+    def json(self):
+        return {"predicted_price_per_day": self._prices}
+
+
+def _client(monkeypatch, response):
+    client = PredictionClient(base_url="http://api", model_path="model.joblib")
+
+    def post(url, json, timeout):
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(client.session, "post", post)
+    monkeypatch.setattr(client, "_predict_local", lambda rows: ([1.0] * len(rows), "local"))
+    return client
+
+
+def test_source_is_returned_with_prices(monkeypatch):
+    client = _client(monkeypatch, _Response(200, [120.0, 130.0]))
+    assert client.predict_many([ROW, ROW]) == ([120.0, 130.0], "api-batch")
+    assert not hasattr(client, "last_source")
+
+
+@pytest.mark.parametrize("response", [_Response(503), requests.ConnectionError("refusée")])
+def test_unavailable_api_falls_back_to_local_model(monkeypatch, response):
+    assert _client(monkeypatch, response).predict(ROW) == (1.0, "local")
+
+
+def test_rejected_request_is_not_hidden_by_local_model(monkeypatch):
+    with pytest.raises(PredictionError) as error:
+        _client(monkeypatch, _Response(422)).predict(ROW)
+    assert error.value.status_code == 422
@@ -0,0 +1,135 @@
+"""Benchmark de l'agrégation parallèle du dashboard (STREAM_GET/parallel.py).
+
+    python benchmarks/bench_aggregation.py --factor 50 --workers 1,2,4,8
+    python benchmarks/bench_aggregation.py --baseline benchmarks/baseline_aggregation.json
+
+Les jeux de données embarqués sont agrandis synthétiquement (copies avec identifiants
+décalés et valeurs légèrement bruitées), puis agrégés avec 1, 2, 4… processus.
+Mesure aussi la taille JSON des graphiques agrégés côté serveur (STREAM_GET/charts.py),
+comparée aux mêmes graphiques construits par Plotly sur les lignes brutes.
+"""
+import argparse
+import functools
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from common import ROOT, add_path, report_comparison, summarize, time_calls, write_results
+
+add_path("STREAM_GET")
+
+from charts import box_figure, box_stats, grouped_histogram, histogram_figure, payload_size  # noqa: E402
+from parallel import PricingAggregates, parallel_aggregate, price_bins, pricing_columns  # noqa: E402
+from snapshot import delay_counts  # noqa: E402
+from store import load_dataset  # noqa: E402
+from streaming import DelayAggregates  # noqa: E402
+
+
+def enlarge_delays(df, factor, seed=0):
+    rng = np.random.default_rng(seed)
+    span = int(df["rental_id"].max()) + 1
+    copies = []
+    for i in range(factor):
+        copy = df.copy()
+        copy["rental_id"] = copy["rental_id"] + i * span
+        copy["previous_ended_rental_id"] = copy["previous_ended_rental_id"] + i * span
+        copy["delay_at_checkout_in_minutes"] = copy["delay_at_checkout_in_minutes"] + rng.integers(-5, 6, len(copy))
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def enlarge_pricing(df, factor, seed=0):
+    rng = np.random.default_rng(seed)
+    copies = []
+    for _ in range(factor):
+        copy = df.copy()
+        copy["mileage"] = (copy["mileage"] * rng.uniform(0.9, 1.1, len(copy))).astype("int64")
+        copy["rental_price_per_day"] = copy["rental_price_per_day"] + rng.integers(-3, 4, len(copy))
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def chart_figures(delays, pricing):
+    """Figures agrégées côté serveur du dashboard : retards par check-in et prix par type."""
+    delay = delays["delay_at_checkout_in_minutes"].to_numpy(dtype=np.float64, na_value=np.nan)
+    by_checkin = grouped_histogram(delay, delays["checkin_type"], np.arange(-150, 151, 10), "checkin_type")
+    boxes = box_stats(pricing["rental_price_per_day"], pricing["car_type"], "car_type")
+    return [histogram_figure(by_checkin, "retards", color="checkin_type", overlay=True),
+            box_figure(boxes, "car_type", "prix", "rental_price_per_day")]
+
+
+def raw_figures(delays, pricing):
+    """Mêmes figures construites par Plotly à partir des lignes brutes (ancien dashboard)."""
+    import plotly.express as px
+
+    window = delays.query("-150 <= delay_at_checkout_in_minutes <= 150")
+    return [px.histogram(window, x="delay_at_checkout_in_minutes", color="checkin_type", barmode="overlay"),
+            px.box(pricing, x="car_type", y="rental_price_per_day")]
+
+
+def bench_charts(base_delays, base_pricing, delays, pricing, factor, repeat):
+    metrics = {}
+    for label, (d, p) in {"factor_1": (base_delays, base_pricing), f"factor_{factor}": (delays, pricing)}.items():
+        metrics[f"charts.binned.{label}.payload_bytes"] = sum(payload_size(f) for f in chart_figures(d, p))
+    metrics["charts.raw.factor_1.payload_bytes"] = sum(payload_size(f) for f in raw_figures(base_delays, base_pricing))
+    durations = time_calls(lambda: chart_figures(delays, pricing), repeat, warmup=1)
+    metrics.update(summarize(durations, f"charts.binned.factor_{factor}"))
+    print(f"  graphiques : {metrics['charts.raw.factor_1.payload_bytes'] / 1024:.0f} Ko bruts (x1), "
+          f"{metrics['charts.binned.factor_1.payload_bytes'] / 1024:.0f} Ko agrégés (x1), "
+          f"{metrics[f'charts.binned.factor_{factor}.payload_bytes'] / 1024:.0f} Ko agrégés (x{factor})")
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--factor", type=int, default=50, help="nombre de copies des jeux de données")
+    parser.add_argument("--workers", default=",".join(str(2 ** i) for i in range(4) if 2 ** i <= (os.cpu_count() or 1)) or "1")
+    parser.add_argument("--partitions-per-worker", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results", "aggregation.json"))
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args()
+    workers_list = [int(w) for w in args.workers.split(",")]
+
+    base_delays = load_dataset("delays")
+    base_pricing = load_dataset("pricing")
+    delays = enlarge_delays(base_delays, args.factor)
+    pricing = enlarge_pricing(base_pricing, args.factor)
+    print(f"Retards : {len(delays)} lignes, pricing : {len(pricing)} lignes, {os.cpu_count()} CPU")
+
+    jobs = {
+        "delay": (delays, DelayAggregates),
+        "delay_counts": (delays, delay_counts),
+        "pricing": (pricing, functools.partial(PricingAggregates, pricing_columns(pricing),
+                                               price_bins(pricing["rental_price_per_day"]))),
+    }
+    metrics = {}
+    for name, (df, factory) in jobs.items():
+        reference = None
+        for workers in workers_list:
+            partitions = workers * args.partitions_per_worker
+            durations = time_calls(lambda: parallel_aggregate(df, factory, workers, partitions), args.repeat, warmup=1)
+            prefix = f"aggregation.{name}.workers_{workers}"
+            metrics.update(summarize(durations, prefix))
+            median = float(np.median(durations))
+            metrics[f"{prefix}.rows_per_s"] = round(len(df) / median, 1)
+            reference = reference or median
+            metrics[f"{prefix}.speedup"] = round(reference / median, 2)
+            print(f"  {name} : {workers} processus -> {median * 1000:.0f} ms (x{reference / median:.2f})")
+
+    metrics.update(bench_charts(base_delays, base_pricing, delays, pricing, args.factor, args.repeat))
+
+    config = {"factor": args.factor, "workers": workers_list, "partitions_per_worker": args.partitions_per_worker,
+              "delay_rows": len(delays), "pricing_rows": len(pricing)}
+    results = write_results(args.output, "aggregation", config, metrics)
+    print(f"Résultats écrits dans {args.output}")
+    if args.baseline:
+        return report_comparison(results, args.baseline, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
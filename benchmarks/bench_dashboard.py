@@ -0,0 +1,138 @@
+"""Benchmark du dashboard Streamlit (STREAM_GET/app.py) via streamlit.testing.AppTest.
+
+    python benchmarks/bench_dashboard.py
+    python benchmarks/bench_dashboard.py --app /tmp/app_avant.py --output benchmarks/results/dashboard_avant.json
+
+- démarrage à froid : nouveau processus Python, premier rendu complet de la page
+  (imports du script compris) ; l'instantané des agrégats doit être matérialisé
+  (`python STREAM_GET/snapshot.py`), sinon le premier rendu inclut son calcul ;
+- interactions : durée d'un rerun après un clic (case à cocher de l'onglet Prédiction,
+  curseur de buffer de l'onglet Retards) et après un changement de section.
+
+`--app` mesure un autre script (par exemple une version précédente de app.py copiée
+dans STREAM_GET/) ; la navigation par section est ignorée si le script n'en a pas.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from common import ROOT, add_path, report_comparison, summarize, time_calls, write_results
+
+STREAM_DIR = os.path.join(ROOT, "STREAM_GET")
+SECTION_KEY = "section"
+
+_COLD_START = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=300)
+ready = time.perf_counter()
+at.run()
+assert not at.exception, at.exception
+print(json.dumps({"import_s": ready - start, "first_run_s": time.perf_counter() - ready}))
+"""
+
+
+def cold_start(app, repeat):
+    walls, first_runs = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", _COLD_START, app], cwd=STREAM_DIR, check=True,
+                                capture_output=True, text=True).stdout
+        walls.append(time.perf_counter() - start)
+        first_runs.append(json.loads(output.strip().splitlines()[-1])["first_run_s"])
+    return walls, first_runs
+
+
+def _widget(widgets, label):
+    return next(w for w in widgets if w.label == label)
+
+
+def _select(at, section):
+    radios = [r for r in at.radio if r.key == SECTION_KEY]
+    if radios:
+        radios[0].set_value(section).run()
+    return at
+
+
+def interactions(app, repeat):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(app, default_timeout=300)
+    at.run()
+    radios = [r for r in at.radio if r.key == SECTION_KEY]
+    sections = list(radios[0].options) if radios else []
+    metrics = {}
+
+    # Changement de section, caches chauds
+    for i, section in enumerate(sections):
+        other = sections[(i + 1) % len(sections)]
+        durations = []
+        for _ in range(repeat):
+            _select(at, other)
+            start = time.perf_counter()
+            _select(at, section)
+            durations.append(time.perf_counter() - start)
+        metrics.update(summarize(durations, f"dashboard.section_{i + 1}"))
+
+    # Clic sur une case à cocher de l'onglet Prédiction
+    if sections:
+        _select(at, sections[-1])
+    state = {"value": False}
+
+    def toggle_checkbox():
+        state["value"] = not state["value"]
+        _widget(at.checkbox, "GPS").set_value(state["value"]).run()
+
+    metrics.update(summarize(time_calls(toggle_checkbox, repeat, warmup=1), "dashboard.interaction.prediction_checkbox"))
+
+    # Curseur de buffer de l'onglet Retards
+    if sections:
+        _select(at, sections[0])
+    values = iter(np.arange(30, 30 + repeat + 1) % 720)
+
+    def move_slider():
+        _widget(at.slider, "Buffer (min)").set_value(int(next(values))).run()
+
+    metrics.update(summarize(time_calls(move_slider, repeat, warmup=1), "dashboard.interaction.buffer_slider"))
+    assert not at.exception, at.exception
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default=os.path.join(STREAM_DIR, "app.py"))
+    parser.add_argument("--cold-repeat", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results", "dashboard.json"))
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args()
+    app = os.path.abspath(args.app)
+    add_path("STREAM_GET")
+    os.chdir(STREAM_DIR)
+
+    walls, first_runs = cold_start(app, args.cold_repeat)
+    metrics = {**summarize(walls, "dashboard.cold_start"), **summarize(first_runs, "dashboard.first_run")}
+    print(f"  démarrage à froid : {metrics['dashboard.cold_start.p50_ms']:.0f} ms "
+          f"(premier rendu {metrics['dashboard.first_run.p50_ms']:.0f} ms)")
+
+    metrics.update(interactions(app, args.repeat))
+    for name in ("prediction_checkbox", "buffer_slider"):
+        print(f"  {name} : {metrics[f'dashboard.interaction.{name}.p50_ms']:.0f} ms par rerun (p50)")
+
+    config = {"app": os.path.relpath(app, ROOT), "cold_repeat": args.cold_repeat, "repeat": args.repeat}
+    results = write_results(args.output, "dashboard", config, metrics)
+    print(f"Résultats écrits dans {args.output}")
+    if args.baseline:
+        return report_comparison(results, args.baseline, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
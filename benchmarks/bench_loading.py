@@ -0,0 +1,100 @@
+"""Benchmark du chargement du modèle par l'API : pickle joblib vs bundle compact.
+
+    python benchmarks/bench_loading.py --repeat 10
+    python benchmarks/bench_loading.py --baseline benchmarks/baseline_loading.json
+
+Le modèle est entraîné localement (comme bench_serving.py), enregistré en joblib et
+exporté en bundle (MLFLOW_GET/bundle.py). Chaque chargement a lieu dans un processus
+neuf, bibliothèques déjà importées : durée de `inference.load_predictor` suivi d'une
+première prédiction (modèle prêt à servir) et mémoire résidente ajoutée.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+from common import DEFAULT_DATA, ROOT, add_path, report_comparison, summarize, write_results
+
+add_path("MLFLOW_GET")
+
+from bench_serving import train_model  # noqa: E402
+from bundle import export_bundle  # noqa: E402
+
+FEATURES = ["model_key", "mileage", "engine_power", "fuel", "paint_color", "car_type", "private_parking_available",
+            "has_gps", "has_air_conditioning", "automatic_car", "has_getaround_connect", "has_speed_regulator",
+            "winter_tires"]
+
+# Exécuté dans un processus neuf : imports hors mesure, puis chargement mesuré
+_LOAD_SCRIPT = """
+import json, os, sys, time
+sys.path.insert(0, sys.argv[1])
+import numpy, pandas, sklearn, xgboost, joblib
+import inference
+
+def rss_kb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+row = {"model_key": "Audi", "mileage": 100000, "engine_power": 120, "fuel": "diesel", "paint_color": "black",
+       "car_type": "estate", "private_parking_available": True, "has_gps": True, "has_air_conditioning": False,
+       "automatic_car": False, "has_getaround_connect": True, "has_speed_regulator": False, "winter_tires": True}
+before = rss_kb()
+start = time.perf_counter()
+pipeline, predictor = inference.load_predictor(sys.argv[2], json.loads(sys.argv[3]), sys.argv[4])
+predictor.predict_records([row])
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "rss_kb": rss_kb() - before, "predictor": predictor.name}))
+"""
+
+
+def load_once(path, mode):
+    output = subprocess.run(
+        [sys.executable, "-c", _LOAD_SCRIPT, os.path.join(ROOT, "API_GET"), path, json.dumps(FEATURES), mode],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default=DEFAULT_DATA)
+    parser.add_argument("--repeat", type=int, default=10, help="chargements (processus) par variante")
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results", "loading.json"))
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        joblib_path = os.path.join(tmp, "xgboost_model_bench.joblib")
+        bundle_path = os.path.join(tmp, "xgboost_model_bench.bundle.zip")
+        pipeline, _, _ = train_model(args.data, joblib_path)
+        with open(bundle_path, "wb") as f:
+            f.write(export_bundle(pipeline))
+
+        variants = {
+            "joblib_pipeline": (joblib_path, "pipeline"),
+            "joblib_compiled": (joblib_path, "compiled"),
+            "bundle": (bundle_path, "compiled"),
+        }
+        metrics = {}
+        for name, (path, mode) in variants.items():
+            runs = [load_once(path, mode) for _ in range(args.repeat)]
+            metrics.update(summarize([r["seconds"] for r in runs], f"loading.{name}"))
+            metrics[f"loading.{name}.rss_kb"] = int(np.median([r["rss_kb"] for r in runs]))
+            metrics[f"loading.{name}.artifact_kb"] = round(os.path.getsize(path) / 1024, 1)
+            print(f"  {name} : {metrics[f'loading.{name}.p50_ms']:.1f} ms (p50), "
+                  f"+{metrics[f'loading.{name}.rss_kb']} Ko RSS, artefact {metrics[f'loading.{name}.artifact_kb']} Ko")
+
+    results = write_results(args.output, "loading", {"repeat": args.repeat}, metrics)
+    print(f"Résultats écrits dans {args.output}")
+    if args.baseline:
+        return report_comparison(results, args.baseline, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
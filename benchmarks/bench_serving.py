@@ -0,0 +1,248 @@
+"""Benchmark du service de prédiction : latence in-process et test de charge HTTP.
+
+    python benchmarks/bench_serving.py --output benchmarks/results/serving.json
+    python benchmarks/bench_serving.py --baseline benchmarks/baseline.json
+    python benchmarks/bench_serving.py --save-baseline
+
+Le modèle est entraîné localement sur pricing_clean.csv avec le pipeline de
+MLFLOW_GET/pipeline.py (ni MLflow ni S3), puis servi par API_GET/app.py via MODEL_PATH,
+avec son profil de référence (MLFLOW_GET/reference.py) : le suivi de dérive est actif
+pendant le test HTTP, sauf avec --no-drift. `drift.*` mesure son coût in-process.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+import joblib
+import numpy as np
+from getaround_formats import profile_filename
+
+from common import DEFAULT_DATA, ROOT, add_path, report_comparison, summarize, time_calls, write_results
+
+add_path("MLFLOW_GET")
+add_path("API_GET")
+
+from pipeline import build_pipeline, load_dataset  # noqa: E402
+from reference import reference_profile  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+
+# === Modèle local ===
+def train_model(data_path, path):
+    X, y = load_dataset(data_path)
+    start = time.perf_counter()
+    pipeline = build_pipeline().fit(X, y)
+    fit_seconds = time.perf_counter() - start
+    joblib.dump(pipeline, path)
+    return pipeline, X, fit_seconds
+
+
+# === In-process ===
+def bench_inprocess(pipeline, X, args):
+    from predictors import build_predictor
+
+    features = list(X.columns)
+    records = X.to_dict(orient="records")
+    rng = np.random.default_rng(0)
+    predictors = {}
+    for mode in args.modes:
+        predictor = build_predictor(pipeline, features, mode)
+        # Backend indisponible (dépendance absente, parité) : pas de mesure sous un autre nom
+        if mode == "auto" or predictor.name == mode:
+            predictors[mode] = predictor
+        else:
+            print(f"  in-process {mode} : indisponible, ignoré")
+
+    metrics = {}
+    for name, predictor in predictors.items():
+        rows = iter(rng.integers(0, len(records), size=args.single_repeat + 10))
+        durations = time_calls(lambda: predictor.predict_records([records[next(rows)]]), args.single_repeat)
+        metrics.update(summarize(durations, f"inprocess.{name}.single"))
+        metrics[f"inprocess.{name}.single.rows_per_s"] = round(1 / float(np.median(durations)), 1)
+
+        for size in args.batch_sizes:
+            batch = X.sample(n=size, replace=size > len(X), random_state=0).reset_index(drop=True)
+            durations = time_calls(lambda: predictor.predict_frame(batch), args.batch_repeat, warmup=1)
+            metrics.update(summarize(durations, f"inprocess.{name}.batch_{size}"))
+            metrics[f"inprocess.{name}.batch_{size}.rows_per_s"] = round(size / float(np.median(durations)), 1)
+        print(f"  in-process {name} : {metrics[f'inprocess.{name}.single.p50_ms']:.3f} ms/ligne (p50)")
+    return metrics
+
+
+def bench_drift(pipeline, X, args):
+    """Coût du suivi de dérive : une prédiction unitaire, puis par ligne d'un lot."""
+    from drift import DriftMonitor
+
+    monitor = DriftMonitor()
+    monitor.bind(reference_profile(X, pipeline.predict(X)), "bench")
+    records = X.to_dict(orient="records")
+    prices = pipeline.predict(X).tolist()
+    calls = 1000
+
+    def observe_many():
+        for row, price in zip(records[:calls], prices[:calls]):
+            monitor.observe(row, price)
+
+    # Durée par appel : chaque mesure couvre `calls` prédictions
+    durations = [d / calls for d in time_calls(observe_many, args.single_repeat // 10 or 1)]
+    metrics = summarize(durations, "drift.observe")
+    metrics["drift.observe.rows_per_s"] = round(1 / float(np.median(durations)), 1)
+    for size in args.batch_sizes:
+        batch = X.sample(n=size, replace=size > len(X), random_state=0).reset_index(drop=True)
+        batch_prices = pipeline.predict(batch)
+        durations = time_calls(lambda: monitor.observe_frame(batch, batch_prices), args.batch_repeat, warmup=1)
+        metrics.update(summarize(durations, f"drift.batch_{size}"))
+        metrics[f"drift.batch_{size}.rows_per_s"] = round(size / float(np.median(durations)), 1)
+    metrics["drift.report_ms"] = round(float(np.median(time_calls(monitor.report, 50))) * 1000, 4)
+    print(f"  suivi de dérive : {metrics['drift.observe.p50_ms'] * 1000:.2f} µs par prédiction unitaire (p50)")
+    return metrics
+
+
+# === HTTP ===
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(model_path, args):
+    """Démarre API_GET/app.py avec uvicorn dans un thread ; renvoie (serveur, thread, url)."""
+    import uvicorn
+
+    # app.py lit sa configuration à l'import
+    os.environ["MODEL_PATH"] = model_path
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ["INFERENCE_MODE"] = args.inference_mode
+    os.environ["MICRO_BATCHING"] = "1" if args.micro_batching else "0"
+    # Sans cache par défaut : on mesure le modèle, pas la mémoïsation
+    os.environ["PREDICTION_CACHE_SIZE"] = "10000" if args.cache else "0"
+    os.environ["DRIFT_MONITORING"] = "1" if args.drift else "0"
+    import app as api
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(api.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 60
+    while not server.started:
+        if time.monotonic() > deadline or not thread.is_alive():
+            raise RuntimeError("Le serveur uvicorn n'a pas démarré")
+        time.sleep(0.05)
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+async def _load(url, path, payloads, concurrency):
+    import httpx
+
+    latencies, errors = [], 0
+    queue = iter(payloads)
+
+    async def client_loop(client):
+        nonlocal errors
+        for payload in queue:
+            start = time.perf_counter()
+            response = await client.post(path, json=payload)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        await client.post(path, json=payloads[0])
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+def bench_http(url, X, args):
+    records = X.to_dict(orient="records")
+    rng = np.random.default_rng(1)
+    metrics = {}
+
+    single = [records[i] for i in rng.integers(0, len(records), size=args.http_requests)]
+    latencies, errors, elapsed = asyncio.run(_load(url, "/predict", single, args.concurrency))
+    metrics.update(summarize(latencies, "http.predict"))
+    metrics["http.predict.requests_per_s"] = round(len(single) / elapsed, 1)
+    metrics["http.predict.errors"] = errors
+    print(f"  HTTP /predict : {metrics['http.predict.requests_per_s']} req/s, p99 {metrics['http.predict.p99_ms']:.1f} ms")
+
+    size = args.http_batch_size
+    batches = [
+        [records[i] for i in rng.integers(0, len(records), size=size)]
+        for _ in range(max(1, args.http_requests // 20))
+    ]
+    latencies, errors, elapsed = asyncio.run(_load(url, "/predict/batch", batches, args.concurrency))
+    metrics.update(summarize(latencies, f"http.predict_batch_{size}"))
+    metrics[f"http.predict_batch_{size}.rows_per_s"] = round(len(batches) * size / elapsed, 1)
+    metrics[f"http.predict_batch_{size}.errors"] = errors
+    print(f"  HTTP /predict/batch ({size} lignes) : {metrics[f'http.predict_batch_{size}.rows_per_s']} lignes/s")
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default=DEFAULT_DATA)
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results", "serving.json"))
+    parser.add_argument("--modes", default="pipeline,compiled,trees,onnx", help="predictors mesurés in-process")
+    parser.add_argument("--single-repeat", type=int, default=500)
+    parser.add_argument("--batch-sizes", default="100,1000,10000")
+    parser.add_argument("--batch-repeat", type=int, default=20)
+    parser.add_argument("--skip-http", action="store_true")
+    parser.add_argument("--http-requests", type=int, default=2000)
+    parser.add_argument("--http-batch-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--inference-mode", default="pipeline", choices=["pipeline", "compiled", "trees", "onnx", "auto"])
+    parser.add_argument("--micro-batching", action="store_true")
+    parser.add_argument("--cache", action="store_true", help="active le cache de prédictions côté API")
+    parser.add_argument("--drift", action=argparse.BooleanOptionalAction, default=True,
+                        help="publie le profil de référence : suivi de dérive actif côté API")
+    parser.add_argument("--baseline", help="fichier de résultats de référence à comparer")
+    parser.add_argument("--threshold", type=float, default=0.15, help="dégradation tolérée (0.15 = 15 %%)")
+    parser.add_argument("--save-baseline", action="store_true", help=f"écrit aussi {DEFAULT_BASELINE}")
+    args = parser.parse_args()
+    args.modes = args.modes.split(",")
+    args.batch_sizes = [int(size) for size in args.batch_sizes.split(",")]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, "xgboost_model_bench.joblib")
+        print("Entraînement du modèle local...")
+        pipeline, X, fit_seconds = train_model(args.data, model_path)
+        metrics = {"train.fit_ms": round(fit_seconds * 1000, 1)}
+
+        print("Benchmark in-process...")
+        metrics.update(bench_inprocess(pipeline, X, args))
+        metrics.update(bench_drift(pipeline, X, args))
+        if args.drift:
+            with open(profile_filename(model_path), "w") as f:
+                json.dump(reference_profile(X, pipeline.predict(X)), f)
+
+        if not args.skip_http:
+            print("Test de charge HTTP...")
+            server, thread, url = start_server(model_path, args)
+            try:
+                metrics.update(bench_http(url, X, args))
+            finally:
+                server.should_exit = True
+                thread.join(timeout=30)
+
+    config = {key: value for key, value in vars(args).items() if key not in ("baseline", "save_baseline", "output")}
+    results = write_results(args.output, "serving", config, metrics)
+    print(f"Résultats écrits dans {args.output}")
+    if args.save_baseline:
+        write_results(DEFAULT_BASELINE, "serving", config, metrics)
+        print(f"Baseline enregistrée dans {DEFAULT_BASELINE}")
+    if args.baseline:
+        return report_comparison(results, args.baseline, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""Benchmark de lecture des données : CSV, XLSX et entrepôt Parquet typé (STREAM_GET/store.py).
+
+    python benchmarks/bench_store.py
+    python benchmarks/bench_store.py --factor 20 --repeat 5
+
+Chaque lecture est faite dans un processus neuf (imports hors mesure) : durée, mémoire
+résidente ajoutée par la lecture (VmRSS, pages du fichier mappé comprises) et taille du
+DataFrame obtenu. Lecteurs comparés : `pd.read_csv` avec types inférés,
+`pd.read_csv` avec les types déclarés, `pd.read_excel` (openpyxl, journal des retards,
+échelle 1 uniquement), l'entrepôt complet et l'entrepôt projeté sur les colonnes d'un
+graphique. `--factor` agrandit les jeux comme bench_aggregation.py.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+from common import ROOT, add_path, report_comparison, summarize, write_results
+
+add_path("STREAM_GET")
+
+from store import DATA_DIR, DATASETS, XLSX_SHEET, convert  # noqa: E402
+
+XLSX_FILE = os.path.join(ROOT, "get_around_delay_analysis.xlsx")
+# Colonnes lues par un graphique du dashboard (retards par check-in, prix par type)
+PROJECTIONS = {
+    "delays": ["checkin_type", "delay_at_checkout_in_minutes"],
+    "pricing": ["car_type", "rental_price_per_day"],
+}
+
+_READ = """
+import json, sys, time
+import openpyxl, pandas as pd, pyarrow.parquet
+sys.path.insert(0, sys.argv[1])
+from store import DATASETS, XLSX_SHEET, read_dataset
+
+def rss_kb():
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+
+reader, name, path, store_dir = sys.argv[2:6]
+columns = json.loads(sys.argv[6])
+before = rss_kb()
+start = time.perf_counter()
+if reader == "csv_inferred":
+    df = pd.read_csv(path)
+elif reader == "csv_typed":
+    df = pd.read_csv(path, dtype=DATASETS[name]["dtypes"])
+elif reader == "xlsx":
+    df = pd.read_excel(path, sheet_name=XLSX_SHEET, engine="openpyxl")
+else:
+    df = read_dataset(name, columns, store_dir)
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "rss_kb": rss_kb() - before, "rows": len(df),
+                  "frame_kb": int(df.memory_usage(deep=True).sum()) // 1024}))
+"""
+
+
+def measure(reader, name, path, store_dir, columns, repeat):
+    results = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _READ, os.path.join(ROOT, "STREAM_GET"), reader, name, path, store_dir,
+             json.dumps(columns)], check=True, capture_output=True, text=True,
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+
+def prepare(directory, factor):
+    """CSV sources (agrandis si factor > 1) et entrepôt correspondant dans `directory`."""
+    import pandas as pd
+
+    sources = {name: os.path.join(DATA_DIR, dataset["source"]) for name, dataset in DATASETS.items()}
+    if factor > 1:
+        from bench_aggregation import enlarge_delays, enlarge_pricing
+
+        enlarge = {"delays": enlarge_delays, "pricing": enlarge_pricing}
+        for name, path in sources.items():
+            sources[name] = os.path.join(directory, DATASETS[name]["source"])
+            enlarge[name](pd.read_csv(path, dtype=DATASETS[name]["dtypes"]), factor).to_csv(sources[name], index=False)
+    store_dir = os.path.join(directory, "store")
+    for name, path in sources.items():
+        convert(name, path, store_dir)
+    return sources, store_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--factor", type=int, default=1, help="nombre de copies des jeux de données")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results", "store.json"))
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args()
+
+    metrics = {}
+    with tempfile.TemporaryDirectory() as directory:
+        sources, store_dir = prepare(directory, args.factor)
+        for name, source in sources.items():
+            readers = {"csv_inferred": (source, None), "csv_typed": (source, None),
+                       "store": (source, None), "store_projected": (source, PROJECTIONS[name])}
+            if name == "delays" and args.factor == 1 and os.path.isfile(XLSX_FILE):
+                readers["xlsx"] = (XLSX_FILE, None)
+            for reader, (path, columns) in readers.items():
+                results = measure(reader, name, path, store_dir, columns, args.repeat)
+                prefix = f"store.{name}.{reader}"
+                metrics.update(summarize([r["seconds"] for r in results], prefix))
+                metrics[f"{prefix}.rss_kb"] = int(np.median([r["rss_kb"] for r in results]))
+                metrics[f"{prefix}.frame_kb"] = results[0]["frame_kb"]
+                metrics[f"{prefix}.rows_per_s"] = round(results[0]["rows"] / metrics[f"{prefix}.p50_ms"] * 1000, 1)
+                print(f"  {name} {reader} : {metrics[f'{prefix}.p50_ms']:.1f} ms, "
+                      f"+{metrics[f'{prefix}.rss_kb']} Ko RSS, DataFrame {metrics[f'{prefix}.frame_kb']} Ko")
+
+    config = {"factor": args.factor, "repeat": args.repeat, "xlsx_sheet": XLSX_SHEET}
+    results = write_results(args.output, "store", config, metrics)
+    print(f"Résultats écrits dans {args.output}")
+    if args.baseline:
+        return report_comparison(results, args.baseline, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
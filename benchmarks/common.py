@@ -0,0 +1,126 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# Utilitaires partagés par les scripts de benchmark.
+# Convention de nommage des métriques : suffixe `_ms` = plus bas est meilleur,
+# suffixe `_per_s` = plus haut est meilleur. Les autres valeurs sont informatives.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Entrepôt typé (python STREAM_GET/store.py) s'il a été construit, sinon le CSV
+DEFAULT_STORE = os.path.join(ROOT, "STREAM_GET", "data", "store", "pricing.parquet")
+DEFAULT_DATA = DEFAULT_STORE if os.path.isfile(DEFAULT_STORE) else os.path.join(ROOT, "pricing_clean.csv")
+
+
+def add_path(*parts):
+    """Rend importable un sous-projet (API_GET, MLFLOW_GET, STREAM_GET)."""
+    path = os.path.join(ROOT, *parts)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def summarize(latencies, prefix):
+    """p50/p99/moyenne (en ms) d'une liste de durées en secondes."""
+    values = np.asarray(latencies, dtype=np.float64) * 1000
+    return {
+        f"{prefix}.p50_ms": round(float(np.percentile(values, 50)), 4),
+        f"{prefix}.p99_ms": round(float(np.percentile(values, 99)), 4),
+        f"{prefix}.mean_ms": round(float(values.mean()), 4),
+    }
+
+
+def time_calls(fn, repeat, warmup=3):
+    for _ in range(warmup):
+        fn()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    import pandas
+    import sklearn
+    import xgboost
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pandas.__version__,
+        "sklearn": sklearn.__version__,
+        "xgboost": xgboost.__version__,
+    }
+
+
+def write_results(path, benchmark, config, metrics):
+    results = {"benchmark": benchmark, "environment": environment(), "config": config, "metrics": metrics}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=False)
+    return results
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(current, baseline, threshold):
+    """Compare deux fichiers de résultats ; renvoie (lignes de rapport, régressions).
+
+    Une métrique régresse si elle se dégrade de plus de `threshold` (0.1 = 10 %)
+    par rapport à la baseline, dans le sens indiqué par son suffixe.
+    """
+    lines, regressions = [], []
+    current_metrics, baseline_metrics = current["metrics"], baseline["metrics"]
+    for name, reference in baseline_metrics.items():
+        if name.endswith("_ms"):
+            lower_is_better = True
+        elif name.endswith("_per_s"):
+            lower_is_better = False
+        else:
+            continue
+        value = current_metrics.get(name)
+        if value is None or not reference:
+            lines.append(f"  {name:<55} {'absent':>12}")
+            continue
+        change = (value - reference) / reference
+        degradation = change if lower_is_better else -change
+        status = "REGRESSION" if degradation > threshold else ("mieux" if degradation < -threshold else "ok")
+        if status == "REGRESSION":
+            regressions.append(name)
+        lines.append(f"  {name:<55} {reference:>12.4g} -> {value:<12.4g} {change:+7.1%}  {status}")
+    return lines, regressions
+
+
+def report_comparison(current, baseline_path, threshold):
+    """Affiche la comparaison avec la baseline ; renvoie le code de sortie (1 si régression)."""
+    baseline = load_results(baseline_path)
+    lines, regressions = compare(current, baseline, threshold)
+    print(f"\nComparaison avec {baseline_path} (seuil {threshold:.0%}, baseline {baseline['environment'].get('git_revision')})")
+    print("\n".join(lines))
+    if regressions:
+        print(f"\n{len(regressions)} régression(s) : {', '.join(regressions)}")
+        return 1
+    print("\nAucune régression")
+    return 0
@@ -0,0 +1,23 @@
+"""Compare deux fichiers de résultats de benchmark.
+
+    python benchmarks/compare.py resultats.json benchmarks/baseline.json --threshold 0.15
+
+Code de sortie 1 si une métrique régresse au-delà du seuil.
+"""
+import argparse
+import sys
+
+from common import load_results, report_comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("current")
+    parser.add_argument("baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="dégradation tolérée (0.15 = 15 %%)")
+    args = parser.parse_args()
+    return report_comparison(load_results(args.current), args.baseline, args.threshold)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""Formats d'échange entre l'entraînement (MLFLOW_GET) et l'API (API_GET).
+
+- bundle compact : archive zip (booster UBJSON, manifest JSON, profil optionnel) écrite par
+  MLFLOW_GET/bundle.py et lue par API_GET/predictors.py ;
+- profil de référence : distribution d'entraînement écrite par MLFLOW_GET/reference.py et
+  comparée au trafic par API_GET/drift.py.
+
+Installé dans les deux images (`pip install ./shared`) : les deux côtés lisent les mêmes
+constantes et le même manifest de prétraitement.
+"""
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+# === Bundle compact ===
+BUNDLE_FORMAT = "getaround-xgboost-bundle"
+BUNDLE_VERSION = 1
+BUNDLE_SUFFIX = ".bundle.zip"
+BUNDLE_MANIFEST = "manifest.json"
+BUNDLE_BOOSTER = "booster.ubj"
+BUNDLE_PROFILE = "profile.json"
+
+# === Profil de référence ===
+PROFILE_FORMAT = "getaround-reference-profile"
+PROFILE_VERSION = 1
+PROFILE_SUFFIX = ".profile.json"
+
+MODEL_SUFFIX = ".joblib"
+UNKNOWN_CATEGORY = "__inconnu__"
+
+
+def check_manifest(manifest):
+    if manifest.get("format") != BUNDLE_FORMAT or manifest.get("version") != BUNDLE_VERSION:
+        raise ValueError(f"Bundle non supporté : {manifest.get('format')} v{manifest.get('version')}")
+    return manifest
+
+
+def check_profile(profile):
+    if profile.get("format") != PROFILE_FORMAT or profile.get("version") != PROFILE_VERSION:
+        raise ValueError(f"Profil non supporté : {profile.get('format')} v{profile.get('version')}")
+    return profile
+
+
+# === Noms des artefacts ===
+def artifact_stem(source):
+    """Chemin d'un artefact sans son extension (.joblib ou .bundle.zip)."""
+    for suffix in (MODEL_SUFFIX, BUNDLE_SUFFIX):
+        if source.endswith(suffix):
+            return source[:-len(suffix)]
+    return source
+
+
+def bundle_filename(source):
+    """xgboost_model_<run_id>.joblib -> xgboost_model_<run_id>.bundle.zip"""
+    return artifact_stem(source) + BUNDLE_SUFFIX
+
+
+def profile_filename(source):
+    """xgboost_model_<run_id>.joblib (ou .bundle.zip) -> xgboost_model_<run_id>.profile.json"""
+    return artifact_stem(source) + PROFILE_SUFFIX
+
+
+# === Prétraitement ===
+def python_value(value):
+    # Les vocabulaires du OneHotEncoder contiennent des scalaires numpy (np.str_, np.bool_)
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def single_step(transformer):
+    """L'unique étape d'un sous-pipeline du ColumnTransformer (hors "passthrough")."""
+    if isinstance(transformer, Pipeline):
+        steps = [step for _, step in transformer.steps if step != "passthrough"]
+        if len(steps) != 1:
+            raise ValueError(f"Pipeline de prétraitement non supporté : {transformer}")
+        transformer = steps[0]
+    return transformer
+
+
+def column_transformer(pipeline):
+    """ColumnTransformer ajusté en tête d'un pipeline préprocessing + régresseur."""
+    preprocessor = pipeline[:-1]
+    if isinstance(preprocessor, Pipeline) and len(preprocessor.steps) == 1:
+        preprocessor = preprocessor[0]
+    if not isinstance(preprocessor, ColumnTransformer):
+        raise ValueError("Le pipeline doit commencer par un ColumnTransformer")
+    return preprocessor
+
+
+def preprocessing_manifest(pipeline):
+    """Paramètres du ColumnTransformer, dans l'ordre des colonnes qu'il produit.
+
+    Clés : `features` (entrées du pipeline), `transformers` (`standard_scaler` : mean,
+    scale ; `one_hot` : categories, drop), `zero_as_missing` et `iteration_range`.
+    """
+    preprocessor = column_transformer(pipeline)
+    transformers = []
+    for name, transformer, features in preprocessor.transformers_:
+        if name == "remainder" or transformer == "drop":
+            if name == "remainder" and transformer != "drop":
+                raise ValueError("Colonnes 'remainder' non supportées")
+            continue
+        step = single_step(transformer)
+        if isinstance(step, StandardScaler):
+            transformers.append({
+                "kind": "standard_scaler",
+                "features": list(features),
+                "mean": [float(v) for v in (step.mean_ if step.mean_ is not None else np.zeros(len(features)))],
+                "scale": [float(v) for v in (step.scale_ if step.scale_ is not None else np.ones(len(features)))],
+            })
+        elif isinstance(step, OneHotEncoder):
+            if step.handle_unknown != "ignore":
+                raise ValueError("Le OneHotEncoder doit utiliser handle_unknown='ignore'")
+            drop_idx = step.drop_idx_ if step.drop_idx_ is not None else [None] * len(features)
+            transformers.append({
+                "kind": "one_hot",
+                "features": list(features),
+                "categories": [[python_value(c) for c in categories] for categories in step.categories_],
+                "drop": [None if d is None else int(d) for d in drop_idx],
+            })
+        else:
+            raise ValueError(f"Transformer non supporté : {step!r}")
+
+    regressor = pipeline[-1]
+    try:
+        iteration_range = [0, int(regressor.best_iteration) + 1]
+    except AttributeError:
+        iteration_range = [0, 0]
+    return {
+        "features": [str(f) for f in preprocessor.feature_names_in_],
+        "transformers": transformers,
+        # Matrice creuse en sortie du ColumnTransformer : XGBoost y traite les zéros comme manquants
+        "zero_as_missing": bool(preprocessor.sparse_output_),
+        "iteration_range": iteration_range,
+    }
+
+
+def parity_sample(preprocessing, size=500, seed=0):
+    """Jeu d'entrées synthétique couvrant les vocabulaires (et une catégorie inconnue).
+
+    `preprocessing` : manifest de preprocessing_manifest ; colonnes dans l'ordre de `features`.
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for transformer in preprocessing["transformers"]:
+        if transformer["kind"] == "standard_scaler":
+            for feature, mean, scale in zip(transformer["features"], transformer["mean"], transformer["scale"]):
+                columns[feature] = np.maximum(0, rng.normal(mean, scale, size)).round().astype(np.int64)
+        else:
+            for feature, categories in zip(transformer["features"], transformer["categories"]):
+                values = list(categories)
+                if all(isinstance(v, str) for v in values):
+                    values.append(UNKNOWN_CATEGORY)
+                elif all(isinstance(v, bool) for v in values):
+                    values = [False, True]
+                columns[feature] = np.array(values, dtype=object)[rng.integers(0, len(values), size)]
+    return pd.DataFrame(columns)[preprocessing["features"]]